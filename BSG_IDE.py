@@ -11,6 +11,7 @@ from pathlib import Path
 # Add these imports at the top of the file with the other imports
 import json
 import time
+import copy
 from datetime import datetime
 from pathlib import Path
 def setup_package_paths():
@@ -85,7 +86,11 @@ try:
         process_input_file,
         set_terminal_io,
         convert_media,
-        download_media
+        download_media,
+        load_asset_manifest,
+        generator_events,
+        resolve_deck_path,
+        set_default_deck_base_dir
     )
     print("✓ Successfully imported BeamerSlideGenerator")
 except ImportError as e:
@@ -105,7 +110,11 @@ except ImportError as e:
             process_input_file,
             set_terminal_io,
             convert_media,
-            download_media
+            download_media,
+            load_asset_manifest,
+            generator_events,
+            resolve_deck_path,
+            set_default_deck_base_dir
         )
         print("✓ Successfully imported BeamerSlideGenerator via bsg_ide")
     except ImportError as e2:
@@ -143,6 +152,13 @@ global working_folder
 working_folder=os.path.expanduser("~")
 global original_dir
 original_dir = os.path.expanduser("~")
+
+
+def project_media_dir(*parts) -> str:
+    """Path inside the media_files/ folder of the open presentation"""
+    return os.path.join(working_folder, 'media_files', *parts)
+
+
 from tkinter import messagebox
 try:
     from EnhancedCommandDialog import LatexCommandHelper, CommandTooltip
@@ -1108,7 +1124,7 @@ def check_and_install_dependencies():
                     continue
 
         # Create media_files directory
-        os.makedirs('media_files', exist_ok=True)
+        os.makedirs(project_media_dir(), exist_ok=True)
 
         # Restore output for verification
         sys.stdout = original_stdout
@@ -1344,6 +1360,7 @@ from pathlib import Path
 from PIL import Image
 import traceback
 import webbrowser
+import bisect
 #from BSE import BeamerSlideEditor,BeamerSyntaxHighlighter
 
 #-------------------------------------BSE-----------------------------------------------
@@ -1369,6 +1386,51 @@ except ImportError as e:
     from Grammarly import  GrammarlyIntegration,GrammarlySetupDialog,AutomatedGrammarlyIntegration
     from InteractiveTerminal import InteractiveTerminal
 
+try:
+    from .LatexBuild import (run_pdflatex_nonstop, diagnose_tex_frames, add_color_definitions,
+                             compile_until_stable, rebuild_reason, build_dir_for, build_lock,
+                             find_build_output, fresh_pdf, pdf_signature, publish_pdf, BUILD_PASS_ARGS)
+except ImportError:
+    from LatexBuild import (run_pdflatex_nonstop, diagnose_tex_frames, add_color_definitions,
+                            compile_until_stable, rebuild_reason, build_dir_for, build_lock,
+                            find_build_output, fresh_pdf, pdf_signature, publish_pdf, BUILD_PASS_ARGS)
+
+try:
+    from .DeckExport import export_deck_archive
+except ImportError:
+    from DeckExport import export_deck_archive
+
+try:
+    from .PackageIndex import get_package_index, build_package_index, reset_package_index, KERNEL_PACKAGE
+except ImportError:
+    from PackageIndex import get_package_index, build_package_index, reset_package_index, KERNEL_PACKAGE
+
+try:
+    from .DeckSearchIndex import DeckSearchIndex, slide_signature
+except ImportError:
+    from DeckSearchIndex import DeckSearchIndex, slide_signature
+
+try:
+    from .BuildProfiler import BuildProfiler, trace_path_for
+except ImportError:
+    from BuildProfiler import BuildProfiler, trace_path_for
+from contextlib import nullcontext
+
+try:
+    from .SlidePreview import PageRenderCache, preview_available
+except ImportError:
+    from SlidePreview import PageRenderCache, preview_available
+
+try:
+    from .SyncTexMap import SYNCTEX_SUFFIX, load_synctex, load_tex_slide_index
+except ImportError:
+    from SyncTexMap import SYNCTEX_SUFFIX, load_synctex, load_tex_slide_index
+
+try:
+    from .LatexHelp import HoverService
+except ImportError:
+    from LatexHelp import HoverService
+
 # ============================================================================
 # COMPLETE THEME & STYLE SYSTEM - All-in-One Implementation
 # ============================================================================
@@ -5438,6 +5500,55 @@ class ThemeManager:
         return importer.generate_preamble_from_theme(theme_data)
 
 
+# ============================================================================
+# PREAMBLE MERGE CACHE - merge results keyed by preamble hash
+# ============================================================================
+
+class PreambleMergeCache:
+    """Remembers the outcome of merging a file preamble so unchanged decks skip the merge"""
+
+    CACHE_DIR = Path.home() / '.bsg-ide' / 'preamble_cache'
+    # Bump whenever the merge or conflict resolution rules change
+    RESOLVER_VERSION = '1'
+
+    @classmethod
+    def make_key(cls, file_preamble, default_preamble):
+        """Hash of both merge inputs and the resolver version"""
+        import hashlib
+        digest = hashlib.sha256()
+        for part in (cls.RESOLVER_VERSION, default_preamble, file_preamble):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    @classmethod
+    def get(cls, key):
+        """Cached merge result for a key, or None"""
+        try:
+            with open(cls.CACHE_DIR / f"{key}.json", 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def put(cls, key, merged_preamble, resolutions=None):
+        """Store a merge result; failures only cost a re-merge next time"""
+        try:
+            cls.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            entry = {
+                'merged': merged_preamble,
+                'resolutions': {str(k): str(v) for k, v in (resolutions or {}).items()},
+                'version': cls.RESOLVER_VERSION,
+                'created': datetime.now().isoformat()
+            }
+            temp_path = cls.CACHE_DIR / f"{key}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, cls.CACHE_DIR / f"{key}.json")
+        except OSError:
+            pass
+
+
 #=============================================================================
 # TeX to TEXT impot Manager
 #=============================================================================
@@ -8474,6 +8585,28 @@ class PackageConflictDetector:
                     'loaded': True
                 }
 
+        # Any other loaded package: the package index knows whether it already defines a \newcommand
+        index = get_package_index()
+        if index is not None:
+            for cmd in sorted(custom_commands):
+                if cmd in cls.CRITICAL_COMMANDS or f'\\newcommand{{\\{cmd}}}' not in preamble:
+                    continue
+                for pkg_name in index.packages_for(cmd):
+                    if pkg_name not in loaded_packages or pkg_name in cls.PACKAGE_CONFLICTS:
+                        continue
+                    conflict = conflicts.setdefault(pkg_name, {
+                        'package_info': {
+                            'commands': [],
+                            'description': 'Defines commands this preamble also defines (found by the package index)',
+                            'conflict_resolution': 'keep_both',
+                            'rename_to': {}
+                        },
+                        'conflicting_commands': [],
+                        'loaded': True
+                    })
+                    conflict['package_info']['commands'].append(cmd)
+                    conflict['conflicting_commands'].append(cmd)
+
         return conflicts
 
     @classmethod
@@ -9523,6 +9656,57 @@ class SessionManager:
         except Exception as e:
             print(f"Warning: Could not save session data: {str(e)}")
 
+def find_replace_spans(content: str, search_text: str, replace_text: str, case_sensitive: bool = False,
+                       whole_word: bool = False, use_regex: bool = False) -> list:
+    """Compute every match once as (start, end, replacement) character offsets into content"""
+    expression = search_text if use_regex else re.escape(search_text)
+    if whole_word:
+        expression = rf'\b(?:{expression})\b'
+    pattern = re.compile(expression, 0 if case_sensitive else re.IGNORECASE)
+
+    spans = []
+    for match in pattern.finditer(content):
+        if match.start() == match.end():
+            continue
+        replacement = match.expand(replace_text) if use_regex else replace_text
+        spans.append((match.start(), match.end(), replacement))
+    return spans
+
+
+def spans_to_text_indices(content: str, spans: list) -> list:
+    """Convert character offsets into Tk "line.column" indices"""
+    line_starts = [0] + [match.end() for match in re.finditer('\n', content)]
+
+    def to_index(offset):
+        line = bisect.bisect_right(line_starts, offset) - 1
+        return f"{line + 1}.{offset - line_starts[line]}"
+
+    return [(to_index(start), to_index(end), replacement) for start, end, replacement in spans]
+
+
+def apply_text_replacements(panel, text_widget, content: str, spans: list) -> None:
+    """Apply replacement spans bottom-up in one pass as a single undoable edit"""
+    indexed = spans_to_text_indices(content, spans)
+    indexed.reverse()
+
+    # The indices were computed from content, so nothing may edit the widget until the last span is done
+    autoseparators = text_widget.cget('autoseparators')
+    text_widget.configure(autoseparators=False)
+    text_widget.edit_separator()
+    try:
+        for start, end, replacement in indexed:
+            text_widget.delete(start, end)
+            if replacement:
+                text_widget.insert(start, replacement)
+    finally:
+        text_widget.edit_separator()
+        text_widget.configure(autoseparators=autoseparators)
+
+    panel.status_label.configure(text=f"Replaced {len(indexed)} occurrence(s)", text_color="green")
+    if hasattr(panel.master, 'modified'):
+        panel.master.modified = True
+
+
 class SearchReplacePanel(ctk.CTkToplevel):
     """Search and replace panel for the Error Editor"""
 
@@ -9739,36 +9923,19 @@ class SearchReplacePanel(ctk.CTkToplevel):
             self.find_next()
 
     def replace_all(self):
-        """Replace all occurrences"""
-        pattern = self.get_search_pattern()
-        if not pattern:
+        """Replace all occurrences span by span as a single undoable edit"""
+        search_text = self.search_entry.get()
+        if not search_text or not self.get_search_pattern():
             return
 
         content = self.editor.get("1.0", "end-1c")
-        replace_text = self.replace_entry.get()
-
-        if isinstance(pattern, str):
-            # Plain text replacement
-            if self.case_sensitive.get():
-                new_content = content.replace(pattern, replace_text)
-            else:
-                # Case-insensitive replacement
-                import re
-                new_content = re.compile(re.escape(pattern), re.IGNORECASE).sub(replace_text, content)
-        else:
-            # Regex replacement
-            new_content = pattern.sub(replace_text, content)
-
-        # Count replacements
-        count = content.count(pattern) if isinstance(pattern, str) else len(pattern.findall(content))
+        spans = find_replace_spans(content, search_text, self.replace_entry.get(),
+                                   case_sensitive=self.case_sensitive.get(),
+                                   whole_word=self.whole_word.get(),
+                                   use_regex=self.use_regex.get())
 
-        if count > 0:
-            self.editor.delete("1.0", "end")
-            self.editor.insert("1.0", new_content)
-            self.status_label.configure(text=f"Replaced {count} occurrence(s)", text_color="green")
-            # Mark as modified
-            if hasattr(self.master, 'modified'):
-                self.master.modified = True
+        if spans:
+            apply_text_replacements(self, self.editor, content, spans)
         else:
             self.status_label.configure(text="No matches found", text_color="yellow")
 
@@ -10521,7 +10688,7 @@ class LaTeXErrorAnalyzer:
 
         # Check for undefined control sequence (missing package)
         elif 'Undefined control sequence' in error_msg:
-            return LaTeXErrorAnalyzer._analyze_undefined_command(error_msg, line_num)
+            return LaTeXErrorAnalyzer._analyze_undefined_command(error_msg, line_num, context_lines)
 
         # Check for missing $ (math mode)
         elif 'Missing $ inserted' in error_msg:
@@ -10583,6 +10750,148 @@ class LaTeXErrorAnalyzer:
 
         return result
 
+    @staticmethod
+    def _analyze_runaway_error(error_msg: str, tex_lines: list, line_num: int) -> dict:
+        """Analyze runaway argument / file ended while scanning errors"""
+        return {
+            'error_type': 'missing_brace',
+            'suggestion': 'Missing closing brace or math mode delimiter. Check for unmatched {, }, $, or math environment boundaries.',
+            'auto_fixable': bool(tex_lines and line_num),
+            'fix_type': 'fix_runaway',
+            'line': line_num
+        }
+
+    @staticmethod
+    def _analyze_ampersand_error(error_msg: str, tex_lines: list, line_num: int) -> dict:
+        """Analyze misplaced alignment tab (&) errors"""
+        return {
+            'error_type': 'misplaced_ampersand',
+            'suggestion': 'Unescaped & outside a table. Use \\& for a literal ampersand.',
+            'auto_fixable': bool(line_num),
+            'fix_type': 'escape_ampersand',
+            'line': line_num
+        }
+
+    @staticmethod
+    def _analyze_missing_item_error(error_msg: str, line_num: int) -> dict:
+        """Analyze 'perhaps a missing \\item' errors"""
+        return {
+            'error_type': 'missing_item',
+            'suggestion': 'List entry without \\item. Start each bullet with \\item instead of - or •.',
+            'auto_fixable': bool(line_num),
+            'fix_type': 'add_item',
+            'line': line_num
+        }
+
+    @staticmethod
+    def _analyze_undefined_command(error_msg: str, line_num: int, context_lines: list = None) -> dict:
+        """Analyze undefined control sequences and map them to a package when known"""
+        command = None
+        for ctx in reversed(context_lines or []):
+            commands = re.findall(r'\\([A-Za-z@]+)', ctx)
+            if commands:
+                command = commands[-1]
+                break
+
+        package = LaTeXErrorAnalyzer.PACKAGE_MAP.get(command) if command else None
+        if command and not package:
+            # Fall back to the index of the local TeX installation (Tools → Build Package Index)
+            index = get_package_index()
+            package = index.package_for(command) if index else None
+        if package:
+            return {
+                'error_type': 'undefined_command',
+                'suggestion': f'\\{command} is defined by the {package} package. Add \\usepackage{{{package}}}.',
+                'auto_fixable': True,
+                'fix_type': 'add_package',
+                'fix_data': package,
+                'line': line_num
+            }
+
+        name = '\\' + command if command else 'command'
+        return {
+            'error_type': 'undefined_command',
+            'suggestion': f'Undefined {name}. Check the spelling or add it to the preamble.',
+            'auto_fixable': False,
+            'fix_type': 'editor',
+            'line': line_num
+        }
+
+    @staticmethod
+    def _fix_ampersands(tex_lines: list, error_line: int) -> tuple:
+        """Escape bare ampersands on the error line"""
+        fixed_lines = tex_lines.copy()
+        fix_count = 0
+
+        if error_line and 1 <= error_line <= len(fixed_lines):
+            line = fixed_lines[error_line - 1]
+            new_line = re.sub(r'(?<!\\)&', r'\\&', line)
+            if new_line != line:
+                fixed_lines[error_line - 1] = new_line
+                fix_count = 1
+
+        return fixed_lines, fix_count
+
+    @staticmethod
+    def _fix_missing_item(tex_lines: list, error_line: int) -> tuple:
+        """Turn a '-' or '•' bullet on the error line into an \\item entry"""
+        fixed_lines = tex_lines.copy()
+        fix_count = 0
+
+        if error_line and 1 <= error_line <= len(fixed_lines):
+            line = fixed_lines[error_line - 1]
+            stripped = line.strip()
+            if stripped.startswith('-') or stripped.startswith('•'):
+                indent = line[:len(line) - len(line.lstrip())]
+                ending = '\n' if line.endswith('\n') else ''
+                fixed_lines[error_line - 1] = indent + '\\item ' + stripped.lstrip('-•').strip() + ending
+                fix_count = 1
+
+        return fixed_lines, fix_count
+
+    @staticmethod
+    def _add_package(tex_lines: list, package: str) -> tuple:
+        """Insert \\usepackage{package} right before \\begin{document}"""
+        usepackage = f'\\usepackage{{{package}}}'
+        if any(usepackage in line for line in tex_lines):
+            return tex_lines.copy(), 0
+
+        fixed_lines = tex_lines.copy()
+        for i, line in enumerate(fixed_lines):
+            if '\\begin{document}' in line:
+                fixed_lines.insert(i, usepackage + '\n')
+                return fixed_lines, 1
+
+        return fixed_lines, 0
+
+    @staticmethod
+    def _fix_runaway_error(tex_lines: list, analysis: dict, error_line: int = None) -> tuple:
+        """Close unbalanced math or braces on the error line"""
+        fixed_lines = tex_lines.copy()
+        target_line = analysis.get('line') or error_line
+        if not target_line or not 1 <= target_line <= len(fixed_lines):
+            return fixed_lines, 0, ""
+
+        line = fixed_lines[target_line - 1]
+        ending = '\n' if line.endswith('\n') else ''
+        body = line.rstrip()
+        dollars = len(re.findall(r'(?<!\\)\$', body))
+        missing_braces = body.count('{') - body.count('}')
+
+        if analysis.get('fix_type') != 'fix_braces' and dollars % 2 != 0:
+            fixed_lines[target_line - 1] = body + '$' + ending
+            return fixed_lines, 1, "Added missing $ to close math mode"
+
+        if analysis.get('fix_type') == 'fix_math_delimiters':
+            # "Missing $ inserted" on a balanced line is a math-only command in text; braces are not the cause
+            return fixed_lines, 0, ""
+
+        if missing_braces > 0:
+            fixed_lines[target_line - 1] = body + '}' * missing_braces + ending
+            return fixed_lines, 1, f"Added {missing_braces} missing closing brace(s)"
+
+        return fixed_lines, 0, ""
+
     @staticmethod
     def apply_fix(tex_lines: list, analysis: dict, error_line: int = None) -> tuple:
         """Apply the suggested fix to the TeX lines - ENHANCED"""
@@ -10966,7 +11275,7 @@ class MediaSelectionDialog(ctk.CTkToplevel):
 
         # Populate file list
         try:
-            files = os.listdir('media_files')
+            files = os.listdir(project_media_dir())
             for i, file in enumerate(files, 1):
                 self.file_listbox.insert('end', f"{i}. {file}\n")
         except Exception as e:
@@ -11112,8 +11421,9 @@ class EnhancedNotesEditor(ctk.CTkFrame):
 
 #------------------------------------------------------------------------------------------
 class FileThumbnailBrowser(ctk.CTkToplevel):
-    def __init__(self, parent, initial_dir="media_files", callback=None):
+    def __init__(self, parent, initial_dir=None, callback=None):
         super().__init__(parent)
+        initial_dir = initial_dir or project_media_dir()
 
         # Import required modules
         try:
@@ -11348,7 +11658,7 @@ class FileThumbnailBrowser(ctk.CTkToplevel):
         if self.callback:
             # Create relative path if file is in media_files directory
             try:
-                relative_to_media = os.path.relpath(file_path, 'media_files')
+                relative_to_media = os.path.relpath(file_path, project_media_dir())
                 if relative_to_media.startswith('..'):
                     # File is outside media_files - use absolute path
                     final_path = file_path
@@ -13593,7 +13903,8 @@ class SimpleRedirector:
         self.color = color
 
     def write(self, text):
-        if text.strip():
+        # The terminal buffers writes, so bare newlines from print() are cheap to pass on
+        if text:
             self.terminal.write(text, self.color)
 
     def flush(self):
@@ -13708,6 +14019,93 @@ class BeamerSyntaxHighlighter:
         if hasattr(self.ctk_text.master, 'spell_checking_enabled') and self.ctk_text.master.spell_checking_enabled:
             self.ctk_text.master.check_spelling()
 
+class SlideLineGutter(tk.Canvas):
+    """Canvas line-number gutter that keeps a cached line→slide index and draws only visible lines"""
+
+    TITLE_PATTERN = r'^\s*\\title'
+
+    def __init__(self, master, text_widget, **kwargs):
+        super().__init__(master, highlightthickness=0, **kwargs)
+        self.text_widget = text_widget
+        self.font = ("Courier", 11)
+        self.error_line = None
+        self.slide_starts = []  # sorted line numbers of \title lines
+        self.line_count = 0
+        self._redraw_pending = False
+
+    def reindex(self):
+        """Rebuild the slide index with Tk's own search instead of splitting the buffer"""
+        starts = []
+        index = "1.0"
+        while True:
+            index = self.text_widget.search(self.TITLE_PATTERN, index, stopindex="end", regexp=True)
+            if not index:
+                break
+            line = int(index.split('.')[0])
+            starts.append(line)
+            index = f"{line + 1}.0"
+        self.slide_starts = starts
+        self.line_count = self._current_line_count()
+        self.schedule_redraw()
+
+    def on_edit(self):
+        """Update the index for the lines around the insert cursor after an edit"""
+        new_count = self._current_line_count()
+        delta = new_count - self.line_count
+        insert_line = int(self.text_widget.index("insert").split('.')[0])
+
+        # Added lines end at the cursor (Enter, paste); removed lines collapse onto it
+        first = max(1, insert_line - delta) if delta > 0 else insert_line
+        last = insert_line
+        old_last = last - delta
+
+        lo = bisect.bisect_left(self.slide_starts, first)
+        hi = bisect.bisect_right(self.slide_starts, old_last)
+        shifted = [line + delta for line in self.slide_starts[hi:]]
+
+        region = self.text_widget.get(f"{first}.0", f"{last}.end").split('\n')
+        rescanned = [first + offset for offset, text in enumerate(region)
+                     if text.strip().startswith('\\title')]
+
+        self.slide_starts = self.slide_starts[:lo] + rescanned + shifted
+        self.line_count = new_count
+        self.schedule_redraw()
+
+    def slide_at(self, line):
+        """Slide number containing the given line (0 before the first slide)"""
+        return bisect.bisect_right(self.slide_starts, line)
+
+    def schedule_redraw(self, *args):
+        """Coalesce redraw requests into one idle callback"""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self.redraw)
+
+    def redraw(self):
+        """Draw labels for the lines currently visible in the text widget"""
+        self._redraw_pending = False
+        self.delete("all")
+        line = int(self.text_widget.index("@0,0").split('.')[0])
+        while line <= self.line_count:
+            info = self.text_widget.dlineinfo(f"{line}.0")
+            if info is None:
+                break
+            slide = self.slide_at(line)
+
+            if slide and self.slide_starts[slide - 1] == line:
+                label = f"{line:4d} ▶ Slide {slide}"
+            elif line == self.error_line:
+                label = f"{line:4d} ⚠ Slide {slide}" if slide else f"{line:4d} ⚠"
+            else:
+                label = f"{line:4d}   Slide {slide}" if slide else f"{line:4d}"
+
+            self.create_text(3, info[1], anchor="nw", text=label, font=self.font,
+                             fill="#FFD700" if line == self.error_line else "#858585")
+            line += 1
+
+    def _current_line_count(self):
+        return int(self.text_widget.index("end-1c").split('.')[0])
+
 class LaTeXErrorEditor(ctk.CTkToplevel):
     r"""Interactive editor for fixing LaTeX compilation errors - works with TXT files directly"""
 
@@ -13800,10 +14198,15 @@ class LaTeXErrorEditor(ctk.CTkToplevel):
         """Sync scrolling between editor and line numbers"""
         try:
             self.editor.yview(*args)
-            self.line_numbers.yview(*args)
+            self.line_numbers.schedule_redraw()
         except:
             pass
 
+    def on_editor_yscroll(self, first, last):
+        """Keep the scrollbar and the gutter in step with the editor view"""
+        self.editor_scrollbar.set(first, last)
+        self.line_numbers.schedule_redraw()
+
     def on_mousewheel(self, event):
         """Handle mousewheel scrolling"""
         try:
@@ -13814,7 +14217,6 @@ class LaTeXErrorEditor(ctk.CTkToplevel):
             else:
                 delta = -1 * (event.delta // 120)
             self.editor.yview_scroll(delta, "units")
-            self.line_numbers.yview_scroll(delta, "units")
         except:
             pass
         return "break"
@@ -13824,7 +14226,7 @@ class LaTeXErrorEditor(ctk.CTkToplevel):
     def setup_brace_matching(self):
         """Setup brace matching for the editor"""
         try:
-            self.editor.bind('<KeyRelease>', self.on_brace_match)
+            self.editor.bind('<KeyRelease>', self.on_brace_match, add='+')
             self.editor.bind('<ButtonRelease-1>', self.on_brace_match)
             self.editor.bind('<Motion>', self.on_hover_brace_match)
 
@@ -14115,44 +14517,19 @@ class LaTeXErrorEditor(ctk.CTkToplevel):
             print(f"Error highlighting issues: {e}")
 
     def update_line_numbers(self):
-        """Update line number display with slide indicators"""
+        """Rebuild the slide index and redraw the gutter after whole-buffer changes"""
         try:
-            lines = self.editor.get("1.0", "end-1c").split('\n')
-
-            # Build line numbers with slide indicators
-            line_numbers = []
-            current_slide = 0
-            for i, line in enumerate(lines, 1):
-                if line.strip().startswith('\\title'):
-                    current_slide += 1
-                    # Remove [DELETED] prefix for cleaner display
-                    title_display = line.strip()
-                    if '[DELETED]' in title_display:
-                        title_display = '🗑 ' + title_display.replace('[DELETED]', '').strip()
-                    line_numbers.append(f"{i:4d} ▶ Slide {current_slide}")
-                else:
-                    if current_slide > 0:
-                        if i == self.error_line_num:
-                            line_numbers.append(f"{i:4d} ⚠ Slide {current_slide}")
-                        else:
-                            line_numbers.append(f"{i:4d}   Slide {current_slide}")
-                    else:
-                        if i == self.error_line_num:
-                            line_numbers.append(f"{i:4d} ⚠")
-                        else:
-                            line_numbers.append(f"{i:4d}")
-
-            line_numbers_text = '\n'.join(line_numbers)
-            self.line_numbers.configure(state="normal")
-            self.line_numbers.delete("1.0", "end")
-            self.line_numbers.insert("1.0", line_numbers_text)
-            self.line_numbers.configure(state="disabled")
+            self.line_numbers.error_line = self.error_line_num
+            self.line_numbers.reindex()
         except Exception as e:
             print(f"Error updating line numbers: {e}")
 
     def on_text_change(self, event=None):
         """Update line numbers when text changes"""
-        self.update_line_numbers()
+        try:
+            self.line_numbers.on_edit()
+        except Exception as e:
+            print(f"Error updating line numbers: {e}")
         self.modified = True
         self.status_label.configure(text="Changes made - Click 'Apply Fix & Recompile' to save", text_color="#FFB86C")
 
@@ -14379,26 +14756,25 @@ class LaTeXErrorEditor(ctk.CTkToplevel):
         left_frame = tk.Frame(paned)
         paned.add(left_frame, width=600)
 
-        line_number_frame = tk.Frame(left_frame, bg="#1e1e1e", width=70)
+        line_number_frame = tk.Frame(left_frame, bg="#1e1e1e", width=130)
         line_number_frame.pack(side="left", fill="y")
         line_number_frame.pack_propagate(False)
 
-        self.line_numbers = tk.Text(line_number_frame, width=8, padx=3, takefocus=0, border=0,
-                                    background="#1e1e1e", foreground="#858585", font=("Courier", 11),
-                                    wrap="none", state="disabled")
-        self.line_numbers.pack(side="left", fill="y")
-
         editor_container = tk.Frame(left_frame)
         editor_container.pack(side="left", fill="both", expand=True)
 
-        scrollbar = tk.Scrollbar(editor_container)
-        scrollbar.pack(side="right", fill="y")
+        self.editor_scrollbar = tk.Scrollbar(editor_container)
+        self.editor_scrollbar.pack(side="right", fill="y")
 
         self.editor = tk.Text(editor_container, font=("Courier", 11), background="#1e1e1e",
                               foreground="#d4d4d4", insertbackground="white", wrap="none",
-                              yscrollcommand=scrollbar.set, tabs=("4c", "8c", "12c", "16c", "20c", "24c"))
+                              yscrollcommand=self.on_editor_yscroll, tabs=("4c", "8c", "12c", "16c", "20c", "24c"))
         self.editor.pack(side="left", fill="both", expand=True)
-        scrollbar.config(command=self.on_scroll)
+        self.editor_scrollbar.config(command=self.on_scroll)
+
+        self.line_numbers = SlideLineGutter(line_number_frame, self.editor, background="#1e1e1e")
+        self.line_numbers.pack(side="left", fill="both", expand=True)
+        self.editor.bind("<Configure>", self.line_numbers.schedule_redraw, add='+')
 
         # Configure tags
         self.editor.tag_config("error_line", background="#8B0000", foreground="white")
@@ -14633,36 +15009,36 @@ class LaTeXErrorEditor(ctk.CTkToplevel):
 
     def on_editor_hover(self, event):
         """Handle hover over LaTeX commands using existing tooltip system"""
-        try:
-            index = self.editor.index(f"@{event.x},{event.y}")
-
-            # Get the word under cursor
-            word_start = self.editor.index(f"{index} wordstart")
-            word_end = self.editor.index(f"{index} wordend")
-            word = self.editor.get(word_start, word_end)
-
-            # Check if it's a LaTeX command
-            if word.startswith('\\') and len(word) > 1:
-                # Use existing tooltip manager
-                if hasattr(self, 'tooltip_manager'):
-                    self.tooltip_manager.show_tooltip(
-                        self.editor, word, event.x_root, event.y_root
-                    )
-                else:
-                    # Fallback to basic tooltip
-                    self.show_basic_command_tooltip(word, event.x_root, event.y_root)
-            else:
-                # Hide tooltip if not a command
-                if hasattr(self, 'tooltip_manager'):
-                    self.tooltip_manager.hide_tooltip()
-
-        except Exception as e:
-            print(f"Error in hover: {e}")
+        self.get_hover_service().on_motion(event)
 
     def on_editor_leave(self, event):
         """Hide tooltip when mouse leaves editor"""
-        if hasattr(self, 'tooltip_manager'):
+        self.get_hover_service().on_leave(event)
+
+    def get_hover_service(self):
+        """Throttled hover lookups feeding the tooltip manager (or the basic tooltip)"""
+        if getattr(self, 'hover_service', None) is None:
+            self.hover_service = HoverService(self.show_hover_tooltip, self.hide_hover_tooltip)
+        return self.hover_service
+
+    def show_hover_tooltip(self, widget, command, x, y):
+        """Show the tooltip for the command under the mouse"""
+        if getattr(self, 'tooltip_manager', None):
+            self.tooltip_manager.show_tooltip(widget, command, x, y)
+        else:
+            # Fallback to basic tooltip
+            self.show_basic_command_tooltip(command, x, y)
+
+    def hide_hover_tooltip(self):
+        """Hide whichever tooltip is showing"""
+        if getattr(self, 'tooltip_manager', None):
             self.tooltip_manager.hide_tooltip()
+        elif getattr(self, 'current_tooltip', None):
+            try:
+                self.current_tooltip.destroy()
+            except tk.TclError:
+                pass
+            self.current_tooltip = None
 
     def show_detailed_command_help(self, event):
         """Show detailed command help on Alt+Click using existing system"""
@@ -14747,6 +15123,7 @@ class LaTeXErrorEditor(ctk.CTkToplevel):
 
     def show_basic_command_tooltip(self, command, x, y):
         """Fallback basic tooltip if enhanced system isn't available"""
+        self.hide_hover_tooltip()
         tooltip = tk.Toplevel(self)
         tooltip.wm_overrideredirect(True)
         tooltip.wm_geometry(f"+{x+10}+{y+10}")
@@ -14817,20 +15194,12 @@ class LaTeXErrorEditor(ctk.CTkToplevel):
 
         # Still provide basic tooltip functionality
         self.editor.bind('<Motion>', self.on_basic_hover)
+        self.editor.bind('<Leave>', self.on_editor_leave)
         self.editor.bind('<Alt-Button-1>', self.on_basic_help_click)
 
     def on_basic_hover(self, event):
         """Basic hover handler for fallback mode"""
-        try:
-            index = self.editor.index(f"@{event.x},{event.y}")
-            word_start = self.editor.index(f"{index} wordstart")
-            word_end = self.editor.index(f"{index} wordend")
-            word = self.editor.get(word_start, word_end)
-
-            if word.startswith('\\'):
-                self.show_basic_command_tooltip(word, event.x_root, event.y_root)
-        except:
-            pass
+        self.get_hover_service().on_motion(event)
 
     def on_basic_help_click(self, event):
         """Basic help click handler for fallback mode"""
@@ -15067,44 +15436,250 @@ class SearchReplacePanel(ctk.CTkToplevel):
             self.find_next()
 
     def replace_all(self):
-        """Replace all occurrences"""
-        pattern = self.get_search_pattern()
-        if not pattern:
+        """Replace all occurrences span by span as a single undoable edit"""
+        search_text = self.search_entry.get()
+        if not search_text or not self.get_search_pattern():
             return
 
         content = self.editor.get("1.0", "end-1c")
-        replace_text = self.replace_entry.get()
+        spans = find_replace_spans(content, search_text, self.replace_entry.get(),
+                                   case_sensitive=self.case_sensitive.get(),
+                                   whole_word=self.whole_word.get(),
+                                   use_regex=self.use_regex.get())
 
-        if isinstance(pattern, str):
-            # Plain text replacement
-            if self.case_sensitive.get():
-                new_content = content.replace(pattern, replace_text)
-            else:
-                # Case-insensitive replacement
-                new_content = re.compile(re.escape(pattern), re.IGNORECASE).sub(replace_text, content)
+        if spans:
+            apply_text_replacements(self, self.editor, content, spans)
         else:
-            # Regex replacement
-            new_content = pattern.sub(replace_text, content)
+            self.status_label.configure(text="No matches found", text_color="yellow")
 
-        # Count replacements
-        if isinstance(pattern, str):
-            if self.case_sensitive.get():
-                count = content.count(pattern)
-            else:
-                count = len(re.findall(re.escape(pattern), content, re.IGNORECASE))
-        else:
-            count = len(pattern.findall(content))
+class SlideReplaceDialog(ctk.CTkToplevel):
+    """Search and replace across the content and notes of every slide, with a preview"""
 
-        if count > 0:
-            self.editor.delete("1.0", "end")
-            self.editor.insert("1.0", new_content)
-            self.status_label.configure(text=f"Replaced {count} occurrence(s)", text_color="green")
-            # Mark as modified
-            if hasattr(self.master, 'modified'):
-                self.master.modified = True
+    FIELDS = ('content', 'notes')
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.editor = parent
+        self.title("Replace in All Slides")
+        self.geometry("760x520")
+        self.transient(parent)
+        self.grab_set()
+        self.lift()
+        self.focus_force()
+
+        self.update_idletasks()
+        x = (self.winfo_screenwidth() - 760) // 2
+        y = (self.winfo_screenheight() - 520) // 2
+        self.geometry(f"+{x}+{y}")
+
+        self.pending_changes = {}
+        self.create_widgets()
+
+    def create_widgets(self):
+        """Create search, replace, option and preview widgets"""
+        main_frame = ctk.CTkFrame(self)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        for label, attr in (("Search:", "search_entry"), ("Replace:", "replace_entry")):
+            row = ctk.CTkFrame(main_frame)
+            row.pack(fill="x", pady=5)
+            ctk.CTkLabel(row, text=label, width=60).pack(side="left", padx=5)
+            entry = ctk.CTkEntry(row, width=300)
+            entry.pack(side="left", padx=5, fill="x", expand=True)
+            entry.bind('<KeyRelease>', lambda e: self.clear_preview())
+            setattr(self, attr, entry)
+
+        options_frame = ctk.CTkFrame(main_frame)
+        options_frame.pack(fill="x", pady=5)
+        self.case_sensitive = ctk.BooleanVar(value=False)
+        self.whole_word = ctk.BooleanVar(value=False)
+        self.use_regex = ctk.BooleanVar(value=False)
+        for text, var in (("Case sensitive", self.case_sensitive), ("Whole word", self.whole_word),
+                          ("Regular expression", self.use_regex)):
+            ctk.CTkCheckBox(options_frame, text=text, variable=var,
+                            command=self.clear_preview).pack(side="left", padx=10)
+
+        self.preview = ctk.CTkTextbox(main_frame, font=("Courier", 11), wrap="none")
+        self.preview.pack(fill="both", expand=True, pady=5)
+
+        self.status_label = ctk.CTkLabel(main_frame, text="", font=("Arial", 10))
+        self.status_label.pack(fill="x", pady=5)
+
+        button_frame = ctk.CTkFrame(main_frame)
+        button_frame.pack(fill="x", pady=5)
+        ctk.CTkButton(button_frame, text="Preview", command=self.build_preview, width=100).pack(side="left", padx=5)
+        self.apply_button = ctk.CTkButton(button_frame, text="Replace in All Slides", command=self.apply_changes,
+                                          width=160, state="disabled")
+        self.apply_button.pack(side="left", padx=5)
+        ctk.CTkButton(button_frame, text="Close", command=self.destroy, width=80).pack(side="right", padx=5)
+
+        self.bind('<Escape>', lambda e: self.destroy())
+        self.bind('<Return>', lambda e: self.build_preview())
+
+    def clear_preview(self):
+        """Invalidate the preview when the query changes"""
+        self.pending_changes = {}
+        self.apply_button.configure(state="disabled")
+
+    def build_preview(self):
+        """Collect every change across all slides and list them before anything is modified"""
+        self.clear_preview()
+        search_text = self.search_entry.get()
+        if not search_text:
+            return
+
+        self.editor.save_current_slide()
+        replace_text = self.replace_entry.get()
+        preview_lines = []
+        total = 0
+
+        try:
+            for slide_index, slide in enumerate(self.editor.slides):
+                for field in self.FIELDS:
+                    for line_index, line in enumerate(slide.get(field, [])):
+                        spans = find_replace_spans(line, search_text, replace_text,
+                                                   case_sensitive=self.case_sensitive.get(),
+                                                   whole_word=self.whole_word.get(),
+                                                   use_regex=self.use_regex.get())
+                        if not spans:
+                            continue
+                        new_line = line
+                        for start, end, replacement in reversed(spans):
+                            new_line = new_line[:start] + replacement + new_line[end:]
+                        self.pending_changes.setdefault(slide_index, []).append((field, line_index, new_line))
+                        total += len(spans)
+                        preview_lines.append(f"Slide {slide_index + 1} · {field} · line {line_index + 1}")
+                        preview_lines.append(f"  - {line}")
+                        preview_lines.append(f"  + {new_line}")
+        except re.error as e:
+            self.status_label.configure(text=f"Invalid regular expression: {e}", text_color="red")
+            return
+
+        self.preview.delete("1.0", "end")
+        self.preview.insert("1.0", '\n'.join(preview_lines))
+
+        if total:
+            self.status_label.configure(
+                text=f"{total} match(es) in {len(self.pending_changes)} slide(s) - review, then replace",
+                text_color="cyan")
+            self.apply_button.configure(state="normal")
         else:
             self.status_label.configure(text="No matches found", text_color="yellow")
 
+    def apply_changes(self):
+        """Apply the previewed changes as one undoable slide operation"""
+        if not self.pending_changes:
+            return
+        count = self.editor.apply_slide_replacements(self.pending_changes)
+        self.clear_preview()
+        self.status_label.configure(text=f"Replaced text in {count} slide(s) - Ctrl+Z to undo", text_color="green")
+
+class SlideSearchPanel(ctk.CTkToplevel):
+    """Indexed search over titles, media, content and notes of the deck (and optionally the folder)"""
+
+    FIELD_LABELS = {'title': 'title', 'media': 'media', 'content': 'content', 'notes': 'notes'}
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.editor = parent
+        self.title("Search Deck")
+        self.geometry("720x460")
+        self.transient(parent)
+        self.lift()
+
+        self.update_idletasks()
+        x = (self.winfo_screenwidth() - 720) // 2
+        y = (self.winfo_screenheight() - 460) // 2
+        self.geometry(f"+{x}+{y}")
+
+        self.hits = []
+        self.create_widgets()
+        self.search_entry.focus_set()
+
+    def create_widgets(self):
+        """Create query, option and result widgets"""
+        main_frame = ctk.CTkFrame(self)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        search_frame = ctk.CTkFrame(main_frame)
+        search_frame.pack(fill="x", pady=5)
+        ctk.CTkLabel(search_frame, text="Search:", width=60).pack(side="left", padx=5)
+        self.search_entry = ctk.CTkEntry(search_frame, width=300,
+                                         placeholder_text="words or prefixes, e.g. \\textbf elec")
+        self.search_entry.pack(side="left", padx=5, fill="x", expand=True)
+        self.search_entry.bind('<KeyRelease>', self.on_query_change)
+        self.search_entry.bind('<Return>', lambda e: self.open_hit())
+        self.search_entry.bind('<Down>', lambda e: self.results.focus_set())
+
+        options_frame = ctk.CTkFrame(main_frame)
+        options_frame.pack(fill="x", pady=5)
+        self.use_regex = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(options_frame, text="Regular expression", variable=self.use_regex,
+                        command=self.run_query).pack(side="left", padx=10)
+        self.all_decks = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(options_frame, text="All decks in folder", variable=self.all_decks,
+                        command=self.run_query).pack(side="left", padx=10)
+
+        list_frame = tk.Frame(main_frame)
+        list_frame.pack(fill="both", expand=True, pady=5)
+        scrollbar = tk.Scrollbar(list_frame)
+        scrollbar.pack(side="right", fill="y")
+        self.results = tk.Listbox(list_frame, font=("Courier", 11), background="#1e1e1e", foreground="#d4d4d4",
+                                  selectbackground="#4A90E2", yscrollcommand=scrollbar.set, activestyle="none")
+        self.results.pack(side="left", fill="both", expand=True)
+        scrollbar.config(command=self.results.yview)
+        self.results.bind('<Double-Button-1>', lambda e: self.open_hit())
+        self.results.bind('<Return>', lambda e: self.open_hit())
+
+        self.status_label = ctk.CTkLabel(main_frame, text="", font=("Arial", 10))
+        self.status_label.pack(fill="x", pady=5)
+
+        self.bind('<Escape>', lambda e: self.destroy())
+
+    def on_query_change(self, event=None):
+        """Re-run the query as the user types"""
+        if event is not None and event.keysym in ('Return', 'Down', 'Up'):
+            return
+        self.run_query()
+
+    def run_query(self):
+        """Answer the query from the index and list the hits"""
+        query = self.search_entry.get()
+        self.results.delete(0, "end")
+        self.hits = []
+        if not query.strip():
+            self.status_label.configure(text="")
+            return
+
+        started = time.perf_counter()
+        try:
+            self.hits = self.editor.search_slides(query, regex=self.use_regex.get(),
+                                                  all_decks=self.all_decks.get())
+        except re.error as e:
+            self.status_label.configure(text=f"Invalid regular expression: {e}", text_color="red")
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+
+        current = os.path.abspath(self.editor.current_file) if self.editor.current_file else None
+        for hit in self.hits:
+            deck = "" if hit['deck'] in (current, self.editor.search_deck_key()) else f"{os.path.basename(hit['deck'])} · "
+            location = f"{deck}Slide {hit['slide'] + 1} · {self.FIELD_LABELS[hit['field']]}"
+            if hit['field'] in ('content', 'notes'):
+                location += f" {hit['line'] + 1}"
+            self.results.insert("end", f"{location:<34} {hit['text'].strip()[:120]}")
+
+        self.status_label.configure(text=f"{len(self.hits)} hit(s) in {elapsed:.1f} ms", text_color="cyan")
+        if self.hits:
+            self.results.selection_set(0)
+
+    def open_hit(self):
+        """Jump to the selected hit"""
+        selection = self.results.curselection()
+        if not selection and self.hits:
+            selection = (0,)
+        if selection:
+            self.editor.jump_to_search_hit(self.hits[selection[0]])
+
 class MenuBar(ctk.CTkFrame):
     """Comprehensive menu bar for BSG-IDE"""
 
@@ -15179,6 +15754,8 @@ class MenuBar(ctk.CTkFrame):
         edit_menu.add_command(label="Paste", command=lambda: self.editor_focused_action('paste'), accelerator="Ctrl+V")
         edit_menu.add_separator()
         edit_menu.add_command(label="Find/Replace", command=self.show_search_replace, accelerator="Ctrl+F")
+        edit_menu.add_command(label="Replace in All Slides...", command=lambda: SlideReplaceDialog(self.editor))
+        edit_menu.add_command(label="Search Deck...", command=self.editor.show_deck_search, accelerator="Ctrl+Shift+F")
         edit_menu.add_separator()
 
         # Slide operations submenu
@@ -15259,6 +15836,7 @@ class MenuBar(ctk.CTkFrame):
 
         # Terminal toggle
         view_menu.add_command(label="Toggle Terminal", command=self.editor.toggle_terminal, accelerator="Ctrl+T")
+        view_menu.add_command(label="Toggle Slide Preview", command=self.editor.toggle_slide_preview)
         view_menu.add_separator()
 
         # Notes mode submenu
@@ -15393,6 +15971,8 @@ class MenuBar(ctk.CTkFrame):
         # Generation
         gen_menu = tk.Menu(tools_menu, tearoff=0)
         gen_menu.add_command(label="Generate PDF", command=self.editor.generate_pdf)
+        gen_menu.add_command(label="Diagnose Deck", command=self.editor.diagnose_deck)
+        gen_menu.add_command(label="Build Package Index", command=self.editor.build_package_index_async)
         gen_menu.add_command(label="Convert to TeX", command=self.editor.convert_to_tex)
         gen_menu.add_command(label="Preview PDF", command=self.editor.preview_pdf)
         gen_menu.add_command(label="Present with Notes", command=self.editor.present_with_notes)
@@ -15756,6 +16336,15 @@ class BeamerSlideEditor(ctk.CTk):
         # Initialize the package manager
         self.package_manager = CrossPlatformPackageManager(parent=self, verbose=True)
 
+        # Fix every recoverable compile error in one non-halting pass before the step-by-step loop
+        self.batch_fix_mode = True
+
+        # Inverted index over all slides, refreshed slide by slide from save_current_slide
+        self.search_index = DeckSearchIndex()
+        self._indexed_deck = None
+        # slide_signature of each slide as last loaded or saved, for has_unsaved_changes
+        self._saved_signatures = []
+
         # Add to the __init__ method of BeamerSlideEditor
         self._current_citation_map = {}  # For bibliography back-references
 
@@ -16100,6 +16689,13 @@ class BeamerSlideEditor(ctk.CTk):
             })
             self.write(f"↩ Undo: Restored permanently deleted slide {action['index'] + 1}\n", "cyan")
 
+        elif action['action'] == 'replace_all':
+            # Put back every slide touched by Replace in All Slides
+            for index, original in action['slides'].items():
+                self.slides[index] = copy.deepcopy(original)
+            self._push_to_redo_stack(action)
+            self.write(f"↩ Undo: Reverted replacements in {len(action['slides'])} slide(s)\n", "cyan")
+
         # Update UI
         if 'index' in action:
             self.current_slide_index = action['index']
@@ -16116,6 +16712,15 @@ class BeamerSlideEditor(ctk.CTk):
 
         action = self.redo_stack.pop()
 
+        if action['action'] == 'replace_all':
+            for index, replaced in action['replaced'].items():
+                self.slides[index] = copy.deepcopy(replaced)
+            self._push_to_undo_stack(action)
+            if self.current_slide_index in action['replaced']:
+                self.load_slide(self.current_slide_index)
+            self.write(f"↪ Redo: Replaced text in {len(action['replaced'])} slide(s)\n", "cyan")
+            return
+
         if action['action'] == 'mask':
             self.mask_slide(action['index'])
         elif action['action'] == 'unmask':
@@ -16220,6 +16825,116 @@ class BeamerSlideEditor(ctk.CTk):
             return self._deep_copy_slide(self.slides[index])
         return None
 
+    def apply_slide_replacements(self, changes: dict) -> int:
+        """Apply {slide_index: [(field, line_index, new_line), ...]} as a single undo step"""
+        originals = {}
+        replaced = {}
+        for index, edits in changes.items():
+            if not 0 <= index < len(self.slides):
+                continue
+            slide = self.slides[index]
+            # Full copies: masked lines and media live in extra keys (_hidden_content_indices, ...)
+            originals[index] = copy.deepcopy(slide)
+            for field, line_index, new_line in edits:
+                if line_index < len(slide.get(field, [])):
+                    slide[field][line_index] = new_line
+            replaced[index] = copy.deepcopy(slide)
+
+        if originals:
+            self._push_to_undo_stack({'action': 'replace_all', 'slides': originals, 'replaced': replaced})
+            self.redo_stack.clear()
+            if self.current_slide_index in originals:
+                self.load_slide(self.current_slide_index)
+            self.write(f"✓ Replaced text in {len(originals)} slide(s)\n", "green")
+
+        return len(originals)
+
+    def search_deck_key(self) -> str:
+        """Key of the open deck in the search index"""
+        return os.path.abspath(self.current_file) if self.current_file else '<unsaved>'
+
+    def mark_deck_saved(self) -> None:
+        """Remember the slides as they are on disk"""
+        self._saved_signatures = [slide_signature(slide) for slide in self.slides]
+
+    def has_unsaved_changes(self) -> bool:
+        """True if any slide differs from the last load or save"""
+        self.save_current_slide()
+        return [slide_signature(slide) for slide in self.slides] != self._saved_signatures
+
+    def confirm_leave_deck(self) -> bool:
+        """Offer to save unsaved changes before another deck replaces this one; False to stay"""
+        if not self.has_unsaved_changes():
+            return True
+        answer = messagebox.askyesnocancel(
+            "Unsaved Changes",
+            f"Save changes to {os.path.basename(self.current_file or 'the current deck')} first?",
+            parent=self)
+        if answer is None:
+            return False
+        return bool(self.save_file()) if answer else True
+
+    def update_search_index(self, changed_index: int = None) -> None:
+        """Refresh the index for the saved slide plus any slides added, moved or removed"""
+        deck = self.search_deck_key()
+        if self._indexed_deck and self._indexed_deck != deck:
+            self.search_index.remove_deck(self._indexed_deck)
+        self._indexed_deck = deck
+        self.search_index.sync_deck(deck, self.slides, changed_index)
+
+    def search_slides(self, query: str, regex: bool = False, all_decks: bool = False) -> list:
+        """Search the open deck, or every deck in its folder, through the index"""
+        self.update_search_index()
+        if all_decks:
+            folder = os.path.dirname(self.search_deck_key()) if self.current_file else os.getcwd()
+            self.search_index.index_directory(folder, skip=self.current_file)
+            return self.search_index.search(query, regex=regex)
+        return self.search_index.search(query, regex=regex, deck=self.search_deck_key())
+
+    def show_deck_search(self) -> None:
+        """Open the indexed deck search panel"""
+        self.save_current_slide()
+        SlideSearchPanel(self)
+
+    def jump_to_search_hit(self, hit: dict) -> None:
+        """Select the slide of a search hit and put the cursor on the matching line"""
+        if hit['deck'] != self.search_deck_key():
+            if not messagebox.askyesno("Open Deck", f"Open {os.path.basename(hit['deck'])} to show this hit?",
+                                       parent=self):
+                return
+            if not self.confirm_leave_deck():
+                return
+            self.load_file(hit['deck'])
+            hit = dict(hit, deck=self.search_deck_key())
+            self.after(200, lambda: self.jump_to_search_hit(hit))
+            return
+
+        if not 0 <= hit['slide'] < len(self.slides):
+            return
+
+        self.save_current_slide()
+        self.current_slide_index = hit['slide']
+        self.load_slide(self.current_slide_index)
+        self.update_slide_list()
+        self.highlight_current_slide()
+        self.slide_list.see(f"{self.current_slide_index + 1}.0")
+
+        if hit['field'] == 'title':
+            self.title_entry.focus_set()
+        elif hit['field'] == 'media':
+            self.media_entry.focus_set()
+        else:
+            textbox = (self.content_editor if hit['field'] == 'content' else self.notes_editor)._textbox
+            # load_slide writes one row per non-blank item (masked ones with a "% " prefix)
+            items = self.slides[hit['slide']].get(hit['field'], [])
+            row = 1 + sum(1 for item in items[:hit['line']] if item and item.strip())
+            line_index = f"{row}.0"
+            textbox.tag_remove('sel', '1.0', 'end')
+            textbox.tag_add('sel', line_index, f"{row}.end")
+            textbox.mark_set('insert', line_index)
+            textbox.see(line_index)
+            textbox.focus_set()
+
     def update_slide_list(self):
         """Modified update_slide_list to show masked slides differently with safe tag handling"""
         # Clear the slide list first
@@ -16331,6 +17046,9 @@ class BeamerSlideEditor(ctk.CTk):
         # Restore deleted slide shortcut (Shift+Ctrl+R)
         self.bind('<Control-Shift-R>', lambda e: self.restore_deleted_slide())
 
+        # Indexed search across slides (Shift+Ctrl+F)
+        self.bind('<Control-Shift-F>', lambda e: self.show_deck_search())
+
         # Navigation shortcuts
         self.bind('<Control-Up>', lambda e: self.move_slide(-1))
         self.bind('<Control-Down>', lambda e: self.move_slide(1))
@@ -16929,54 +17647,33 @@ class BeamerSlideEditor(ctk.CTk):
 
     def on_editor_motion(self, event):
         """Handle mouse motion in editor for command detection"""
-        widget = event.widget
-        index = widget.index(f"@{event.x},{event.y}")
-
-        # Get the word under cursor
-        word_start = widget.index(f"{index} wordstart")
-        word_end = widget.index(f"{index} wordend")
-        word = widget.get(word_start, word_end)
-
-        # Check if it's a LaTeX command
-        if word.startswith('\\') and len(word) > 1:
-            self.show_command_tooltip(widget, word, event.x_root, event.y_root)
-        else:
-            self.tooltip_manager.hide_tooltip()
+        self.get_hover_service().on_motion(event)
 
     def on_entry_motion(self, event):
         """Handle mouse motion in entry for command detection"""
-        widget = event.widget
-        content = widget.get()
-
-        # Simple check for commands in entry
-        if '\\' in content:
-            # Find command near cursor position
-            cursor_pos = widget.index(tk.INSERT)
-            text_before = content[:cursor_pos]
-            if '\\' in text_before:
-                last_slash = text_before.rfind('\\')
-                next_space = content.find(' ', last_slash)
-                if next_space == -1:
-                    next_space = len(content)
-
-                command = content[last_slash:next_space]
-                if command.startswith('\\') and len(command) > 1:
-                    self.show_command_tooltip(widget, command, event.x_root, event.y_root)
-                    return
-
-        self.tooltip_manager.hide_tooltip()
+        self.get_hover_service().on_motion(event)
 
     def on_editor_leave(self, event):
         """Handle mouse leaving editor"""
-        self.tooltip_manager.hide_tooltip()
+        self.get_hover_service().on_leave(event)
 
     def on_entry_leave(self, event):
         """Handle mouse leaving entry"""
-        self.tooltip_manager.hide_tooltip()
+        self.get_hover_service().on_leave(event)
+
+    def get_hover_service(self):
+        """Throttled command-under-mouse detection shared by the editors and the media entry"""
+        if getattr(self, 'hover_service', None) is None:
+            self.hover_service = HoverService(
+                self.show_command_tooltip,
+                lambda: self.tooltip_manager.hide_tooltip() if getattr(self, 'tooltip_manager', None) else None
+            )
+        return self.hover_service
 
     def show_command_tooltip(self, widget, command, x, y):
         """Show tooltip for LaTeX command"""
-        self.tooltip_manager.show_tooltip(widget, command, x, y)
+        if getattr(self, 'tooltip_manager', None):
+            self.tooltip_manager.show_tooltip(widget, command, x, y)
 #---------------Help Windows Ends Grammarly starts-------------------------
     def enhance_toolbar(self):
         """Add new features to toolbar"""
@@ -17207,9 +17904,14 @@ class BeamerSlideEditor(ctk.CTk):
             text = focused_widget.get("1.0", "end-1c")
 
             if len(text.strip()) > 10:  # Only check substantial text
-                suggestions = self.grammarly.check_text_grammarly(text)
-                if suggestions:
-                    self.grammarly.apply_grammarly_suggestions(focused_widget, suggestions)
+                # Paragraphs are checked off the UI thread; unchanged ones come from the cache
+                def apply_result(suggestions, widget=focused_widget, checked_text=text):
+                    # Offsets are only valid if the text has not changed meanwhile
+                    if widget.winfo_exists() and widget.get("1.0", "end-1c") == checked_text:
+                        self.grammarly.apply_grammarly_suggestions(widget, suggestions)
+
+                # Debounced: a burst of keystrokes sends one check, half a second after the last
+                self.grammarly.check_text_async(text, apply_result, key=str(focused_widget), delay=0.5)
 
     def setup_grammarly_integration(self):
         """Setup Grammarly integration UI"""
@@ -19905,6 +20607,7 @@ class BeamerSlideEditor(ctk.CTk):
             # Create main components
             self.create_sidebar()
             self.create_main_editor()
+            self.create_preview_pane()
             self.create_toolbar()
             self.create_context_menu()
             self.create_footer()
@@ -20017,12 +20720,14 @@ class BeamerSlideEditor(ctk.CTk):
             if self.session_manager:
                 self.session_data.update({
                     'last_file': self.current_file,
-                    'working_directory': os.getcwd()
+                    'working_directory': working_folder
                 })
                 self.session_manager.save_session(self.session_data)
         except Exception as e:
             print(f"Warning: Could not save session on exit: {str(e)}")
         finally:
+            if getattr(self, 'slide_preview', None):
+                self.slide_preview.close()
             self.destroy()
 
 #--------------------------------------------------------------------------------
@@ -20219,6 +20924,8 @@ class BeamerSlideEditor(ctk.CTk):
             if hasattr(self, 'notes_highlighter') and self.notes_highlighter.active:
                 self.notes_highlighter.highlight()
 
+            self.show_slide_preview(index)
+
     def format_tikz_for_output(self, media_content: str) -> str:
         """Format TikZ code for proper output in the text file"""
         if "% TikZ Diagram:" in media_content:
@@ -20430,7 +21137,7 @@ class BeamerSlideEditor(ctk.CTk):
         """Create terminal initially hidden"""
         # Create terminal instance
         self.terminal = InteractiveTerminal(self, initial_directory=os.getcwd())
-        self.terminal.grid(row=4, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
+        self.terminal.grid(row=4, column=0, columnspan=3, sticky="nsew", padx=5, pady=5)
         self.grid_rowconfigure(4, weight=0)  # Initially no weight
 
         # Hide terminal initially
@@ -20479,6 +21186,25 @@ class BeamerSlideEditor(ctk.CTk):
         if hasattr(self, 'terminal'):
             self.terminal.clear()
 
+    def show_generator_progress(self, event) -> None:
+        """Advance the terminal progress bar from the generator's slide events"""
+        if not hasattr(self, 'terminal'):
+            return
+        if threading.current_thread() is not threading.main_thread():
+            self.after(0, self.show_generator_progress, event)
+            return
+
+        total = event.data['total']
+        done = 0 if event.type == 'slides_parsed' else event.data['index']
+        self.terminal.set_progress(done / total if total else 1.0, f"{done}/{total} slides")
+
+        # Conversion runs on the UI thread, so repaint explicitly, at most every 50 ms
+        now = time.time()
+        if done == total or now - getattr(self, '_progress_painted', 0) >= 0.05:
+            self._progress_painted = now
+            self.terminal.flush_output()
+            self.update_idletasks()
+
     def stop_compilation(self) -> None:
         """Stop current compilation process"""
         if self.current_process:
@@ -20495,7 +21221,7 @@ class BeamerSlideEditor(ctk.CTk):
         """Create footer with institution info and properly tracked logo"""
         # Footer frame with dark theme
         self.footer = ctk.CTkFrame(self)
-        self.footer.grid(row=3, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+        self.footer.grid(row=3, column=0, columnspan=3, sticky="ew", padx=5, pady=5)
 
         # Left side - Logo and Institution name
         left_frame = ctk.CTkFrame(self.footer, fg_color="transparent")
@@ -20722,6 +21448,7 @@ Created by {self.__author__}
         view_menu.add_checkbutton(label="Syntax Highlighting", variable=self.highlight_var,
                                   command=self.toggle_highlighting)
         view_menu.add_command(label="Toggle Terminal", command=self.toggle_terminal, accelerator="Ctrl+T")
+        view_menu.add_command(label="Toggle Slide Preview", command=self.toggle_slide_preview)
         view_menu.add_separator()
 
         # Notes Mode submenu
@@ -20829,7 +21556,7 @@ Created by {self.__author__}
         """Create the original button row (kept for compatibility)"""
         # Main menu container
         self.menu_frame = ctk.CTkFrame(self)
-        self.menu_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+        self.menu_frame.grid(row=0, column=0, columnspan=3, sticky="ew", padx=5, pady=5)
         self.menu_frame.grid_columnconfigure(1, weight=1)
 
         # Left side buttons
@@ -21443,6 +22170,7 @@ Created by {self.__author__}
         view_menu.add_checkbutton(label="Syntax Highlighting", variable=self.highlight_var,
                                   command=self.toggle_highlighting)
         view_menu.add_command(label="Toggle Terminal", command=self.toggle_terminal, accelerator="Ctrl+T")
+        view_menu.add_command(label="Toggle Slide Preview", command=self.toggle_slide_preview)
         view_menu.add_separator()
 
         # Notes Mode submenu
@@ -21748,7 +22476,7 @@ Created by {self.__author__}
             from PIL import ImageGrab
             import time
 
-            os.makedirs('media_files', exist_ok=True)
+            os.makedirs(project_media_dir(), exist_ok=True)
             timestamp = time.strftime("%Y%m%d-%H%M%S")
 
             mode = self.capture_mode.get()
@@ -21800,7 +22528,7 @@ Created by {self.__author__}
                             continue
 
                     # Save frame with file dialog option
-                    frame_path = os.path.join('media_files', f'temp_frame_{timestamp}_{i:03d}.png')
+                    frame_path = project_media_dir(f'temp_frame_{timestamp}_{i:03d}.png')
                     screenshot.save(frame_path, 'PNG')
                     frames.append(frame_path)
                     self.write(f"  ✓ Frame {i+1} captured\n", "green")
@@ -21814,7 +22542,7 @@ Created by {self.__author__}
                         parent=self,
                         defaultextension=".gif",
                         initialfile=f"screen_animation_{timestamp}.gif",
-                        initialdir="media_files",
+                        initialdir=project_media_dir(),
                         filetypes=[("GIF files", "*.gif"), ("All files", "*.*")],
                         title="Save Animation"
                     )
@@ -21845,7 +22573,7 @@ Created by {self.__author__}
 
                     self.media_entry.delete(0, 'end')
                     # Use relative path if in media_files
-                    rel_path = os.path.relpath(filename, 'media_files')
+                    rel_path = os.path.relpath(filename, project_media_dir())
                     if not rel_path.startswith('..'):
                         self.media_entry.insert(0, f"\\file media_files/{rel_path}")
                     else:
@@ -21886,7 +22614,7 @@ Created by {self.__author__}
                     parent=self,
                     defaultextension=".png",
                     initialfile=f"screen_capture_{timestamp}.png",
-                    initialdir="media_files",
+                    initialdir=project_media_dir(),
                     filetypes=[("PNG files", "*.png"), ("All files", "*.*")],
                     title="Save Screenshot"
                 )
@@ -21903,7 +22631,7 @@ Created by {self.__author__}
 
                     self.media_entry.delete(0, 'end')
                     # Use relative path if in media_files
-                    rel_path = os.path.relpath(filename, 'media_files')
+                    rel_path = os.path.relpath(filename, project_media_dir())
                     if not rel_path.startswith('..'):
                         self.media_entry.insert(0, f"\\file media_files/{rel_path}")
                     else:
@@ -21927,12 +22655,11 @@ Created by {self.__author__}
         """Debug method to show where files are being saved"""
         self.write("\n=== FILE LOCATION DEBUG ===\n", "cyan")
 
-        # Current working directory
-        cwd = os.getcwd()
-        self.write(f"Current working directory: {cwd}\n", "white")
+        # Project folder (media paths resolve against it, not the process directory)
+        self.write(f"Project folder: {working_folder}\n", "white")
 
         # Media_files directory
-        media_path = os.path.join(cwd, 'media_files')
+        media_path = project_media_dir()
         self.write(f"Expected media_files path: {media_path}\n", "white")
 
         # Check if exists
@@ -22183,7 +22910,7 @@ Created by {self.__author__}
                 import sys
 
                 # Create media_files directory if it doesn't exist
-                os.makedirs('media_files', exist_ok=True)
+                os.makedirs(project_media_dir(), exist_ok=True)
 
                 def get_available_cameras():
                     """Get list of available cameras with proper device detection for all platforms"""
@@ -22533,7 +23260,7 @@ Created by {self.__author__}
                                     'video': [('MP4 files', '*.mp4'), ('AVI files', '*.avi')]
                                 }
 
-                                initialdir = os.path.abspath('media_files')
+                                initialdir = project_media_dir()
                                 if not os.path.exists(initialdir):
                                     os.makedirs(initialdir)
 
@@ -22567,7 +23294,7 @@ Created by {self.__author__}
                                         image.save(filepath)
 
                                         # Update media entry with relative path if in media_files
-                                        rel_path = os.path.relpath(filepath, 'media_files')
+                                        rel_path = os.path.relpath(filepath, project_media_dir())
                                         if not rel_path.startswith('..'):
                                             self.media_entry.delete(0, 'end')
                                             self.media_entry.insert(0, f"\\file media_files/{rel_path}")
@@ -22631,7 +23358,7 @@ Created by {self.__author__}
 
                                         # Update media entry with relative path if in media_files
                                         filepath = recording_data['current_file']
-                                        rel_path = os.path.relpath(filepath, 'media_files')
+                                        rel_path = os.path.relpath(filepath, project_media_dir())
                                         if not rel_path.startswith('..'):
                                             self.media_entry.delete(0, 'end')
                                             self.media_entry.insert(0, f"\\file media_files/{rel_path}")
@@ -23118,7 +23845,7 @@ Created by {self.__author__}
         }
 
         for filepath in required_files:
-            full_path = os.path.join('media_files', filepath)
+            full_path = project_media_dir(filepath)
             if os.path.exists(full_path):
                 verified_files.add(filepath)
                 # Classify file by extension
@@ -23138,6 +23865,40 @@ Created by {self.__author__}
 
         return verified_files, missing_files, media_types
 
+    def get_media_assets(self, tex_file: str) -> dict:
+        """Media files of a generated deck, keyed by path relative to the .tex, with role, size and hash"""
+        manifest = load_asset_manifest(tex_file)
+        if manifest is not None:
+            assets = {}
+            for entry in manifest['assets'].values():
+                assets.setdefault(entry['file'], entry)
+            self.write_to_terminal(f"Using asset manifest: {len(assets)} media file(s)\n")
+            return assets
+
+        # No manifest, or a media line of the .tex was edited after it was generated: scan the .tex instead
+        tex_dir = os.path.dirname(os.path.abspath(tex_file))
+        with open(tex_file, 'r', encoding='utf-8') as f:
+            required_files = self.get_required_media_files(f.read())
+
+        role_by_type = {'images': 'image', 'videos': 'video', 'audio': 'audio',
+                        'animations': 'animation', 'other': 'other'}
+        verified_files, missing_files, media_types = self.verify_media_files(required_files)
+        assets = {}
+        for media_type, files in media_types.items():
+            for filename in files:
+                full_path = os.path.join(tex_dir, 'media_files', filename)
+                role = 'preview' if filename.endswith('_preview.png') else role_by_type[media_type]
+                assets[os.path.join('media_files', filename)] = {
+                    'role': role, 'file': os.path.join('media_files', filename), 'exists': os.path.exists(full_path),
+                    'size': os.path.getsize(full_path) if os.path.exists(full_path) else None, 'sha256': None
+                }
+        for filename in missing_files:
+            assets[os.path.join('media_files', filename)] = {
+                'role': 'other', 'file': os.path.join('media_files', filename), 'exists': False,
+                'size': None, 'sha256': None
+            }
+        return assets
+
     def create_manifest(self, tex_file: str, verified_files: set, missing_files: set, media_types: dict) -> str:
         """Create detailed manifest content"""
         manifest_content = [
@@ -23172,146 +23933,6 @@ Created by {self.__author__}
 
         return '\n'.join(manifest_content)
 
-    def create_overleaf_zip(self) -> None:
-        """Create a zip file compatible with Overleaf containing tex and all required media files"""
-        if not self.current_file:
-            messagebox.showwarning("Warning", "Please save your file first!")
-            return
-
-        try:
-            # First ensure current state is saved and tex is generated
-            #self.save_file()
-
-            # Get base filename without extension
-            base_filename = os.path.splitext(self.current_file)[0]
-            tex_file = base_filename + '.tex'
-
-            # Clear terminal and show progress
-            self.clear_terminal()
-            self.write_to_terminal("Creating Overleaf-compatible zip file...\n")
-
-            # Convert to tex if not already done
-            if not os.path.exists(tex_file):
-                self.write_to_terminal("Generating TeX file...\n")
-                from BeamerSlideGenerator import process_input_file
-                process_input_file(self.current_file, tex_file)
-                self.write_to_terminal("✓ TeX file generated successfully\n", "green")
-
-            # Read TEX content and identify required files
-            with open(tex_file, 'r', encoding='utf-8') as f:
-                tex_content = f.read()
-
-            # Create the progress dialog
-            self.update_idletasks()  # Ensure main window is updated
-            progress = self.create_progress_dialog(
-                "Creating Zip File",
-                "Analyzing required files..."
-            )
-
-            try:
-                # Analyze and verify media files
-                required_files = self.get_required_media_files(tex_content)
-                verified_files, missing_files, media_types = self.verify_media_files(required_files)
-
-                # Create zip file
-                zip_filename = base_filename + '_overleaf.zip'
-                total_files = len(verified_files) + 1  # +1 for tex file
-                processed_files = 0
-
-                progress.update_progress(0, "Creating zip file...")
-
-                with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    # Add the tex file
-                    progress.update_progress(
-                        (processed_files / total_files) * 100,
-                        "Adding TeX file..."
-                    )
-                    zipf.write(tex_file, os.path.basename(tex_file))
-                    processed_files += 1
-                    self.write_to_terminal(f"✓ Added: {os.path.basename(tex_file)}\n", "green")
-
-                    # Add verified media files
-                    self.write_to_terminal("\nAdding media files:\n")
-                    for filename in verified_files:
-                        file_path = os.path.join('media_files', filename)
-                        progress.update_progress(
-                            (processed_files / total_files) * 100,
-                            f"Adding {filename}..."
-                        )
-
-                        # Ensure the media_files directory exists in the zip
-                        if processed_files == 1:  # First media file
-                            zipf.writestr('media_files/.keep', '')  # Create empty file to ensure directory exists
-
-                        zipf.write(file_path, os.path.join('media_files', filename))
-                        self.write_to_terminal(f"✓ Added: {filename}\n", "green")
-                        processed_files += 1
-
-                    # Create detailed manifest
-                    manifest_content = self.create_manifest(
-                        tex_file, verified_files, missing_files, media_types
-                    )
-                    zipf.writestr('manifest.txt', manifest_content)
-
-                progress.update_progress(100, "Complete!")
-                time.sleep(0.5)  # Brief pause to show completion
-
-                # Show completion message with details
-                message = [f"Zip file created successfully!"]
-
-                # Add statistics
-                stats = []
-                total_files = sum(len(files) for files in media_types.values())
-                if total_files > 0:
-                    stats.extend([
-                        "",
-                        "Media files included:",
-                        *[f"- {media_type.title()}: {len(files)} files"
-                          for media_type, files in media_types.items() if files]
-                    ])
-
-                # Add warnings for missing files
-                if missing_files:
-                    stats.extend([
-                        "",
-                        f"Warning: {len(missing_files)} required files were missing.",
-                        "Check manifest.txt in the zip file for details."
-                    ])
-
-                # Add total size
-                try:
-                    zip_size = os.path.getsize(zip_filename)
-                    stats.append("")
-                    stats.append(f"Total zip size: {self.format_file_size(zip_size)}")
-                except OSError:
-                    pass
-
-                message.extend(stats)
-                message.append("\nWould you like to open the containing folder?")
-
-                # Close progress dialog before showing message
-                progress.close()
-
-                if messagebox.askyesno("Success", "\n".join(message)):
-                    # Open the folder containing the zip file
-                    if sys.platform.startswith('win'):
-                        os.system(f'explorer /select,"{zip_filename}"')
-                    elif sys.platform.startswith('darwin'):
-                        subprocess.run(['open', '-R', zip_filename])
-                    else:
-                        subprocess.run(['xdg-open', os.path.dirname(zip_filename)])
-
-            except Exception as e:
-                if 'progress' in locals():
-                    progress.close()
-                raise
-
-        except Exception as e:
-            error_msg = f"Error creating zip file: {str(e)}\n"
-            self.write_to_terminal(f"✗ {error_msg}", "red")
-            traceback.print_exc()  # Print full traceback to help with debugging
-            messagebox.showerror("Error", f"Error creating zip file:\n{str(e)}")
-
     def format_file_size(self, size: int) -> str:
         """Format file size in human-readable format"""
         for unit in ['B', 'KB', 'MB', 'GB']:
@@ -23447,6 +24068,7 @@ Created by {self.__author__}
         self.current_slide_index = -1
         self.update_slide_list()
         self.clear_editor()
+        self.mark_deck_saved()
 
         # Reset presentation info
         self.presentation_info = {
@@ -23468,10 +24090,10 @@ Created by {self.__author__}
             filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
             title="Open Presentation"
         )
-        if filename:
+        if filename and self.confirm_leave_deck():
             self.load_file(filename)
-            working_folder = os.path.dirname(filename) or '.'
-            os.chdir(working_folder)
+            working_folder = os.path.dirname(os.path.abspath(filename))
+            set_default_deck_base_dir(working_folder)
             original_dir = working_folder
             if hasattr(self, 'terminal'):
                 self.terminal.set_working_directory(working_folder)
@@ -23548,8 +24170,16 @@ Created by {self.__author__}
             # ========== STEP 4: CONVERT ==========
             self.write("\nConverting to TeX using BeamerSlideGenerator...\n", "white")
 
-            from BeamerSlideGenerator import process_input_file
-            processed, failed, errors = process_input_file(txt_file, tex_file)
+            from BeamerSlideGenerator import process_input_file, generator_events
+            # Slide events drive the terminal progress bar; the console keeps its info-level output
+            progress_token = generator_events.subscribe(
+                self.show_generator_progress, 'debug', types=('slides_parsed', 'slide_done', 'slide_failed'))
+            try:
+                processed, failed, errors = process_input_file(txt_file, tex_file)
+            finally:
+                generator_events.unsubscribe(progress_token)
+                if hasattr(self, 'terminal'):
+                    self.terminal.hide_progress()
 
             if processed > 0:
                 self.write(f"\n✓ TeX file generated: {tex_file}\n", "green")
@@ -23930,13 +24560,14 @@ Created by {self.__author__}
 
                 # Check if already downloaded
                 import glob
-                existing_videos = glob.glob(f"media_files/*{video_id}*.mp4")
+                existing_videos = [os.path.join('media_files', os.path.basename(video))
+                                   for video in glob.glob(project_media_dir(f"*{video_id}*.mp4"))]
                 if existing_videos:
                     self.write(f"      ✓ Using existing video: {os.path.basename(existing_videos[0])}\n", "green")
                     return existing_videos[0]
 
                 # Create media_files directory
-                os.makedirs('media_files', exist_ok=True)
+                os.makedirs(project_media_dir(), exist_ok=True)
 
                 # Quality format mapping for yt-dlp
                 quality_formats = {
@@ -23993,10 +24624,10 @@ Created by {self.__author__}
                     if stream:
                         resolution = getattr(stream, 'resolution', 'audio only')
                         self.write(f"      📥 Downloading: {resolution}...\n", "cyan")
-                        stream.download(output_path='media_files', filename=os.path.basename(output_path))
+                        stream.download(output_path=project_media_dir(), filename=os.path.basename(output_path))
 
-                        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                            file_size = os.path.getsize(output_path) / (1024 * 1024)
+                        if os.path.exists(resolve_deck_path(output_path)) and os.path.getsize(resolve_deck_path(output_path)) > 0:
+                            file_size = os.path.getsize(resolve_deck_path(output_path)) / (1024 * 1024)
                             self.write(f"      ✓ Downloaded via pytube: {os.path.basename(output_path)} ({file_size:.1f} MB)\n", "green")
 
                             # Generate preview for video files
@@ -24007,7 +24638,7 @@ Created by {self.__author__}
 
                             # Save attribution
                             attribution_path = output_path.rsplit('.', 1)[0] + '_source.txt'
-                            with open(attribution_path, 'w', encoding='utf-8') as f:
+                            with open(resolve_deck_path(attribution_path), 'w', encoding='utf-8') as f:
                                 f.write(f"Source URL: {youtube_url}\n")
                                 f.write(f"Video ID: {video_id}\n")
                                 f.write(f"Title: {video_title}\n")
@@ -24048,7 +24679,7 @@ Created by {self.__author__}
 
                     ydl_opts = {
                         'format': format_spec,
-                        'outtmpl': output_path,
+                        'outtmpl': resolve_deck_path(output_path),
                         'quiet': True,
                         'no_warnings': True,
                         'ignoreerrors': True,
@@ -24069,7 +24700,7 @@ Created by {self.__author__}
                     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                         ydl.download([youtube_url])
 
-                    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                    if os.path.exists(resolve_deck_path(output_path)) and os.path.getsize(resolve_deck_path(output_path)) > 0:
                         # Try to get video title for better filename
                         try:
                             with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
@@ -24084,14 +24715,14 @@ Created by {self.__author__}
                                     better_path = os.path.join('media_files', f"{safe_title}.mp4")
                                 if quality == 'audio':
                                     better_path = better_path.replace('.mp4', '.mp3')
-                                if os.path.exists(output_path) and output_path != better_path:
-                                    os.rename(output_path, better_path)
+                                if os.path.exists(resolve_deck_path(output_path)) and output_path != better_path:
+                                    os.rename(resolve_deck_path(output_path), resolve_deck_path(better_path))
                                     output_path = better_path
                                 self.write(f"      Title: {video_title[:50]}...\n", "white")
                         except:
                             pass
 
-                        file_size = os.path.getsize(output_path) / (1024 * 1024)
+                        file_size = os.path.getsize(resolve_deck_path(output_path)) / (1024 * 1024)
                         self.write(f"      ✓ Downloaded via yt-dlp: {os.path.basename(output_path)} ({file_size:.1f} MB)\n", "green")
 
                         # Generate preview for video files
@@ -24102,7 +24733,7 @@ Created by {self.__author__}
 
                         # Save attribution
                         attribution_path = output_path.rsplit('.', 1)[0] + '_source.txt'
-                        with open(attribution_path, 'w', encoding='utf-8') as f:
+                        with open(resolve_deck_path(attribution_path), 'w', encoding='utf-8') as f:
                             f.write(f"Source URL: {youtube_url}\n")
                             f.write(f"Video ID: {video_id}\n")
                             f.write(f"Quality: {quality}\n")
@@ -24135,14 +24766,14 @@ Created by {self.__author__}
                 try:
                     import cv2
                     preview_path = video_path.rsplit('.', 1)[0] + '_preview.png'
-                    if not os.path.exists(preview_path):
-                        cap = cv2.VideoCapture(video_path)
+                    if not os.path.exists(resolve_deck_path(preview_path)):
+                        cap = cv2.VideoCapture(resolve_deck_path(video_path))
                         ret, frame = cap.read()
                         if ret:
-                            cv2.imwrite(preview_path, frame)
+                            cv2.imwrite(resolve_deck_path(preview_path), frame)
                             self.write(f"      ✓ Preview generated: {os.path.basename(preview_path)}\n", "green")
                         cap.release()
-                    return preview_path if os.path.exists(preview_path) else None
+                    return preview_path if os.path.exists(resolve_deck_path(preview_path)) else None
                 except ImportError:
                     self.write(f"      ⚠ OpenCV not installed. Cannot generate preview.\n", "yellow")
                     self.write(f"      Install with: pip install opencv-python\n", "cyan")
@@ -24167,11 +24798,11 @@ Created by {self.__author__}
                     return None
 
                 # Create thumbnails directory
-                os.makedirs('media_files', exist_ok=True)
+                os.makedirs(project_media_dir(), exist_ok=True)
                 thumbnail_path = os.path.join('media_files', f"youtube_thumb_{video_id}.jpg")
 
                 # Check if already downloaded
-                if os.path.exists(thumbnail_path):
+                if os.path.exists(resolve_deck_path(thumbnail_path)):
                     return thumbnail_path
 
                 # Try to download thumbnail
@@ -24184,8 +24815,8 @@ Created by {self.__author__}
 
                 for url in thumbnail_urls:
                     try:
-                        urllib.request.urlretrieve(url, thumbnail_path)
-                        if os.path.exists(thumbnail_path) and os.path.getsize(thumbnail_path) > 1000:
+                        urllib.request.urlretrieve(url, resolve_deck_path(thumbnail_path))
+                        if os.path.exists(resolve_deck_path(thumbnail_path)) and os.path.getsize(resolve_deck_path(thumbnail_path)) > 1000:
                             self.write(f"      ✓ Downloaded thumbnail: {os.path.basename(thumbnail_path)}\n", "green")
                             return thumbnail_path
                     except:
@@ -24222,11 +24853,11 @@ Created by {self.__author__}
 
                 # ========== HANDLE LOCAL FILES ==========
                 actual_path = None
-                if os.path.exists(file_path):
+                if os.path.exists(resolve_deck_path(file_path)):
                     actual_path = file_path
-                elif os.path.exists(f"media_files/{file_path}"):
+                elif os.path.exists(resolve_deck_path(f"media_files/{file_path}")):
                     actual_path = f"media_files/{file_path}"
-                elif os.path.exists(f"media_files/{os.path.basename(file_path)}"):
+                elif os.path.exists(resolve_deck_path(f"media_files/{os.path.basename(file_path)}")):
                     actual_path = f"media_files/{os.path.basename(file_path)}"
 
                 if actual_path:
@@ -24321,7 +24952,7 @@ Created by {self.__author__}
                             result.append("\\begin{center}")
 
                             # Add LOCAL thumbnail image
-                            if thumbnail_path and os.path.exists(thumbnail_path):
+                            if thumbnail_path and os.path.exists(resolve_deck_path(thumbnail_path)):
                                 result.append(f"    \\includegraphics[width=0.5\\textwidth,keepaspectratio]{{{thumbnail_path}}}\\\\")
                                 result.append("    \\vspace{0.3em}")
                                 self.write(f"    ✓ Using local thumbnail: {os.path.basename(thumbnail_path)}\n", "green")
@@ -24358,11 +24989,11 @@ Created by {self.__author__}
                             file_path = file_path[1:-1]
 
                         actual_path = None
-                        if os.path.exists(file_path):
+                        if os.path.exists(resolve_deck_path(file_path)):
                             actual_path = file_path
-                        elif os.path.exists(f"media_files/{file_path}"):
+                        elif os.path.exists(resolve_deck_path(f"media_files/{file_path}")):
                             actual_path = f"media_files/{file_path}"
-                        elif os.path.exists(f"media_files/{os.path.basename(file_path)}"):
+                        elif os.path.exists(resolve_deck_path(f"media_files/{os.path.basename(file_path)}")):
                             actual_path = f"media_files/{os.path.basename(file_path)}"
 
                         if actual_path:
@@ -24370,7 +25001,7 @@ Created by {self.__author__}
                             result = []
                             result.append("\\begin{center}")
 
-                            if preview_path and os.path.exists(preview_path):
+                            if preview_path and os.path.exists(resolve_deck_path(preview_path)):
                                 result.append(f"    \\includegraphics[width=0.5\\textwidth,keepaspectratio]{{{preview_path}}}\\\\")
                                 result.append("    \\vspace{0.3em}")
 
@@ -25417,6 +26048,49 @@ Created by {self.__author__}
             messagebox.showwarning("Warning", "Please save your file first!")
             return
 
+        # Every stage is timed; the trace goes beside the .tex and a summary to the terminal
+        tex_file = os.path.splitext(self.current_file)[0] + '.tex'
+        self.build_profiler = BuildProfiler(os.path.basename(self.current_file))
+        events_token = self.build_profiler.attach(generator_events)
+        try:
+            with self.build_profiler.span('generate_pdf'):
+                self._generate_pdf_stages()
+        finally:
+            generator_events.unsubscribe(events_token)
+            self.report_build_profile(tex_file)
+            self.build_profiler = None
+
+    def profile_span(self, name: str, category: str = 'build', **args):
+        """Timing span on the running build's profiler (no-op outside generate_pdf)"""
+        profiler = getattr(self, 'build_profiler', None)
+        return profiler.span(name, category, **args) if profiler else nullcontext(args)
+
+    def profile_count(self, name: str, value=1) -> None:
+        """Bump a counter on the running build's profiler"""
+        profiler = getattr(self, 'build_profiler', None)
+        if profiler:
+            profiler.count(name, value)
+
+    def report_build_profile(self, tex_file: str) -> None:
+        """Write the build's Chrome trace beside the .tex and print the per-stage table"""
+        profiler = getattr(self, 'build_profiler', None)
+        if profiler is None or not profiler.spans:
+            return
+        try:
+            trace_file = profiler.write_trace(trace_path_for(tex_file))
+        except OSError as e:
+            self.write(f"\n⚠ Could not write build trace: {e}\n", "yellow")
+            trace_file = None
+
+        self.write("\n" + "="*60 + "\n", "cyan")
+        self.write("BUILD PROFILE\n", "cyan")
+        self.write("="*60 + "\n", "cyan")
+        self.write(profiler.format_summary(root='generate_pdf'), "white")
+        if trace_file:
+            self.write(f"📈 Trace: {trace_file} (open in chrome://tracing or ui.perfetto.dev)\n", "cyan")
+
+    def _generate_pdf_stages(self) -> None:
+        """The stages of generate_pdf, each inside a profiler span"""
         try:
             # Clear terminal
             self.clear_terminal()
@@ -25435,7 +26109,8 @@ Created by {self.__author__}
 
             # Step 0: Check for YouTube videos that need downloading before conversion
             self.write("\nStep 0: Checking for YouTube videos...\n", "white")
-            youtube_urls = self.find_youtube_urls_in_slides()
+            with self.profile_span('youtube_check'):
+                youtube_urls = self.find_youtube_urls_in_slides()
 
             if youtube_urls:
                 self.write(f"\n📹 Found {len(youtube_urls)} YouTube video(s) in the presentation:\n", "cyan")
@@ -25479,7 +26154,8 @@ Created by {self.__author__}
                             self.write(f"\n  [{i}/{len(youtube_urls)}] Processing: {url}\n", "white")
 
                             # Download the video
-                            video_path, error = self.download_youtube_video_for_slide(url)
+                            with self.profile_span('youtube_download', url=url):
+                                video_path, error = self.download_youtube_video_for_slide(url)
 
                             if video_path and os.path.exists(video_path):
                                 downloaded_count += 1
@@ -25497,7 +26173,8 @@ Created by {self.__author__}
 
             # Step 1: Convert text to TeX
             self.write("\nStep 1: Converting text to TeX...\n", "white")
-            self.convert_to_tex()
+            with self.profile_span('convert_to_tex'):
+                self.convert_to_tex()
 
             # Step 2: Add color information
             self.write("\nStep 2: Adding color definitions and XOR text color rules...\n", "white")
@@ -25507,67 +26184,71 @@ Created by {self.__author__}
                     tex_content = f.read()
 
                 # Step 2.5: Ensure all required LaTeX packages are installed locally
-                if hasattr(self, 'package_manager'):
-                    self.write("\nStep 2.5: Checking LaTeX packages (local installation)...\n", "white")
-
-                    # Parse tex_content for required packages
-                    import re
-                    required_packages = set()
-
-                    # Find all \usepackage commands
-                    usepackage_pattern = r'\\usepackage(?:\[[^\]]*\])?\{([^}]+)\}'
-                    matches = re.findall(usepackage_pattern, tex_content)
-                    for match in matches:
-                        for pkg in match.split(','):
-                            required_packages.add(pkg.strip())
-
-                    # Check for specific commands that need packages
-                    if '\\si{' in tex_content or '\\SI{' in tex_content or 'Ω' in tex_content:
-                        required_packages.add('siunitx')
-                        self.write("  ℹ Detected SI units (Ω) - siunitx package required\n", "cyan")
-                    if '\\textmu' in tex_content or '\\textendash' in tex_content:
-                        required_packages.add('textcomp')
-                        self.write("  ℹ Detected textcomp commands - textcomp package required\n", "cyan")
-                    if '\\begin{tikzpicture}' in tex_content:
-                        required_packages.add('tikz')
-                        self.write("  ℹ Detected TikZ graphics - tikz/pgf package required\n", "cyan")
-                    if '\\begin{axis}' in tex_content:
-                        required_packages.add('pgfplots')
-                        self.write("  ℹ Detected pgfplots - pgfplots package required\n", "cyan")
-                    if '\\so{' in tex_content or '\\hl{' in tex_content or '\\ul{' in tex_content:
-                        required_packages.add('soul')
-                        self.write("  ℹ Detected soul commands - soul package required\n", "cyan")
-
-                    # Install missing packages locally (no sudo required)
-                    installed_packages = []
-                    failed_packages = []
-
-                    for pkg in required_packages:
-                        # Check if already available (including local texmf)
-                        if self.package_manager.local_installer._is_package_available(pkg, 'latex'):
-                            self.write(f"  ✓ {pkg} is already available\n", "green")
-                            continue
+                with self.profile_span('package_scan') as scan:
+                    if hasattr(self, 'package_manager'):
+                        self.write("\nStep 2.5: Checking LaTeX packages (local installation)...\n", "white")
+
+                        # Parse tex_content for required packages
+                        import re
+                        required_packages = set()
+
+                        # Find all \usepackage commands
+                        usepackage_pattern = r'\\usepackage(?:\[[^\]]*\])?\{([^}]+)\}'
+                        matches = re.findall(usepackage_pattern, tex_content)
+                        for match in matches:
+                            for pkg in match.split(','):
+                                required_packages.add(pkg.strip())
+
+                        # Check for specific commands that need packages
+                        if '\\si{' in tex_content or '\\SI{' in tex_content or 'Ω' in tex_content:
+                            required_packages.add('siunitx')
+                            self.write("  ℹ Detected SI units (Ω) - siunitx package required\n", "cyan")
+                        if '\\textmu' in tex_content or '\\textendash' in tex_content:
+                            required_packages.add('textcomp')
+                            self.write("  ℹ Detected textcomp commands - textcomp package required\n", "cyan")
+                        if '\\begin{tikzpicture}' in tex_content:
+                            required_packages.add('tikz')
+                            self.write("  ℹ Detected TikZ graphics - tikz/pgf package required\n", "cyan")
+                        if '\\begin{axis}' in tex_content:
+                            required_packages.add('pgfplots')
+                            self.write("  ℹ Detected pgfplots - pgfplots package required\n", "cyan")
+                        if '\\so{' in tex_content or '\\hl{' in tex_content or '\\ul{' in tex_content:
+                            required_packages.add('soul')
+                            self.write("  ℹ Detected soul commands - soul package required\n", "cyan")
+
+                        # Install missing packages locally (no sudo required)
+                        installed_packages = []
+                        failed_packages = []
+
+                        for pkg in required_packages:
+                            # Check if already available (including local texmf)
+                            if self.package_manager.local_installer._is_package_available(pkg, 'latex'):
+                                self.write(f"  ✓ {pkg} is already available\n", "green")
+                                continue
 
-                        self.write(f"  ⚠ Missing package: {pkg}\n", "yellow")
+                            self.write(f"  ⚠ Missing package: {pkg}\n", "yellow")
 
-                        # Try local installation
-                        if self.package_manager.local_installer.ensure_package_available(pkg, 'latex'):
-                            installed_packages.append(pkg)
-                            self.write(f"  ✓ Successfully installed {pkg} locally\n", "green")
-                        else:
-                            failed_packages.append(pkg)
-                            self.write(f"  ✗ Could not install {pkg} locally\n", "red")
+                            # Try local installation
+                            if self.package_manager.local_installer.ensure_package_available(pkg, 'latex'):
+                                installed_packages.append(pkg)
+                                self.write(f"  ✓ Successfully installed {pkg} locally\n", "green")
+                            else:
+                                failed_packages.append(pkg)
+                                self.write(f"  ✗ Could not install {pkg} locally\n", "red")
 
-                    if installed_packages:
-                        self.write(f"\n✓ Installed {len(installed_packages)} package(s) locally: {', '.join(installed_packages)}\n", "green")
+                        scan.update(required=len(required_packages), installed=len(installed_packages),
+                                    failed=len(failed_packages))
+                        if installed_packages:
+                            self.write(f"\n✓ Installed {len(installed_packages)} package(s) locally: {', '.join(installed_packages)}\n", "green")
 
-                    if failed_packages:
-                        self.write(f"\n⚠ Could not install {len(failed_packages)} package(s): {', '.join(failed_packages)}\n", "yellow")
-                        self.write(f"  The PDF may still compile if these packages are not critical.\n", "yellow")
-                        self.write(f"  Manual installation instructions have been provided above.\n", "yellow")
+                        if failed_packages:
+                            self.write(f"\n⚠ Could not install {len(failed_packages)} package(s): {', '.join(failed_packages)}\n", "yellow")
+                            self.write(f"  The PDF may still compile if these packages are not critical.\n", "yellow")
+                            self.write(f"  Manual installation instructions have been provided above.\n", "yellow")
 
                 # Add color information to TeX content
-                enhanced_content = self.add_color_info_to_output(tex_content)
+                with self.profile_span('add_color_info'):
+                    enhanced_content = self.add_color_info_to_output(tex_content)
 
                 with open(tex_file, 'w', encoding='utf-8') as f:
                     f.write(enhanced_content)
@@ -25583,14 +26264,37 @@ Created by {self.__author__}
             persistent_errors = {}
             max_attempts = 5
 
+            # Aux files persist in .bsg-build/main/ between builds; the PDF is published beside the .tex
+            build_dir = build_dir_for(tex_file)
+
+            # Step 2.75: One non-halting compile that fixes every recoverable error at once
+            # (pointless when the last clean build read exactly these inputs)
+            if self.batch_fix_mode and rebuild_reason(tex_file, output_dir=build_dir) is not None:
+                self.write("\nStep 2.75: Batch-fixing all recoverable errors...\n", "white")
+                with self.profile_span('batch_fix'):
+                    batch = self.run_batch_fix_pass(tex_file, output_dir=build_dir)
+                for fix in batch['fixes']:
+                    fixes_applied.add(f"Batch fix: {fix}")
+                if batch['unfixed']:
+                    self.write("💡 Tools → Generation → Diagnose Deck locates every broken frame in one go\n", "cyan")
+
             # Step 3: Run pdflatex with smart error handling
             for attempt in range(max_attempts):
                 self.write(f"\n{'='*60}\n", "white")
                 self.write(f"COMPILATION ATTEMPT {attempt + 1}/{max_attempts}\n", "cyan")
                 self.write(f"{'='*60}\n", "white")
 
-                # Run compilation with detailed error capture
-                result = self.run_pdflatex_with_detailed_errors(tex_file)
+                # Run compilation with detailed error capture; passes repeat only while .aux/.nav/... change
+                with self.profile_span('compile_attempt', attempt=attempt + 1):
+                    result = compile_until_stable(
+                        tex_file, lambda: self.run_pdflatex_with_detailed_errors(tex_file, build_dir),
+                        progress_callback=lambda number, changed: self.write(
+                            f"\n↻ {', '.join(changed)} changed, running pass {number}\n", "cyan"),
+                        output_dir=build_dir)
+                self.profile_count('compile_attempts')
+                self.profile_count('pdflatex_passes', result['passes'])
+                if result['skipped']:
+                    self.write("✓ No input changed since the last build, PDF is up to date\n", "green")
 
                 # Check if PDF was created successfully
                 pdf_file = base_filename + '.pdf'
@@ -25625,6 +26329,9 @@ Created by {self.__author__}
                             self.write(f"  • {url}\n", "white")
                         self.write("\n  Please credit the original content creators.\n", "yellow")
 
+                    self.show_slide_preview()
+                    self.report_build_profile(tex_file)
+                    self.build_profiler = None
                     if messagebox.askyesno("Success",
                                          f"PDF generated successfully!\n\n"
                                          f"File: {os.path.basename(pdf_file)}\n"
@@ -25687,7 +26394,8 @@ Created by {self.__author__}
                             self.update_slide_list()
                             if self.current_slide_index >= 0:
                                 self.load_slide(self.current_slide_index)
-                            self.convert_to_tex()
+                            with self.profile_span('convert_to_tex'):
+                                self.convert_to_tex()
                             continue
                         elif editor.result == 'abort':
                             self.write("\n❌ Compilation aborted by user\n", "yellow")
@@ -25742,7 +26450,8 @@ Created by {self.__author__}
                                 self.update_slide_list()
                                 if self.current_slide_index >= 0:
                                     self.load_slide(self.current_slide_index)
-                                self.convert_to_tex()
+                                with self.profile_span('convert_to_tex'):
+                                    self.convert_to_tex()
                                 continue
                             elif editor.result == 'abort':
                                 self.write("\n❌ Compilation aborted by user\n", "yellow")
@@ -25805,7 +26514,8 @@ Created by {self.__author__}
                                 self.update_slide_list()
                                 if self.current_slide_index >= 0:
                                     self.load_slide(self.current_slide_index)
-                                self.convert_to_tex()
+                                with self.profile_span('convert_to_tex'):
+                                    self.convert_to_tex()
                                 continue
                             elif editor.result == 'abort':
                                 self.write("\n❌ Compilation aborted by user\n", "yellow")
@@ -25838,7 +26548,7 @@ Created by {self.__author__}
                             slide_info = f" (Slide {err.get('slide_number', 'unknown')})" if err.get('slide_number') else ""
                             self.write(f"  Attempt {err['attempt']}: {err['error_type']} at line {err['error_line']}{slide_info}\n", "yellow")
 
-                    log_file = tex_file.replace('.tex', '.log')
+                    log_file = find_build_output(tex_file, '.log')
                     if os.path.exists(log_file):
                         self.write(f"\n📋 Log file: {log_file}\n", "cyan")
                         if messagebox.askyesno("Compilation Failed",
@@ -25858,7 +26568,7 @@ Created by {self.__author__}
                 self.write(traceback.format_exc(), "red")
             messagebox.showerror("Error", f"Error generating PDF:\n{str(e)}")
 
-    def run_pdflatex_with_detailed_errors(self, tex_file: str) -> dict:
+    def run_pdflatex_with_detailed_errors(self, tex_file: str, output_dir: str = None) -> dict:
         """Run pdflatex and capture detailed error information with precise slide-based line mapping"""
         result = {
             'success': False,
@@ -25876,280 +26586,285 @@ Created by {self.__author__}
         }
 
         try:
-            tex_dir = os.path.dirname(tex_file) or '.'
-            original_dir = os.getcwd()
-            os.chdir(tex_dir)
-
+            # pdflatex runs in the deck's folder (media_files/ paths are relative to it) and
+            # writes into the build directory; the process working directory is left alone
             tex_file_abs = os.path.abspath(tex_file)
+            tex_dir = os.path.dirname(tex_file_abs)
+            output_dir = output_dir or build_dir_for(tex_file_abs)
+            pdf_file = os.path.join(output_dir, os.path.splitext(os.path.basename(tex_file_abs))[0] + '.pdf')
 
             # Read the current TeX content
             with open(tex_file_abs, 'r', encoding='utf-8', errors='ignore') as f:
                 tex_lines = f.readlines()
                 tex_content = ''.join(tex_lines)
 
-            # ========== AGGRESSIVE PRE-PROCESSING: Fix common issues ==========
-            self.write("\n🔧 Running aggressive pre-processing to fix common LaTeX errors...\n", "cyan")
-
-            fixed_content = tex_content
-            fixes_applied = []
-
-            # Fix 1: Fix unclosed math in titles (critical for the Open-Circuit Voltage error)
-            import re
-
-            lines = fixed_content.split('\n')
-            fixed_lines = []
+            with self.profile_span('tex_preprocess'):
+                # ========== AGGRESSIVE PRE-PROCESSING: Fix common issues ==========
+                self.write("\n🔧 Running aggressive pre-processing to fix common LaTeX errors...\n", "cyan")
 
-            for i, line in enumerate(lines):
-                # Check for title with unclosed math mode
-                if '\\title' in line:
-                    dollar_count = line.count('$')
-                    if dollar_count % 2 != 0:
-                        line = line.rstrip() + '$'
-                        fixes_applied.append(f"Line {i+1}: Added missing $ to close math mode in title")
-                        self.write(f"  ✓ Fixed unclosed math in title at line {i+1}\n", "green")
-
-                # Check for frame titles with unclosed math
-                elif '\\begin{frame}' in line and '$' in line:
-                    dollar_count = line.count('$')
-                    if dollar_count % 2 != 0:
-                        line = line.rstrip() + '$'
-                        fixes_applied.append(f"Line {i+1}: Added missing $ to close math mode in frame title")
-                        self.write(f"  ✓ Fixed unclosed math in frame title at line {i+1}\n", "green")
+                fixed_content = tex_content
+                fixes_applied = []
 
-                fixed_lines.append(line)
+                # Fix 1: Fix unclosed math in titles (critical for the Open-Circuit Voltage error)
+                import re
 
-            if fixes_applied:
-                fixed_content = '\n'.join(fixed_lines)
-                with open(tex_file_abs, 'w', encoding='utf-8') as f:
-                    f.write(fixed_content)
-                result['fixed'] = True
-                result['fix_description'] = '; '.join(fixes_applied[:5])
+                lines = fixed_content.split('\n')
+                fixed_lines = []
 
-                # Also update the TXT file
-                txt_file = tex_file_abs.replace('.tex', '.txt')
-                if os.path.exists(txt_file):
-                    with open(txt_file, 'r', encoding='utf-8') as f:
-                        txt_content = f.read()
-                    txt_lines = txt_content.split('\n')
-                    fixed_txt_lines = []
-                    for line in txt_lines:
-                        if '\\title' in line and line.count('$') % 2 != 0:
+                for i, line in enumerate(lines):
+                    # Check for title with unclosed math mode
+                    if '\\title' in line:
+                        dollar_count = line.count('$')
+                        if dollar_count % 2 != 0:
                             line = line.rstrip() + '$'
-                        fixed_txt_lines.append(line)
-                    with open(txt_file, 'w', encoding='utf-8') as f:
-                        f.write('\n'.join(fixed_txt_lines))
-                    self.write("  ✓ Also updated TXT file with fixes\n", "green")
-
-                # Re-read the fixed content
-                with open(tex_file_abs, 'r', encoding='utf-8', errors='ignore') as f:
-                    tex_lines = f.readlines()
-                    tex_content = ''.join(tex_lines)
+                            fixes_applied.append(f"Line {i+1}: Added missing $ to close math mode in title")
+                            self.write(f"  ✓ Fixed unclosed math in title at line {i+1}\n", "green")
 
-            # Build detailed slide map with line ranges
-            tex_slide_map = self._build_detailed_tex_slide_map(tex_lines)
-
-            # Also build TXT slide map for mapping back to source
-            txt_file = tex_file.replace('.tex', '.txt')
-            txt_slide_map = {}
-            txt_lines = []
-            if os.path.exists(txt_file):
-                with open(txt_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    txt_lines = f.readlines()
-                txt_slide_map = self._build_detailed_txt_slide_map(txt_lines)
+                    # Check for frame titles with unclosed math
+                    elif '\\begin{frame}' in line and '$' in line:
+                        dollar_count = line.count('$')
+                        if dollar_count % 2 != 0:
+                            line = line.rstrip() + '$'
+                            fixes_applied.append(f"Line {i+1}: Added missing $ to close math mode in frame title")
+                            self.write(f"  ✓ Fixed unclosed math in frame title at line {i+1}\n", "green")
+
+                    fixed_lines.append(line)
+
+                if fixes_applied:
+                    fixed_content = '\n'.join(fixed_lines)
+                    with open(tex_file_abs, 'w', encoding='utf-8') as f:
+                        f.write(fixed_content)
+                    result['fixed'] = True
+                    result['fix_description'] = '; '.join(fixes_applied[:5])
+
+                    # Also update the TXT file
+                    txt_file = tex_file_abs.replace('.tex', '.txt')
+                    if os.path.exists(txt_file):
+                        with open(txt_file, 'r', encoding='utf-8') as f:
+                            txt_content = f.read()
+                        txt_lines = txt_content.split('\n')
+                        fixed_txt_lines = []
+                        for line in txt_lines:
+                            if '\\title' in line and line.count('$') % 2 != 0:
+                                line = line.rstrip() + '$'
+                            fixed_txt_lines.append(line)
+                        with open(txt_file, 'w', encoding='utf-8') as f:
+                            f.write('\n'.join(fixed_txt_lines))
+                        self.write("  ✓ Also updated TXT file with fixes\n", "green")
+
+                    # Re-read the fixed content
+                    with open(tex_file_abs, 'r', encoding='utf-8', errors='ignore') as f:
+                        tex_lines = f.readlines()
+                        tex_content = ''.join(tex_lines)
+
+                # Build detailed slide map with line ranges
+                tex_slide_map = self._build_detailed_tex_slide_map(tex_lines)
+
+                # Also build TXT slide map for mapping back to source
+                txt_file = tex_file.replace('.tex', '.txt')
+                txt_slide_map = {}
+                txt_lines = []
+                if os.path.exists(txt_file):
+                    with open(txt_file, 'r', encoding='utf-8', errors='ignore') as f:
+                        txt_lines = f.readlines()
+                    txt_slide_map = self._build_detailed_txt_slide_map(txt_lines)
 
             # Run pdflatex
             cmd = ['pdflatex', '-interaction=nonstopmode', '-halt-on-error',
-                   '-file-line-error', tex_file_abs]
-
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                errors='replace'
-            )
-
-            error_lines = []
-            error_context_lines = []
-            in_error_context = False
-            last_slide_compiled = 0
-            actual_error_tex_line = None
-            error_message = ""
+                   '-file-line-error', *BUILD_PASS_ARGS,
+                   '-output-directory=' + os.path.relpath(output_dir, tex_dir),
+                   os.path.basename(tex_file_abs)]
 
-            # Store all line numbers found in the log
-            all_error_lines = []
-            line_context_map = {}  # Map line number to context
-
-            slide_pattern = r'\[(\d+)\]'
+            pdf_before = pdf_signature(pdf_file)
+            with self.profile_span('pdflatex'):
+                process = subprocess.Popen(
+                    cmd,
+                    cwd=tex_dir,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    bufsize=1,
+                    universal_newlines=True,
+                    errors='replace'
+                )
 
-            while True:
-                line = process.stdout.readline()
-                if not line and process.poll() is not None:
-                    break
+                error_lines = []
+                error_context_lines = []
+                in_error_context = False
+                last_slide_compiled = 0
+                actual_error_tex_line = None
+                error_message = ""
 
-                if line:
-                    # Track successfully compiled slides
-                    slide_match = re.search(slide_pattern, line)
-                    if slide_match and ']' in line and 'pdfTeX warning' not in line:
-                        slide_num = int(slide_match.group(1))
-                        if slide_num > last_slide_compiled:
-                            last_slide_compiled = slide_num
-                            result['last_successful_slide'] = slide_num
+                # Store all line numbers found in the log
+                all_error_lines = []
+                line_context_map = {}  # Map line number to context
 
-                    # CRITICAL: Collect ALL line numbers from the log
-                    line_match = re.search(r'l\.(\d+)', line)
-                    if line_match:
-                        found_line = int(line_match.group(1))
-                        all_error_lines.append(found_line)
-                        line_context_map[found_line] = line
+                slide_pattern = r'\[(\d+)\]'
 
-                    # Capture error messages - look for fatal errors
-                    if line.startswith('!'):
-                        error_message = line.strip()
-                        error_lines.append(error_message)
-                        result['errors'].append(error_message)
-                        in_error_context = True
-                        self.write(line, "red")
+                while True:
+                    line = process.stdout.readline()
+                    if not line and process.poll() is not None:
+                        break
 
-                        # If this is a fatal error, this is our target
-                        if 'Fatal error' in line or 'no output PDF' in line:
-                            # Use the last line number collected
-                            if all_error_lines:
-                                actual_error_tex_line = all_error_lines[-1]  # Use the LAST line number
-                                result['error_line_tex'] = actual_error_tex_line
-                                self.write(f"\n⚠ Fatal error at line {actual_error_tex_line}\n", "red")
+                    if line:
+                        # Track successfully compiled slides
+                        slide_match = re.search(slide_pattern, line)
+                        if slide_match and ']' in line and 'pdfTeX warning' not in line:
+                            slide_num = int(slide_match.group(1))
+                            if slide_num > last_slide_compiled:
+                                last_slide_compiled = slide_num
+                                result['last_successful_slide'] = slide_num
+
+                        # CRITICAL: Collect ALL line numbers from the log
+                        line_match = re.search(r'l\.(\d+)', line)
+                        if line_match:
+                            found_line = int(line_match.group(1))
+                            all_error_lines.append(found_line)
+                            line_context_map[found_line] = line
+
+                        # Capture error messages - look for fatal errors
+                        if line.startswith('!'):
+                            error_message = line.strip()
+                            error_lines.append(error_message)
+                            result['errors'].append(error_message)
+                            in_error_context = True
+                            self.write(line, "red")
 
-                    elif in_error_context:
-                        error_context_lines.append(line.strip())
-                        if len(error_context_lines) < 20:
-                            self.write(line, "yellow")
+                            # If this is a fatal error, this is our target
+                            if 'Fatal error' in line or 'no output PDF' in line:
+                                # Use the last line number collected
+                                if all_error_lines:
+                                    actual_error_tex_line = all_error_lines[-1]  # Use the LAST line number
+                                    result['error_line_tex'] = actual_error_tex_line
+                                    self.write(f"\n⚠ Fatal error at line {actual_error_tex_line}\n", "red")
 
-                        # Stop capturing after we see the next error or end of context
-                        if line.startswith('!') or 'l.' in line:
-                            in_error_context = False
+                        elif in_error_context:
+                            error_context_lines.append(line.strip())
+                            if len(error_context_lines) < 20:
+                                self.write(line, "yellow")
 
-                    elif 'Warning' in line:
-                        if 'Citation' in line:
-                            self.write(line, "yellow")
-                        elif 'textendash' in line:
-                            self.write(line, "yellow")
-                            result['has_math_warning'] = True
-                        else:
-                            self.write(line, "yellow")
-                    elif not line.startswith('[') and not line.startswith('('):
-                        self.write(line, "white")
+                            # Stop capturing after we see the next error or end of context
+                            if line.startswith('!') or 'l.' in line:
+                                in_error_context = False
 
-            process.wait()
+                        elif 'Warning' in line:
+                            if 'Citation' in line:
+                                self.write(line, "yellow")
+                            elif 'textendash' in line:
+                                self.write(line, "yellow")
+                                result['has_math_warning'] = True
+                            else:
+                                self.write(line, "yellow")
+                        elif not line.startswith('[') and not line.startswith('('):
+                            self.write(line, "white")
 
-            # If we found a fatal error but no line number from the pattern, check the error message
-            if actual_error_tex_line is None and all_error_lines:
-                # Use the last line number found in the log
-                actual_error_tex_line = all_error_lines[-1]
-                result['error_line_tex'] = actual_error_tex_line
-                self.write(f"\n⚠ Using last error line from log: {actual_error_tex_line}\n", "yellow")
-
-            # Find which slide contains this line
-            if actual_error_tex_line:
-                error_slide_num = None
-                for slide_num, slide_info in tex_slide_map.items():
-                    if slide_info['start_line'] <= actual_error_tex_line <= slide_info['end_line']:
-                        error_slide_num = slide_num
-                        result['slide_number'] = slide_num
-                        break
+                process.wait()
 
-                if error_slide_num:
-                    self.write(f"\n📍 ERROR LOCATED:", "red")
-                    self.write(f" Slide {error_slide_num}", "yellow")
-                    self.write(f" (TeX line {actual_error_tex_line})\n", "cyan")
-
-                    # Get the slide content
-                    slide_info = tex_slide_map[error_slide_num]
-                    self.write(f"   Slide title: {slide_info['title'][:50]}\n", "cyan")
-
-                    # Find the exact line within the slide
-                    relative_line = actual_error_tex_line - slide_info['start_line']
-                    self.write(f"   Relative position: line {relative_line} within slide\n", "cyan")
-
-                    # Map to TXT file line
-                    if error_slide_num in txt_slide_map:
-                        txt_info = txt_slide_map[error_slide_num]
-                        txt_error_line = txt_info['start_line'] + relative_line
-                        if txt_error_line <= txt_info['end_line']:
-                            result['error_line'] = txt_error_line
-                            self.write(f"   Maps to TXT line: {txt_error_line}\n", "green")
-
-                            # Show the problematic line from TXT
-                            if 1 <= txt_error_line <= len(txt_lines):
-                                problematic_line = txt_lines[txt_error_line - 1].strip()
-                                self.write(f"   Problematic content: {problematic_line[:100]}\n", "yellow")
-
-                                # Check if this is the Open-Circuit Voltage slide
-                                if 'Open-Circuit Voltage' in problematic_line or 'V_{oc}' in problematic_line:
-                                    self.write(f"\n💡 SPECIFIC FIX NEEDED:\n", "cyan")
-                                    self.write(f"   The title has unclosed math mode.\n", "yellow")
-                                    self.write(f"   Change: {problematic_line}\n", "yellow")
-                                    self.write(f"   To:     {problematic_line.rstrip()}$\n", "green")
-
-                                    # Auto-fix if possible
-                                    if problematic_line.count('$') % 2 != 0:
-                                        fixed_line = problematic_line.rstrip() + '$'
-                                        txt_lines[txt_error_line - 1] = fixed_line + '\n'
-                                        with open(txt_file, 'w', encoding='utf-8') as f:
-                                            f.writelines(txt_lines)
-                                        self.write(f"\n✓ Auto-fixed the TXT file!\n", "green")
-                                        result['fixed'] = True
-
-                                        # Regenerate TeX
-                                        from BeamerSlideGenerator import process_input_file
-                                        process_input_file(txt_file, tex_file_abs)
-                                        self.write(f"✓ Regenerated TeX file\n", "green")
-
-            # If we found an error but no slide number, try to infer
-            if error_lines and result['slide_number'] == 0 and result['last_successful_slide'] > 0:
-                result['slide_number'] = result['last_successful_slide'] + 1
-                if result['slide_number'] in txt_slide_map:
-                    result['error_line'] = txt_slide_map[result['slide_number']]['start_line']
-                    self.write(f"\n⚠ Inferring error in Slide {result['slide_number']}\n", "yellow")
-
-            # Analyze the error
-            if error_lines and not result['success']:
-                result['error_context'] = error_context_lines
+            with self.profile_span('log_analysis'):
+                # If we found a fatal error but no line number from the pattern, check the error message
+                if actual_error_tex_line is None and all_error_lines:
+                    # Use the last line number found in the log
+                    actual_error_tex_line = all_error_lines[-1]
+                    result['error_line_tex'] = actual_error_tex_line
+                    self.write(f"\n⚠ Using last error line from log: {actual_error_tex_line}\n", "yellow")
+
+                # Find which slide contains this line
+                if actual_error_tex_line:
+                    error_slide_num = None
+                    for slide_num, slide_info in tex_slide_map.items():
+                        if slide_info['start_line'] <= actual_error_tex_line <= slide_info['end_line']:
+                            error_slide_num = slide_num
+                            result['slide_number'] = slide_num
+                            break
 
-                if 'Extra }' in error_message or 'forgotten $' in error_message:
-                    result['analysis'] = {
-                        'error_type': 'extra_brace_or_forgotten_dollar',
-                        'suggestion': 'Extra } or forgotten $. This is often caused by unclosed math mode (e.g., $V_{oc} without closing $). Check for $ signs in titles.',
-                        'auto_fixable': True,
-                        'fix_type': 'fix_math_delimiters',
-                        'line': result['error_line'],
-                        'slide': result['slide_number']
-                    }
+                    if error_slide_num:
+                        self.write(f"\n📍 ERROR LOCATED:", "red")
+                        self.write(f" Slide {error_slide_num}", "yellow")
+                        self.write(f" (TeX line {actual_error_tex_line})\n", "cyan")
+
+                        # Get the slide content
+                        slide_info = tex_slide_map[error_slide_num]
+                        self.write(f"   Slide title: {slide_info['title'][:50]}\n", "cyan")
+
+                        # Find the exact line within the slide
+                        relative_line = actual_error_tex_line - slide_info['start_line']
+                        self.write(f"   Relative position: line {relative_line} within slide\n", "cyan")
+
+                        # Map to TXT file line
+                        if error_slide_num in txt_slide_map:
+                            txt_info = txt_slide_map[error_slide_num]
+                            txt_error_line = txt_info['start_line'] + relative_line
+                            if txt_error_line <= txt_info['end_line']:
+                                result['error_line'] = txt_error_line
+                                self.write(f"   Maps to TXT line: {txt_error_line}\n", "green")
+
+                                # Show the problematic line from TXT
+                                if 1 <= txt_error_line <= len(txt_lines):
+                                    problematic_line = txt_lines[txt_error_line - 1].strip()
+                                    self.write(f"   Problematic content: {problematic_line[:100]}\n", "yellow")
+
+                                    # Check if this is the Open-Circuit Voltage slide
+                                    if 'Open-Circuit Voltage' in problematic_line or 'V_{oc}' in problematic_line:
+                                        self.write(f"\n💡 SPECIFIC FIX NEEDED:\n", "cyan")
+                                        self.write(f"   The title has unclosed math mode.\n", "yellow")
+                                        self.write(f"   Change: {problematic_line}\n", "yellow")
+                                        self.write(f"   To:     {problematic_line.rstrip()}$\n", "green")
+
+                                        # Auto-fix if possible
+                                        if problematic_line.count('$') % 2 != 0:
+                                            fixed_line = problematic_line.rstrip() + '$'
+                                            txt_lines[txt_error_line - 1] = fixed_line + '\n'
+                                            with open(txt_file, 'w', encoding='utf-8') as f:
+                                                f.writelines(txt_lines)
+                                            self.write(f"\n✓ Auto-fixed the TXT file!\n", "green")
+                                            result['fixed'] = True
+
+                                            # Regenerate TeX
+                                            from BeamerSlideGenerator import process_input_file
+                                            process_input_file(txt_file, tex_file_abs)
+                                            self.write(f"✓ Regenerated TeX file\n", "green")
+
+                # If we found an error but no slide number, try to infer
+                if error_lines and result['slide_number'] == 0 and result['last_successful_slide'] > 0:
+                    result['slide_number'] = result['last_successful_slide'] + 1
+                    if result['slide_number'] in txt_slide_map:
+                        result['error_line'] = txt_slide_map[result['slide_number']]['start_line']
+                        self.write(f"\n⚠ Inferring error in Slide {result['slide_number']}\n", "yellow")
+
+                # Analyze the error
+                if error_lines and not result['success']:
+                    result['error_context'] = error_context_lines
+
+                    if 'Extra }' in error_message or 'forgotten $' in error_message:
+                        result['analysis'] = {
+                            'error_type': 'extra_brace_or_forgotten_dollar',
+                            'suggestion': 'Extra } or forgotten $. This is often caused by unclosed math mode (e.g., $V_{oc} without closing $). Check for $ signs in titles.',
+                            'auto_fixable': True,
+                            'fix_type': 'fix_math_delimiters',
+                            'line': result['error_line'],
+                            'slide': result['slide_number']
+                        }
 
-            # Show helpful context
-            if result['slide_number'] > 0 and result['error_line']:
-                self.write(f"\n" + "="*60 + "\n", "cyan")
-                self.write(f"HELPFUL CONTEXT:\n", "cyan")
-                self.write(f"="*60 + "\n", "cyan")
-                self.write(f"Error in Slide {result['slide_number']}\n", "yellow")
-                self.write(f"Open your .txt file and go to line {result['error_line']}\n", "green")
+                # Show helpful context
+                if result['slide_number'] > 0 and result['error_line']:
+                    self.write(f"\n" + "="*60 + "\n", "cyan")
+                    self.write(f"HELPFUL CONTEXT:\n", "cyan")
+                    self.write(f"="*60 + "\n", "cyan")
+                    self.write(f"Error in Slide {result['slide_number']}\n", "yellow")
+                    self.write(f"Open your .txt file and go to line {result['error_line']}\n", "green")
 
-            # Check if PDF was created
-            pdf_file = tex_file_abs.replace('.tex', '.pdf')
-            if os.path.exists(pdf_file) and os.path.getsize(pdf_file) > 0:
+            # Check if this pass wrote the PDF (a halted pass leaves the previous one in the build directory)
+            if fresh_pdf(pdf_file, pdf_before):
                 result['success'] = True
                 if result.get('fixed'):
                     self.write(f"\n✓ PDF generated successfully after auto-fix!\n", "green")
 
-            os.chdir(original_dir)
             return result
 
         except Exception as e:
             result['errors'].append(str(e))
             import traceback
             traceback.print_exc()
-            os.chdir(original_dir)
             return result
 
     def _build_detailed_tex_slide_map(self, tex_lines: list) -> dict:
@@ -26273,21 +26988,9 @@ Created by {self.__author__}
 
     def find_slide_line_number(self, tex_file: str, slide_number: int) -> int:
         """Find the line number of a specific slide in the TeX file"""
-        try:
-            with open(tex_file, 'r', encoding='utf-8', errors='ignore') as f:
-                tex_lines = f.readlines()
-
-            slide_count = 0
-            for i, line in enumerate(tex_lines):
-                if '\\frametitle' in line or '\\begin{frame}' in line:
-                    slide_count += 1
-                    if slide_count == slide_number:
-                        return i + 1  # Return 1-based line number
-
-            # If exact slide not found, return a reasonable default
-            return 1
-        except Exception:
-            return 1
+        tex_index = load_tex_slide_index(tex_file)
+        # If exact slide not found, return a reasonable default
+        return (tex_index.frame_line(slide_number) if tex_index else None) or 1
 
     def sync_slides_from_tex(self, tex_file: str) -> None:
         """Sync the slides data structure from the TeX file after fixes"""
@@ -26512,9 +27215,7 @@ Created by {self.__author__}
         }
 
         try:
-            tex_dir = os.path.dirname(tex_file) or '.'
-            original_dir = os.getcwd()
-            os.chdir(tex_dir)
+            tex_dir = os.path.dirname(os.path.abspath(tex_file))
 
             tex_file_abs = os.path.abspath(tex_file)
 
@@ -26540,6 +27241,7 @@ Created by {self.__author__}
 
             process = subprocess.Popen(
                 cmd,
+                cwd=tex_dir,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
@@ -26648,7 +27350,6 @@ Created by {self.__author__}
             if os.path.exists(pdf_file) and os.path.getsize(pdf_file) > 0:
                 result['success'] = True
 
-            os.chdir(original_dir)
             return result
 
         except Exception as e:
@@ -26824,9 +27525,197 @@ Created by {self.__author__}
             traceback.print_exc()
             return False
 
+    def run_batch_fix_pass(self, tex_file: str, max_sweeps: int = 2, output_dir: str = None) -> dict:
+        """Compile without halting, collect every error and apply all auto-fixes in one sweep"""
+        summary = {'fixes': [], 'unfixed': [], 'sweeps': 0, 'success': False}
+
+        for sweep in range(max_sweeps):
+            summary['sweeps'] = sweep + 1
+            self.write(f"\n🔧 Batch-fix sweep {sweep + 1}/{max_sweeps}: compiling without -halt-on-error...\n", "cyan")
+
+            output_dir = output_dir or build_dir_for(tex_file)
+            with build_lock(output_dir, os.path.splitext(os.path.basename(tex_file))[0]):
+                build = run_pdflatex_nonstop(tex_file, output_dir=output_dir)
+            errors = build['errors']
+            if not errors:
+                summary['success'] = os.path.exists(build['pdf']) and os.path.getsize(build['pdf']) > 0
+                summary['unfixed'] = []
+                self.write("  ✓ No errors reported by pdflatex\n", "green")
+                break
+
+            self.write(f"  Found {len(errors)} error(s) in one pass\n", "yellow")
+
+            with open(tex_file, 'r', encoding='utf-8', errors='ignore') as f:
+                tex_lines = f.readlines()
+
+            # Plan every fix against the unmodified lines, dropping duplicates of the same fix
+            planned = []
+            seen = set()
+            unfixed = []
+            for error in errors:
+                try:
+                    analysis = LaTeXErrorAnalyzer.analyze_error(
+                        error['message'], error['context'], "", error['line'], tex_lines
+                    )
+                except Exception as e:
+                    analysis = None
+                    print(f"Error analysis failed for {error['message']}: {e}")
+
+                if not analysis or not analysis.get('auto_fixable'):
+                    unfixed.append(error)
+                    continue
+
+                fix_type = analysis.get('fix_type')
+                target = analysis.get('fix_data') if fix_type == 'add_package' else (analysis.get('line') or error['line'])
+                key = (fix_type, repr(target))
+                if key in seen:
+                    continue
+                seen.add(key)
+                planned.append((analysis, error['line'] or 0))
+
+            # Line-preserving fixes bottom-up so earlier line numbers stay valid; package inserts last
+            planned.sort(key=lambda item: (item[0].get('fix_type') == 'add_package', -item[1]))
+
+            applied = []
+            for analysis, line_num in planned:
+                try:
+                    tex_lines, fix_desc, fix_count = LaTeXErrorAnalyzer.apply_fix(tex_lines, analysis, line_num or None)
+                except Exception as e:
+                    print(f"Auto-fix {analysis.get('fix_type')} failed: {e}")
+                    continue
+                if fix_count > 0:
+                    where = f" (line {line_num})" if line_num else ""
+                    applied.append(f"{fix_desc or analysis.get('error_type')}{where}")
+
+            summary['unfixed'] = unfixed
+            if not applied:
+                self.write("  ⚠ None of the reported errors can be fixed automatically\n", "yellow")
+                break
+
+            with open(tex_file, 'w', encoding='utf-8') as f:
+                f.writelines(tex_lines)
+
+            for desc in applied:
+                self.write(f"  ✓ {desc}\n", "green")
+            summary['fixes'].extend(applied)
+
+        if summary['unfixed']:
+            self.write(f"  ⚠ {len(summary['unfixed'])} error(s) need a manual fix\n", "yellow")
+
+        return summary
+
+    def diagnose_deck(self) -> None:
+        """Compile every frame in isolation across all cores and report exactly which ones fail"""
+        if not self.current_file:
+            messagebox.showwarning("Warning", "Please save your file first!")
+            return
+
+        self.save_current_slide()
+        tex_file = os.path.splitext(self.current_file)[0] + '.tex'
+        if not os.path.exists(tex_file):
+            self.convert_to_tex()
+        if not os.path.exists(tex_file):
+            self.write("⚠ Warning: TeX file not found - cannot diagnose deck\n", "yellow")
+            return
+
+        self.write("\n" + "="*60 + "\n", "cyan")
+        self.write(f"DIAGNOSING DECK ({os.cpu_count() or 1} parallel compiles)\n", "cyan")
+        self.write("="*60 + "\n", "cyan")
+
+        def report_progress(compiles, failing):
+            self.after(0, lambda: self.write(f"  … {compiles} chunk compile(s), {failing} broken frame(s) isolated\n", "white"))
+
+        def worker():
+            try:
+                report = diagnose_tex_frames(tex_file, progress_callback=report_progress)
+            except Exception as e:
+                error = str(e)
+                self.after(0, lambda: self.write(f"✗ Deck diagnosis failed: {error}\n", "red"))
+                return
+            self.after(0, lambda: self.show_deck_diagnosis(tex_file, report))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def build_package_index_async(self) -> None:
+        """Scan the local TEXMF trees in the background and rebuild the command -> package index"""
+        self.write("\n" + "="*60 + "\n", "cyan")
+        self.write("BUILDING PACKAGE INDEX\n", "cyan")
+        self.write("="*60 + "\n", "cyan")
+
+        def report_progress(files, path):
+            self.after(0, lambda: self.write(f"  … {files} package files scanned\n", "white"))
+
+        def worker():
+            try:
+                stats = build_package_index(progress_callback=report_progress)
+            except Exception as e:
+                error = str(e)
+                self.after(0, lambda: self.write(f"✗ Package index build failed: {error}\n", "red"))
+                return
+            reset_package_index()
+            if not stats['roots']:
+                self.after(0, lambda: self.write("⚠ No TEXMF tree found - is a TeX distribution installed?\n", "yellow"))
+                return
+            self.after(0, lambda: self.write(
+                f"✓ Indexed {stats['commands']} commands and {stats['environments']} environments "
+                f"from {stats['files']} packages in {stats['seconds']:.1f}s\n", "green"))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def show_deck_diagnosis(self, tex_file: str, report: dict) -> None:
+        """Print the frame diagnosis and open the first broken frame in the Error Editor"""
+        if report['preamble_errors']:
+            self.write("\n✗ The preamble itself does not compile:\n", "red")
+            for error in report['preamble_errors'][:10]:
+                self.write(f"  {error['message']}\n", "red")
+            self.write("💡 Fix the preamble (Tools → Edit Preamble...) before diagnosing frames\n", "cyan")
+            return
+
+        failing = report['failing_frames']
+        self.write(f"\n📊 {report['total_frames']} frames checked with {report['compiles']} compile(s)\n", "cyan")
+        if not failing:
+            self.write("✓ Every frame compiles on its own\n", "green")
+            return
+
+        self.write(f"✗ {len(failing)} broken frame(s):\n", "red")
+        summary_lines = []
+        for frame in failing:
+            first_error = frame['errors'][0]
+            line_info = f", TeX line {first_error['line']}" if first_error.get('line') else ""
+            entry = f"Slide {frame['number']} '{frame['title'][:40]}'{line_info}: {first_error['message']}"
+            summary_lines.append(entry)
+            self.write(f"  • {entry}\n", "yellow")
+
+        # Map the first broken frame back to the .txt source the way compile errors are mapped
+        frame = failing[0]
+        txt_file = self.current_file
+        error_line = frame['errors'][0].get('line') or frame['start_line']
+        with open(txt_file, 'r', encoding='utf-8', errors='ignore') as f:
+            txt_slide_map = self._build_detailed_txt_slide_map(f.readlines())
+        txt_info = txt_slide_map.get(frame['number'])
+        if txt_info:
+            error_line = min(txt_info['start_line'] + (error_line - frame['start_line']), txt_info['end_line'])
+
+        editor = LaTeXErrorEditor(
+            self,
+            txt_file,
+            error_line,
+            frame['errors'][0]['message'],
+            '\n'.join(summary_lines),
+            is_txt_file=True,
+            slide_num=frame['number']
+        )
+        self.wait_window(editor)
+
+        if editor.result == 'fixed':
+            self.update_slide_list()
+            if self.current_slide_index >= 0:
+                self.load_slide(self.current_slide_index)
+            self.convert_to_tex()
+
     def show_latex_log(self, tex_file: str):
         """Display the LaTeX log file for debugging"""
-        log_file = tex_file.replace('.tex', '.log')
+        log_file = find_build_output(tex_file, '.log')
         if os.path.exists(log_file):
             dialog = ctk.CTkToplevel(self)
             dialog.title("LaTeX Compilation Log")
@@ -26926,9 +27815,7 @@ Created by {self.__author__}
         }
 
         try:
-            tex_dir = os.path.dirname(tex_file) or '.'
-            original_dir = os.getcwd()
-            os.chdir(tex_dir)
+            tex_dir = os.path.dirname(os.path.abspath(tex_file))
 
             tex_file_abs = os.path.abspath(tex_file)
 
@@ -26951,6 +27838,7 @@ Created by {self.__author__}
 
                 process = subprocess.Popen(
                     cmd,
+                    cwd=tex_dir,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
                     text=True,
@@ -27028,7 +27916,6 @@ Created by {self.__author__}
                             if 'Citation' in line and 'undefined' in line:
                                 self.write(f"  {line.strip()}\n", "yellow")
 
-            os.chdir(original_dir)
             return result
 
         except Exception as e:
@@ -27539,18 +28426,17 @@ Created by {self.__author__}
             'aborted': False
         }
 
-        original_dir = os.getcwd()
         max_attempts = 5
         attempt = 0
         last_error_key = None
 
         try:
-            tex_dir = os.path.dirname(tex_file) or '.'
-            os.chdir(tex_dir)
-
             # Make sure tex_file is absolute path
             tex_file_abs = os.path.abspath(tex_file)
             txt_file_abs = tex_file_abs.replace('.tex', '.txt')
+            tex_dir = os.path.dirname(tex_file_abs)
+            output_dir = build_dir_for(tex_file_abs)
+            build_base = os.path.join(output_dir, os.path.splitext(os.path.basename(tex_file_abs))[0])
 
             while attempt < max_attempts and not result['aborted']:
                 attempt += 1
@@ -27571,12 +28457,15 @@ Created by {self.__author__}
                     except Exception as e:
                         self.write(f"✗ Error regenerating TeX: {e}\n", "red")
 
-                # Run pdflatex
+                # Run pdflatex in the deck's folder, writing into its build directory
                 cmd = ['pdflatex', '-interaction=nonstopmode', '-halt-on-error',
-                       '-file-line-error', tex_file_abs]
+                       '-file-line-error', '-output-directory=' + os.path.relpath(output_dir, tex_dir),
+                       os.path.basename(tex_file_abs)]
 
+                pdf_before = pdf_signature(build_base + '.pdf')
                 process = subprocess.Popen(
                     cmd,
+                    cwd=tex_dir,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
                     text=True,
@@ -27613,20 +28502,22 @@ Created by {self.__author__}
                                 self.write(line, "white")
 
                 # Check if compilation was successful
-                pdf_file = tex_file_abs.replace('.tex', '.pdf')
-                if os.path.exists(pdf_file) and os.path.getsize(pdf_file) > 0:
-                    log_file = tex_file_abs.replace('.tex', '.log')
+                pdf_file = build_base + '.pdf'
+                if fresh_pdf(pdf_file, pdf_before):
+                    log_file = build_base + '.log'
                     if os.path.exists(log_file):
                         with open(log_file, 'r') as f:
                             log_content = f.read()
                             if 'Fatal error' not in log_content:
                                 result['success'] = True
+                                pdf_file = publish_pdf(pdf_file, os.path.splitext(tex_file_abs)[0] + '.pdf')
                                 result['pdf_path'] = pdf_file
                                 size = os.path.getsize(pdf_file)
                                 self.write(f"\n✓ PDF generated: {os.path.basename(pdf_file)} ({self.format_file_size(size)})\n", "green")
                                 return result
                     else:
                         result['success'] = True
+                        pdf_file = publish_pdf(pdf_file, os.path.splitext(tex_file_abs)[0] + '.pdf')
                         result['pdf_path'] = pdf_file
                         size = os.path.getsize(pdf_file)
                         self.write(f"\n✓ PDF generated: {os.path.basename(pdf_file)} ({self.format_file_size(size)})\n", "green")
@@ -27634,7 +28525,7 @@ Created by {self.__author__}
 
                 # If no error detected but PDF not created, check log file
                 if not error_found:
-                    log_file = tex_file_abs.replace('.tex', '.log')
+                    log_file = build_base + '.log'
                     if os.path.exists(log_file):
                         exact_error_line, error_message, error_context = self.parse_latex_log(log_file)
                         if exact_error_line:
@@ -27791,12 +28682,6 @@ Created by {self.__author__}
             result['fatal_error'] = True
             return result
 
-        finally:
-            try:
-                os.chdir(original_dir)
-            except:
-                pass
-
     def find_error_line_in_log(self, tex_file: str, error_message: str) -> int:
         """
         Find the error line number by examining the LaTeX log file.
@@ -27954,6 +28839,192 @@ Created by {self.__author__}
         else:
             messagebox.showwarning("Warning", "PDF file not found. Generate it first!")
 
+    def create_preview_pane(self) -> None:
+        """Create the slide preview pane showing pages of the last built PDF"""
+        self.slide_preview = PageRenderCache(width=360) if preview_available() else None
+        self.preview_page = None
+        self.preview_pane_visible = True
+        self._preview_click_job = None
+
+        self.preview_pane = ctk.CTkFrame(self, width=380)
+        self.preview_pane.grid(row=1, column=2, sticky="nsew", padx=5, pady=5)
+
+        header = ctk.CTkFrame(self.preview_pane)
+        header.pack(fill="x", padx=5, pady=5)
+        ctk.CTkButton(header, text="◀", width=30, command=lambda: self.step_preview_page(-1)).pack(side="left", padx=2)
+        self.preview_page_label = ctk.CTkLabel(header, text="Slide preview")
+        self.preview_page_label.pack(side="left", expand=True)
+        ctk.CTkButton(header, text="▶", width=30, command=lambda: self.step_preview_page(1)).pack(side="right", padx=2)
+
+        message = "Build the PDF to see the slide here" if self.slide_preview else \
+            "Install PyMuPDF for the slide preview\n(pip install PyMuPDF)"
+        self.preview_image_label = ctk.CTkLabel(self.preview_pane, text=message, width=360, height=203)
+        self.preview_image_label.pack(padx=5, pady=5)
+        self.preview_image_label.bind("<Button-1>", self.on_preview_click)
+        self.preview_image_label.bind("<Double-Button-1>", self.on_preview_double_click)
+
+    def toggle_slide_preview(self) -> None:
+        """Show or hide the slide preview pane"""
+        self.preview_pane_visible = not self.preview_pane_visible
+        if self.preview_pane_visible:
+            self.preview_pane.grid()
+            self.show_slide_preview()
+        else:
+            self.preview_pane.grid_remove()
+
+    def preview_pdf_path(self) -> str:
+        """The PDF the preview pane shows: the one built beside the open file"""
+        return os.path.splitext(self.current_file)[0] + '.pdf' if self.current_file else None
+
+    def slide_page_number(self, index: int) -> int:
+        """PDF page of a slide, from the SyncTeX data of the last build when there is some"""
+        index = min(max(index, 0), len(self.slides) - 1)
+        synctex, tex_index = self.build_source_maps()
+        if synctex and tex_index:
+            number = self.marker_for_slide(index, tex_index)
+            lines = tex_index.slide_range(number) if number else None
+            page = synctex.page_for_lines(*lines) if lines else None
+            if page:
+                return page
+        # Without SyncTeX: the title page comes first and fully masked slides are not built
+        return 1 + sum(1 for slide in self.slides[:index + 1] if not slide.get('_fully_masked'))
+
+    def build_source_maps(self) -> tuple:
+        """SyncTeX map and slide-marker index of the open deck's last build; (None, None) before one"""
+        if not self.current_file:
+            return None, None
+        tex_file = os.path.splitext(self.current_file)[0] + '.tex'
+        if not os.path.exists(tex_file):
+            return None, None
+        return load_synctex(tex_file, find_build_output(tex_file, SYNCTEX_SUFFIX)), load_tex_slide_index(tex_file)
+
+    def _normalized_title(self, index: int) -> str:
+        return ' '.join(str(self.slides[index].get('title', '')).split())
+
+    def marker_for_slide(self, index: int, tex_index):
+        """Generator slide number of an editor slide, matched by position and checked by title"""
+        title = self._normalized_title(index)
+        position = tex_index.marker_positions.get(index + 1)
+        if position is not None and tex_index.markers[position][1] == title:
+            return index + 1
+        numbers = [number for number, marker_title in tex_index.markers if marker_title == title]
+        if numbers:
+            return min(numbers, key=lambda number: abs(number - index - 1))
+        return index + 1 if position is not None else None
+
+    def slide_for_marker(self, number: int, title: str) -> int:
+        """Editor slide of a generator slide number, matched by position and checked by title"""
+        if 0 <= number - 1 < len(self.slides) and self._normalized_title(number - 1) == title:
+            return number - 1
+        matches = [i for i in range(len(self.slides)) if self._normalized_title(i) == title]
+        if matches:
+            return min(matches, key=lambda i: abs(i - number + 1))
+        return min(max(number - 1, 0), len(self.slides) - 1)
+
+    def source_for_page(self, page: int, y: float = None):
+        """Slide, field and line behind a point of a PDF page (y in points from the top), or None"""
+        synctex, tex_index = self.build_source_maps()
+        if not synctex or not tex_index or not self.slides:
+            return None
+        tex_line = synctex.line_for_page(page, y)
+        marker = tex_index.slide_for_line(tex_line) if tex_line else None
+        if not marker:
+            return None
+        index = self.slide_for_marker(*marker)
+        field, line = self._match_slide_line(index, tex_index.line_text(tex_line))
+        return {'deck': self.search_deck_key(), 'slide': index, 'field': field, 'line': line, 'tex_line': tex_line}
+
+    def _match_slide_line(self, index: int, tex_text: str) -> tuple:
+        """The content or notes line of a slide sharing most words with a generated tex line"""
+        def words(text):
+            return set(re.findall(r'[^\W\d_]{3,}|\d+', re.sub(r'\\[A-Za-z]+', ' ', text).lower()))
+
+        wanted = words(tex_text)
+        best, best_score = ('title', 0), 0
+        slide = self.slides[index]
+        for field in ('content', 'notes'):
+            for line, text in enumerate(slide.get(field, [])):
+                score = len(wanted & words(str(text)))
+                if score > best_score:
+                    best, best_score = (field, line), score
+        return best
+
+    def on_preview_click(self, event) -> None:
+        """Jump to the clicked source once it is clear the click is not the start of a double-click"""
+        if self._preview_click_job is not None:
+            self.after_cancel(self._preview_click_job)
+        # Tk's double-click window on X11 is 500 ms
+        self._preview_click_job = self.after(500, lambda: self._run_preview_click(event))
+
+    def _run_preview_click(self, event) -> None:
+        """Delayed single-click action of the preview"""
+        self._preview_click_job = None
+        self.jump_to_preview_source(event)
+
+    def on_preview_double_click(self, event) -> None:
+        """Open the PDF, dropping the jump queued by the double-click's first click"""
+        if self._preview_click_job is not None:
+            self.after_cancel(self._preview_click_job)
+            self._preview_click_job = None
+        self.preview_pdf()
+
+    def jump_to_preview_source(self, event) -> None:
+        """Select the slide and line behind the clicked point of the preview"""
+        image = getattr(self, 'preview_bitmap', None)
+        if self.preview_page is None or image is None:
+            return
+        # The label centres the bitmap; its scale maps pixels back to PDF points
+        offset = max(0, (self.preview_image_label.winfo_height() - image.height) // 2)
+        scale = image.info.get('scale') or 1.0
+        target = self.source_for_page(self.preview_page, max(0, event.y - offset) / scale)
+        if target is None:
+            self.write(f"ℹ No source slide recorded for page {self.preview_page} (rebuild to add SyncTeX data)\n", "yellow")
+            return
+        self.jump_to_search_hit(target)
+
+    def show_slide_preview(self, index: int = None) -> None:
+        """Show the page of a slide (default: the current one) in the preview pane"""
+        if not getattr(self, 'slide_preview', None) or not self.preview_pane_visible or not self.slides:
+            return
+        index = self.current_slide_index if index is None else index
+        self.show_preview_page(self.slide_page_number(index))
+
+    def show_preview_page(self, page: int) -> None:
+        """Show a PDF page in the preview pane, rendering it in the background if it is not cached"""
+        pdf_file = self.preview_pdf_path()
+        if not pdf_file or not os.path.exists(pdf_file):
+            self.preview_image_label.configure(image=None, text="Build the PDF to see the slide here")
+            self.preview_page_label.configure(text="Slide preview")
+            return
+
+        self.preview_page = page
+        image = self.slide_preview.request(
+            pdf_file, page,
+            callback=lambda rendered, bitmap: self.after(0, lambda: self._display_preview_page(rendered, bitmap)))
+        if image is not None:
+            self._display_preview_page(page, image)
+        else:
+            self.preview_page_label.configure(text=f"Page {page} (rendering...)")
+
+    def _display_preview_page(self, page: int, image) -> None:
+        """Put a rendered page into the pane unless the user has moved on"""
+        if page != self.preview_page:
+            return
+        self.preview_bitmap = image
+        self.preview_photo = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+        self.preview_image_label.configure(image=self.preview_photo, text="")
+        pages = self.slide_preview.page_count(self.preview_pdf_path())
+        self.preview_page_label.configure(text=f"Page {page} of {pages}" if pages else f"Page {page}")
+
+    def step_preview_page(self, delta: int) -> None:
+        """Move the preview to the previous or next PDF page"""
+        if not getattr(self, 'slide_preview', None) or self.preview_page is None:
+            return
+        pages = self.slide_preview.page_count(self.preview_pdf_path()) or self.preview_page + delta
+        page = min(max(self.preview_page + delta, 1), pages)
+        if page != self.preview_page:
+            self.show_preview_page(page)
+
 #------------------------------------------------------------------------------------------------------------------
 
     def new_slide(self) -> None:
@@ -28096,6 +29167,7 @@ Created by {self.__author__}
                 self.slides.append(new_slide)
                 self.current_slide_index = len(self.slides) - 1
                 self.update_slide_list()
+                self.update_search_index(self.current_slide_index)
             return
 
         # Normal slide save for existing slides
@@ -28180,6 +29252,8 @@ Created by {self.__author__}
                        f"media_masked={media_masked}, content_lines={len(content_with_hidden)}, "
                        f"notes_lines={len(notes_with_hidden)}")
 
+            self.update_search_index(self.current_slide_index)
+
     def mask_line_in_editor(self, event=None):
         """Mask/unmask the current line in the focused editor (Ctrl+Delete in editors)"""
         focused_widget = self.focus_get()
@@ -28496,8 +29570,8 @@ Created by {self.__author__}
 
             self.current_file = filename
             global working_folder
-            working_folder = os.path.dirname(filename) or '.'
-            os.chdir(working_folder)
+            working_folder = os.path.dirname(os.path.abspath(filename))
+            set_default_deck_base_dir(working_folder)
             if hasattr(self, 'terminal'):
                 self.terminal.set_working_directory(working_folder)
 
@@ -28533,7 +29607,13 @@ Created by {self.__author__}
                 # Update the file with merged preamble
                 # ============================================================
                 doc_pos = content.find('\\begin{document}')
-                if doc_pos != -1:
+                if doc_pos != -1 and merged_preamble.strip() == content[:doc_pos].strip():
+                    # Merge was a no-op (or a cache hit): keep the file as it is on disk
+                    self.preamble_from_file = merged_preamble
+                    self.preamble_origin = 'merged'
+                    self.custom_preamble = merged_preamble
+                    self.using_custom_preamble = True
+                elif doc_pos != -1:
                     document_body = content[doc_pos:]
                     new_content = merged_preamble + "\n\n" + document_body
                     with open(filename, 'w', encoding='utf-8') as f:
@@ -28793,6 +29873,7 @@ Created by {self.__author__}
             # UPDATE UI
             # ============================================================
             self.update_slide_list()
+            self.mark_deck_saved()
             self.write(f"✓ Loaded {len(self.slides)} slides from {os.path.basename(filename)}\n", "green")
 
             self._is_loading = False
@@ -28884,8 +29965,8 @@ Created by {self.__author__}
             self.current_file = filename
 
         # Update global working folder and terminal
-        working_folder = os.path.dirname(filename) or '.'
-        os.chdir(working_folder)
+        working_folder = os.path.dirname(os.path.abspath(filename))
+        set_default_deck_base_dir(working_folder)
         if hasattr(self, 'terminal'):
             self.terminal.set_working_directory(working_folder)
 
@@ -28914,6 +29995,7 @@ Created by {self.__author__}
                 f.write(content)
 
             self.current_file = filename
+            self.mark_deck_saved()
             self.write(f"✓ File saved: {os.path.basename(filename)}\n", "green")
 
             # Update recent files list
@@ -31004,13 +32086,38 @@ Created by {self.__author__}
                 self.presentation_info['institute'] = institute_match.group(1)
 
             # ============================================================
-            # STEP 2: FIX CUSTOM COMMANDS - PERMANENTLY
+            # STEP 1.5: REUSE AN EARLIER MERGE OF THE SAME PREAMBLE
             # ============================================================
-            self.write("\n🔧 Fixing conflicting custom commands...\n", "cyan")
-            fixed_preamble, resolutions = self.fix_custom_commands_with_conflict_resolution(
-                file_preamble,
-                parent=self
+            default_preamble = get_beamer_preamble(
+                "Title", "Subtitle", "Author", "Institution", "Short Inst", "\\today"
             )
+            cache_key = PreambleMergeCache.make_key(file_preamble, default_preamble)
+            cached = PreambleMergeCache.get(cache_key)
+
+            if cached is not None and cached['merged'] == file_preamble:
+                # Already merged when the deck was last opened: only the slides may need cleaning up
+                self.write("  ✓ Preamble unchanged since last merge (cached) - skipping merge\n", "green")
+                self._remove_empty_slides(file_path, content)
+                self.preamble_from_file = file_preamble
+                self.preamble_origin = 'merged'
+                self.custom_preamble = file_preamble
+                self.using_custom_preamble = True
+                self._is_merging = False
+                return file_preamble
+
+            # ============================================================
+            # STEP 2: FIX CUSTOM COMMANDS - PERMANENTLY
+            # ============================================================
+            if cached is not None:
+                self.write("\n🔧 Applying cached conflict resolution...\n", "cyan")
+                fixed_preamble, resolutions = cached['merged'], cached.get('resolutions', {})
+            else:
+                self.write("\n🔧 Fixing conflicting custom commands...\n", "cyan")
+                fixed_preamble, resolutions = self.fix_custom_commands_with_conflict_resolution(
+                    file_preamble,
+                    parent=self
+                )
+                PreambleMergeCache.put(cache_key, fixed_preamble, resolutions)
 
             if resolutions:
                 self.write(f"✓ Resolved {len(resolutions)} conflicts\n", "green")
@@ -31039,31 +32146,7 @@ Created by {self.__author__}
             # ============================================================
             # STEP 4: REMOVE EMPTY SLIDES FROM CONTENT
             # ============================================================
-            self.write("\n🔧 Cleaning up empty slides...\n", "cyan")
-
-            # Find all \title blocks and identify empty ones
-            title_pattern = r'\\title\s*\n\s*\\begin{Content}\s*\\None\s*%?\s*\[?[^\]]*\]?\s*\\end{Content}\s*\\begin{Notes}\s*%?\s*\[?[^\]]*\]?\s*\\end{Notes}'
-
-            # Check if there's an empty slide
-            if re.search(title_pattern, content, re.DOTALL):
-                # Remove ALL empty slides (the one at the beginning and any others)
-                cleaned_content = re.sub(title_pattern, '', content, flags=re.DOTALL)
-
-                # Also remove the standalone \title with nothing after it
-                cleaned_content = re.sub(r'\\title\s*\n\s*\\begin{Content}\s*\\None\s*%?\s*.*?\\end{Content}\s*\\begin{Notes}\s*%?\s*.*?\\end{Notes}\s*\n?', '', cleaned_content, flags=re.DOTALL)
-
-                # Clean up extra newlines
-                cleaned_content = re.sub(r'\n\s*\n\s*\n', '\n\n', cleaned_content)
-
-                # Write the cleaned content back
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(cleaned_content)
-
-                self.write("  ✓ Removed empty slides from file\n", "green")
-
-                # Re-read the cleaned content
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = cleaned_content
+            content = self._remove_empty_slides(file_path, content)
 
             # ============================================================
             # STEP 5: EXTRACT AND STORE THE FINAL PREAMBLE
@@ -31076,8 +32159,9 @@ Created by {self.__author__}
                 self.custom_preamble = final_preamble
                 self.using_custom_preamble = True
 
-                # Store the fixed preamble in the file
-                self._update_file_preamble(file_path, final_preamble)
+                # Steps 3 and 4 already wrote the file if anything changed; key the cache on what it holds
+                PreambleMergeCache.put(PreambleMergeCache.make_key(final_preamble, default_preamble),
+                                       final_preamble)
 
                 self.write(f"\n✅ Preamble merged and saved successfully\n", "green")
                 self._is_merging = False
@@ -31093,6 +32177,35 @@ Created by {self.__author__}
             self._is_merging = False
             return self.get_custom_preamble()
 
+    def _remove_empty_slides(self, file_path: str, content: str) -> str:
+        """Drop placeholder slides (\\title with \\None content and empty notes) from the file; returns the content"""
+        import re
+
+        self.write("\n🔧 Cleaning up empty slides...\n", "cyan")
+
+        # Find all \title blocks and identify empty ones
+        title_pattern = r'\\title\s*\n\s*\\begin{Content}\s*\\None\s*%?\s*\[?[^\]]*\]?\s*\\end{Content}\s*\\begin{Notes}\s*%?\s*\[?[^\]]*\]?\s*\\end{Notes}'
+
+        # Check if there's an empty slide
+        if not re.search(title_pattern, content, re.DOTALL):
+            return content
+
+        # Remove ALL empty slides (the one at the beginning and any others)
+        cleaned_content = re.sub(title_pattern, '', content, flags=re.DOTALL)
+
+        # Also remove the standalone \title with nothing after it
+        cleaned_content = re.sub(r'\\title\s*\n\s*\\begin{Content}\s*\\None\s*%?\s*.*?\\end{Content}\s*\\begin{Notes}\s*%?\s*.*?\\end{Notes}\s*\n?', '', cleaned_content, flags=re.DOTALL)
+
+        # Clean up extra newlines
+        cleaned_content = re.sub(r'\n\s*\n\s*\n', '\n\n', cleaned_content)
+
+        # Write the cleaned content back
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(cleaned_content)
+
+        self.write("  ✓ Removed empty slides from file\n", "green")
+        return cleaned_content
+
     def _update_file_preamble(self, file_path: str, new_preamble: str) -> bool:
         """
         Update the preamble in the file while preserving the document body.
@@ -32630,9 +33743,7 @@ Created by {self.__author__}
                 messagebox.showerror("Error", f"PDF not found:\n{os.path.basename(both_pdf)}")
                 return
 
-            # Ensure we're in a stable directory before launching pympress
-            os.chdir(current_dir)
-            self.write(f"\n📂 Working directory: {os.getcwd()}\n", "cyan")
+            self.write(f"\n📂 Working directory: {current_dir}\n", "cyan")
 
             # ============================================================
             # STEP 5: Launch pympress with the _both PDF
@@ -32651,7 +33762,7 @@ Created by {self.__author__}
             for path in pympress_paths:
                 if path and os.path.exists(path):
                     self.write(f"  Using pympress: {path}\n", "cyan")
-                    subprocess.Popen([path, both_pdf])
+                    subprocess.Popen([path, both_pdf], cwd=current_dir)
                     launched = True
                     break
 
@@ -32659,7 +33770,7 @@ Created by {self.__author__}
                 # Try using python -m pympress
                 try:
                     self.write("  Trying: python -m pympress\n", "cyan")
-                    subprocess.Popen([sys.executable, "-m", "pympress", both_pdf])
+                    subprocess.Popen([sys.executable, "-m", "pympress", both_pdf], cwd=current_dir)
                     launched = True
                 except Exception as e:
                     self.write(f"  Failed: {str(e)}\n", "yellow")
@@ -32950,40 +34061,7 @@ Created by {self.__author__}
 
     def add_color_info_to_output(self, content):
         """Add color information to generated output"""
-        color_info = """
-    % Color Information for TikZ Figures
-    % Use these color definitions for consistent theming
-    % Text colors are automatically chosen using XOR rule
-
-    % Default color palette
-    \\definecolor{airis4d_blue}{RGB}{41,128,185}
-    \\definecolor{airis4d_green}{RGB}{39,174,96}
-    \\definecolor{airis4d_orange}{RGB}{243,156,18}
-    \\definecolor{airis4d_red}{RGB}{231,76,60}
-    \\definecolor{airis4d_purple}{RGB}{155,89,182}
-    \\definecolor{airis4d_teal}{RGB}{26,188,156}
-    \\definecolor{airis4d_gray}{RGB}{149,165,166}
-
-    % XOR Rule for text colors:
-    % - Use text=white on dark backgrounds (luminance < 0.179)
-    % - Use text=black on light backgrounds (luminance > 0.179)
-
-    % Example usage:
-    % \\node[fill=airis4d_blue, text=white] {White text on blue};
-    % \\node[fill=airis4d_orange, text=black] {Black text on orange};
-    """
-
-        # Insert color info after the document class
-        if "\\documentclass" in content:
-            parts = content.split("\\documentclass", 1)
-            new_content = parts[0] + "\\documentclass" + parts[1].replace(
-                "\\begin{document}",
-                color_info + "\n\\begin{document}",
-                1
-            )
-            return new_content
-
-        return color_info + "\n" + content
+        return add_color_definitions(content)
 
     def _generate_layout_latex(self, layout_type: str, layout_params: str, content: list, title: str) -> str:
         """
@@ -35214,7 +36292,7 @@ Created by {self.__author__}
         import urllib.request
         import hashlib
 
-        os.makedirs('media_files', exist_ok=True)
+        os.makedirs(project_media_dir(), exist_ok=True)
 
         # Create unique filename from URL
         url_hash = hashlib.md5(url.encode()).hexdigest()[:16]
@@ -35225,9 +36303,9 @@ Created by {self.__author__}
         filename = f"url_image_{url_hash}.{extension}"
         filepath = os.path.join('media_files', filename)
 
-        if not os.path.exists(filepath):
+        if not os.path.exists(resolve_deck_path(filepath)):
             try:
-                urllib.request.urlretrieve(url, filepath)
+                urllib.request.urlretrieve(url, resolve_deck_path(filepath))
                 self.write(f"✓ Downloaded image from URL: {filename}\n", "green")
             except Exception as e:
                 self.write(f"✗ Failed to download image: {e}\n", "red")
@@ -35274,7 +36352,7 @@ Created by {self.__author__}
         try:
             import yt_dlp
 
-            os.makedirs('media_files', exist_ok=True)
+            os.makedirs(project_media_dir(), exist_ok=True)
 
             # Get video info for filename
             with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
@@ -35291,7 +36369,7 @@ Created by {self.__author__}
             # Download the video
             ydl_opts = {
                 'format': 'best[ext=mp4]/best',
-                'outtmpl': output_path,
+                'outtmpl': resolve_deck_path(output_path),
                 'quiet': False,
                 'no_warnings': False,
             }
@@ -35299,12 +36377,12 @@ Created by {self.__author__}
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 ydl.download([url])
 
-            if os.path.exists(output_path):
+            if os.path.exists(resolve_deck_path(output_path)):
                 # Generate preview thumbnail
-                preview_path = self.generate_video_preview(output_path)
+                preview_path = self.generate_video_preview(resolve_deck_path(output_path))
 
                 # Save source attribution
-                self.save_video_attribution(url, output_path)
+                self.save_video_attribution(url, resolve_deck_path(output_path))
 
                 return output_path, None
             else:
@@ -35364,14 +36442,14 @@ Created by {self.__author__}
             updated_content = content
             for url in youtube_urls:
                 # Find the local video file
-                video_files = glob.glob(f"media_files/*.mp4")
+                video_files = glob.glob(project_media_dir("*.mp4"))
                 for video_file in video_files:
                     attribution_file = video_file.rsplit('.', 1)[0] + '_attribution.txt'
                     if os.path.exists(attribution_file):
                         with open(attribution_file, 'r') as af:
                             if url in af.read():
                                 # Replace URL with local path
-                                local_path = video_file
+                                local_path = os.path.join('media_files', os.path.basename(video_file))
                                 # Update the directive in the content
                                 updated_content = updated_content.replace(
                                     f"\\play \\url {url}",
@@ -35540,6 +36618,32 @@ Created by {self.__author__}
                     missing.add(pkg)
                     break
 
+        # Everything else the local TeX installation defines, via the package index
+        index = get_package_index()
+        if index is not None:
+            loaded = {'beamer', KERNEL_PACKAGE}
+            defined = set()
+            for source in (content, getattr(self, 'preamble_from_file', None) or ''):
+                for pkg_list in re.findall(r'\\usepackage(?:\[[^\]]*\])?\{([^}]+)\}', source):
+                    loaded.update(pkg.strip() for pkg in pkg_list.split(','))
+                # The deck's own definitions need no package
+                defined.update(('command', name) for name in re.findall(
+                    r'\\(?:(?:re|provide)?newcommand|providecommand|DeclareRobustCommand|DeclareMathOperator|'
+                    r'NewDocumentCommand|[egx]?def|let)\*?\s*\{?\s*\\([A-Za-z]+)', source))
+                defined.update(('environment', name) for name in re.findall(
+                    r'\\(?:re)?newenvironment\*?\s*\{([A-Za-z]+\*?)\}', source))
+            available = index.requires_closure(frozenset(loaded | missing))
+
+            used = [(name, 'command') for name in set(re.findall(r'\\([A-Za-z]+)', content))]
+            used += [(name, 'environment') for name in set(re.findall(r'\\begin\{([A-Za-z]+\*?)\}', content))]
+            for name, kind in used:
+                if (kind, name) in defined:
+                    continue
+                packages = index.packages_for(name, kind)
+                # Names defined all over the tree are too ambiguous to act on
+                if packages and len(packages) <= 5 and not available.intersection(packages):
+                    missing.add(packages[0])
+
         return missing
 
     def generate_preamble_block(self, extracted: dict, missing_packages: set) -> str:
@@ -38553,7 +39657,7 @@ Created by {self.__author__}
             'video': [('MP4 files', '*.mp4'), ('AVI files', '*.avi'), ('All files', '*.*')]
         }
 
-        initialdir = os.path.abspath('media_files')
+        initialdir = project_media_dir()
         if not os.path.exists(initialdir):
             os.makedirs(initialdir, exist_ok=True)
 
@@ -38606,11 +39710,21 @@ Created by {self.__author__}
                 self.write_to_terminal("❌ Export cancelled\n", "yellow")
                 return
 
-            # Continue with zip creation...
-            with open(tex_file, 'r', encoding='utf-8') as f:
-                tex_content = f.read()
+            # Media list comes from the generator's manifest; the .tex is only scanned if it is stale
+            assets = self.get_media_assets(tex_file)
+            missing = set(os.path.relpath(name, 'media_files') for name, entry in assets.items()
+                          if not entry.get('exists'))
 
-            # ... rest of the zip creation code ...
+            role_types = {'image': 'images', 'preview': 'images', 'video': 'videos',
+                          'animation': 'animations', 'audio': 'audio'}
+            media_types = {'images': [], 'videos': [], 'audio': [], 'animations': [], 'other': []}
+            for name, entry in assets.items():
+                if entry.get('exists'):
+                    media_types[role_types.get(entry['role'], 'other')].append(os.path.relpath(name, 'media_files'))
+            verified = set(file for files in media_types.values() for file in files)
+            manifest_text = self.create_manifest(tex_file, verified, missing, media_types)
+
+            self.export_archive_async(zip_filename, tex_file, assets, {'manifest.txt': manifest_text}, len(missing))
 
         except Exception as e:
             error_msg = f"Error creating zip file: {str(e)}"
@@ -38618,6 +39732,57 @@ Created by {self.__author__}
             traceback.print_exc()
             messagebox.showerror("Error", f"Error creating zip file:\n{str(e)}", parent=self)
 
+    def export_archive_async(self, zip_filename: str, tex_file: str, assets: dict,
+                             extra_entries: dict = None, missing_count: int = 0) -> None:
+        """Stream the deck archive on a worker thread, reporting progress in the terminal"""
+        if getattr(self, '_export_running', False):
+            self.write_to_terminal("⚠ An export is already running\n", "yellow")
+            return
+        self._export_running = True
+        self.write_to_terminal(f"\n📦 Exporting to {os.path.basename(zip_filename)}...\n", "cyan")
+
+        last_report = [0.0]
+
+        def report_progress(done, total, arcname):
+            # At most a few terminal lines per second, whatever the number of files
+            now = time.time()
+            if now - last_report[0] < 0.5 and done < total:
+                return
+            last_report[0] = now
+            percent = done * 100 / total if total else 100
+            self.after(0, lambda: self.write_to_terminal(
+                f"  … {percent:5.1f}%  {self.format_file_size(done)} / {self.format_file_size(total)}  {arcname}\n"))
+
+        def worker():
+            try:
+                report = export_deck_archive(zip_filename, tex_file, assets, extra_entries,
+                                             progress_callback=report_progress)
+            except Exception as e:
+                error = str(e)
+                self.after(0, lambda: self.write_to_terminal(f"✗ Error creating zip file: {error}\n", "red"))
+            else:
+                self.after(0, lambda: self.show_export_result(report, missing_count))
+            finally:
+                self._export_running = False
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def show_export_result(self, report: dict, missing_count: int = 0) -> None:
+        """Summarize a finished archive export"""
+        zip_filename = report['zip_path']
+        if report['mode'] == 'incremental':
+            self.write_to_terminal(f"✓ Updated {os.path.basename(zip_filename)}: rewrote the .tex, "
+                                   f"kept {report['reused']} unchanged media file(s)\n", "green")
+        else:
+            self.write_to_terminal(f"✓ Created {os.path.basename(zip_filename)}: {report['stored']} stored, "
+                                   f"{report['deflated']} compressed\n", "green")
+        try:
+            self.write_to_terminal(f"  Total zip size: {self.format_file_size(os.path.getsize(zip_filename))}\n")
+        except OSError:
+            pass
+        if missing_count:
+            self.write_to_terminal(f"⚠ {missing_count} referenced file(s) missing - see manifest.txt\n", "yellow")
+
 
     # -----------------------------------------------------------------------------
     # LOAD CUSTOM DICTIONARY - Spell check
@@ -39544,7 +40709,7 @@ class UnifiedScreenCapture:
 
     def capture_region(self, bbox, output_path):
         """Capture screen region using best available method"""
-        os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else 'media_files',
+        os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else project_media_dir(),
                    exist_ok=True)
 
         if self.session_type == ScreenCaptureMethod.WAYLAND and self.wayland_capture:
@@ -39559,7 +40724,7 @@ class UnifiedScreenCapture:
 
     def capture_animation(self, bbox, frame_count, frame_delay, output_path, callback=None):
         """Capture animation frames"""
-        os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else 'media_files',
+        os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else project_media_dir(),
                    exist_ok=True)
 
         if self.session_type == ScreenCaptureMethod.WAYLAND and self.wayland_capture:
@@ -39626,7 +40791,7 @@ def compile_with_notes_mode(input_file: str, mode: str, keep_temp: bool = False)
     Args:
         input_file: Path to input TEX file
         mode: 'slides', 'notes', or 'both'
-        keep_temp: Whether to keep temporary files
+        keep_temp: Unused; each mode now keeps its build files in .bsg-build/<mode>/
     Returns:
         Path to generated PDF (in the same directory as input_file)
     """
@@ -39638,10 +40803,10 @@ def compile_with_notes_mode(input_file: str, mode: str, keep_temp: bool = False)
         # The final PDF will be in the same directory as the input file
         final_pdf = os.path.join(input_dir, f"{base_name}_{mode}.pdf")
 
-        # Create temp directory for compilation
-        temp_dir = tempfile.mkdtemp()
-        temp_tex = os.path.join(temp_dir, f"{base_name}_{mode}.tex")
-        temp_pdf = os.path.join(temp_dir, f"{base_name}_{mode}.pdf")
+        # Each mode has its own persistent build directory, so modes can compile side by side
+        # and keep their aux files; media_files/ resolves against input_dir, nothing is copied
+        build_dir = build_dir_for(input_file, mode)
+        mode_tex = os.path.join(build_dir, f"{base_name}_{mode}.tex")
 
         # Read original content
         with open(input_file, 'r', encoding='utf-8') as f:
@@ -39650,68 +40815,36 @@ def compile_with_notes_mode(input_file: str, mode: str, keep_temp: bool = False)
         # Modify content for notes mode
         modified_content = modify_preamble_for_notes_mode(content, mode)
 
-        # Write modified content to temp file
-        with open(temp_tex, 'w', encoding='utf-8') as f:
+        # Write modified content to the build directory
+        with open(mode_tex, 'w', encoding='utf-8') as f:
             f.write(modified_content)
 
-        # Copy required media files to temp directory
-        media_dir = os.path.join(input_dir, 'media_files')
-        if os.path.exists(media_dir):
-            temp_media = os.path.join(temp_dir, 'media_files')
-            shutil.copytree(media_dir, temp_media)
-        else:
-            # Create empty media_files directory in temp
-            os.makedirs(os.path.join(temp_dir, 'media_files'), exist_ok=True)
-
-        # Change to temp directory for compilation
-        original_dir = os.getcwd()
-        os.chdir(temp_dir)
-
-        try:
-            # Compile document (two passes for references)
-            for pass_num in range(2):
-                result = subprocess.run(
-                    ['pdflatex', '-interaction=nonstopmode',
-                     '-file-line-error', temp_tex],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    timeout=120
-                )
-
-                if result.returncode != 0:
-                    print(f"⚠ Compilation pass {pass_num + 1} had errors")
-                    # Check for fatal errors
-                    if 'Fatal error' in result.stdout or '! ' in result.stdout:
-                        print(f"✗ Fatal error in compilation: {result.stdout[-500:]}")
-                        return None
-
-            # Check if PDF was created
-            if os.path.exists(temp_pdf) and os.path.getsize(temp_pdf) > 0:
-                # Copy the PDF to the permanent location (same directory as input)
-                shutil.copy2(temp_pdf, final_pdf)
-                print(f"✓ PDF saved to: {final_pdf}")
-                print(f"  Size: {os.path.getsize(final_pdf)} bytes")
-                return final_pdf
-            else:
-                print(f"✗ PDF compilation failed: {temp_pdf} not found or empty")
-                return None
+        # Compile until references and navigation settle
+        result = compile_until_stable(mode_tex, timeout=120, output_dir=build_dir, cwd=input_dir,
+                                      pdf_file=final_pdf)
+        if result['timed_out']:
+            print(f"✗ Compilation timed out")
+            return None
+        if result['errors']:
+            print(f"⚠ Compilation pass {result['passes']} had errors")
+            print(f"✗ Fatal error in compilation: {result['errors'][0]['message']}")
+            return None
 
-        finally:
-            # Change back to original directory
-            os.chdir(original_dir)
+        # Check if PDF was published
+        if result['pdf'] == final_pdf and os.path.exists(final_pdf) and os.path.getsize(final_pdf) > 0:
+            state = "up to date" if result['skipped'] else f"{result['passes']} passes"
+            print(f"✓ PDF saved to: {final_pdf} ({state})")
+            print(f"  Size: {os.path.getsize(final_pdf)} bytes")
+            return final_pdf
+        else:
+            print(f"✗ PDF compilation failed: no PDF in {build_dir}")
+            return None
 
-    except subprocess.TimeoutExpired:
-        print(f"✗ Compilation timed out")
-        return None
     except Exception as e:
         print(f"✗ Error in compilation: {str(e)}")
         import traceback
         traceback.print_exc()
         return None
-    finally:
-        if not keep_temp:
-            shutil.rmtree(temp_dir, ignore_errors=True)
 
 #---------------------------------------------------------------------------------
 
@@ -40343,7 +41476,7 @@ def create_footer(self) -> None:
     """Create footer with institution info and links"""
     # Footer frame with dark theme
     self.footer = ctk.CTkFrame(self)
-    self.footer.grid(row=3, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+    self.footer.grid(row=3, column=0, columnspan=3, sticky="ew", padx=5, pady=5)
 
     # Left side - Institution name
     inst_label = ctk.CTkLabel(
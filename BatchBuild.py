@@ -0,0 +1,320 @@
+#----------------------------------------------Batch Build ------------------------------------
+"""
+BatchBuild.py
+bsg-build: converts and compiles many .txt decks without a display or any prompt.
+
+    bsg-build lectures/                    # every deck in the folder, one worker per CPU
+    bsg-build -r course/ -j 8 --json       # recurse, 8 workers, JSON summary on stdout
+    bsg-build week1.txt week2.txt --force  # rebuild even if nothing changed
+
+A deck is skipped when its slides, preamble, referenced media and the generator
+itself are unchanged since its last successful build. The state of that build is
+kept in .bsg-build/<deck>.build.json beside the deck.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import traceback
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from .LatexBuild import compile_until_stable, add_color_definitions, build_dir_for, BUILD_DIR_NAME
+except ImportError:
+    from LatexBuild import compile_until_stable, add_color_definitions, build_dir_for, BUILD_DIR_NAME
+
+STATE_VERSION = 2   # 2: assets are recorded (1 wrote an empty map)
+DECK_MARKERS = ('\\begin{Content}', '\\begin{frame}')
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def generator_version() -> str:
+    """Hash of the generator and build code: a new release rebuilds every deck"""
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in ('BeamerSlideGenerator.py', 'LatexBuild.py', 'BatchBuild.py'):
+        try:
+            with open(os.path.join(here, name), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(name.encode())
+    return digest.hexdigest()[:16]
+
+
+def is_deck(path: str) -> bool:
+    """Whether a .txt file looks like a BSG deck (not a README or requirements file)"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            head = f.read(1 << 16)
+    except OSError:
+        return False
+    return any(marker in head for marker in DECK_MARKERS)
+
+
+def discover_decks(paths: list, recursive: bool = False) -> list:
+    """Deck files named directly or found in the given directories, without duplicates"""
+    decks = []
+    seen = set()
+
+    def add(path):
+        path = os.path.abspath(path)
+        if path not in seen and is_deck(path):
+            seen.add(path)
+            decks.append(path)
+
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirs, files in os.walk(path):
+                subdirs[:] = sorted(d for d in subdirs if not d.startswith('.')) if recursive else []
+                for name in sorted(files):
+                    if name.lower().endswith('.txt'):
+                        add(os.path.join(directory, name))
+        elif os.path.isfile(path):
+            add(path)
+    return decks
+
+
+def state_path(deck: str) -> str:
+    stem = os.path.splitext(os.path.basename(deck))[0]
+    return os.path.join(os.path.dirname(deck), BUILD_DIR_NAME, stem + '.build.json')
+
+
+def deck_fingerprint(deck: str) -> dict:
+    """Hashes of the inputs a build depends on, before conversion"""
+    with open(deck, 'rb') as f:
+        data = f.read()
+    split = data.rfind(b'\\begin{document}')
+    preamble, slides = (data[:split], data[split:]) if split >= 0 else (b'', data)
+    return {'preamble': _sha256(preamble), 'slides': _sha256(slides), 'generator': generator_version()}
+
+
+def media_changes(tex_file: str, recorded: dict) -> list:
+    """Media files of the last build whose size or mtime changed (or that disappeared)"""
+    changed = []
+    base_dir = os.path.dirname(tex_file)
+    for name, entry in recorded.items():
+        path = os.path.join(base_dir, entry.get('file', name))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            if entry.get('exists', True):
+                changed.append(name)
+            continue
+        if not entry.get('exists', True) or stat.st_size != entry.get('size') or stat.st_mtime != entry.get('mtime'):
+            changed.append(name)
+    return changed
+
+
+def needs_build(deck: str, force: bool = False) -> tuple:
+    """(reasons to rebuild, fingerprint); no reasons means the last build is still current"""
+    fingerprint = deck_fingerprint(deck)
+    if force:
+        return ['forced'], fingerprint
+    try:
+        with open(state_path(deck), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return ['never built'], fingerprint
+    if state.get('version') != STATE_VERSION:
+        return ['state format changed'], fingerprint
+
+    reasons = [key for key in ('preamble', 'slides', 'generator') if state.get(key) != fingerprint[key]]
+    pdf = state.get('pdf')
+    try:
+        pdf_stat = os.stat(pdf)
+        if pdf_stat.st_size != state.get('pdf_size') or pdf_stat.st_mtime != state.get('pdf_mtime'):
+            reasons.append('pdf modified')
+    except (OSError, TypeError):
+        reasons.append('pdf missing')
+    reasons.extend('media: ' + name for name in media_changes(os.path.splitext(deck)[0] + '.tex',
+                                                              state.get('assets', {})))
+    return reasons, fingerprint
+
+
+_generator = None
+
+
+def _load_generator(build_dir: str):
+    """Import the generator once per worker, keeping its import-time debug log out of the deck folders"""
+    global _generator
+    if _generator is None:
+        # Its logger writes a file at import and binds a handler to the current stdout
+        os.environ['BSG_DEBUG_LOG_DIR'] = build_dir
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            try:
+                from . import BeamerSlideGenerator as generator
+            except ImportError:
+                import BeamerSlideGenerator as generator
+        generator.set_console_event_level('warning')
+        _generator = generator
+    return _generator
+
+
+def build_deck(job: dict) -> dict:
+    """Convert and compile one deck (runs in a worker process)"""
+    deck = job['deck']
+    deck_dir = os.path.dirname(deck)
+    tex_file = os.path.splitext(deck)[0] + '.tex'
+    log_file = os.path.join(deck_dir, BUILD_DIR_NAME, os.path.splitext(os.path.basename(deck))[0] + '.convert.log')
+    report = {'deck': deck, 'status': 'failed', 'reasons': job['reasons'], 'tex': tex_file, 'pdf': None,
+              'slides': 0, 'failed_slides': 0, 'errors': [], 'passes': 0}
+    started = time.time()
+
+    try:
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        generator = _load_generator(os.path.dirname(log_file))
+
+        # media_files/ resolves against the folder of the .tex; the working directory is irrelevant
+        with open(log_file, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log), \
+                contextlib.redirect_stderr(log):
+            processed, failed, errors = generator.process_input_file(deck, tex_file)
+        report.update(slides=processed, failed_slides=failed, errors=[str(e) for e in errors][:20])
+        if processed == 0:
+            report['status'] = 'convert_failed'
+            return report
+
+        # Read before the color rewrite below changes the .tex the manifest was stamped with
+        manifest = generator.load_asset_manifest(tex_file)
+        if manifest is None:
+            raise RuntimeError(f"{os.path.basename(tex_file)} was generated without a valid asset manifest")
+
+        with open(tex_file, 'r', encoding='utf-8') as f:
+            tex_content = f.read()
+        with open(tex_file, 'w', encoding='utf-8') as f:
+            f.write(add_color_definitions(tex_content))
+
+        if job['convert_only']:
+            report['status'] = 'converted'
+            return report
+
+        # Skipped when the regenerated .tex and everything it reads match the last clean compile
+        result = compile_until_stable(tex_file, force=job['force'], timeout=job['timeout'],
+                                      output_dir=build_dir_for(tex_file))
+        report['passes'] = result['passes']
+        report['errors'].extend(error['message'] for error in result['errors'][:20])
+        pdf = result['pdf']
+        if result['timed_out'] or pdf is None or not os.path.exists(pdf) or os.path.getsize(pdf) == 0:
+            report['status'] = 'compile_failed'
+            return report
+
+        report['status'] = 'built' if not result['errors'] else 'built_with_errors'
+        report['pdf'] = pdf
+        if not result['errors']:
+            pdf_stat = os.stat(pdf)
+            state = dict(job['fingerprint'], version=STATE_VERSION, pdf=pdf, pdf_size=pdf_stat.st_size,
+                         pdf_mtime=pdf_stat.st_mtime, built=time.strftime('%Y-%m-%d %H:%M:%S'),
+                         assets=manifest['assets'])
+            with open(state_path(deck), 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=1)
+        return report
+
+    except Exception as e:
+        report['errors'].append(f"{type(e).__name__}: {e}")
+        report['traceback'] = traceback.format_exc()
+        return report
+    finally:
+        report['seconds'] = round(time.time() - started, 3)
+
+
+def build_decks(decks: list, jobs: int = None, force: bool = False, convert_only: bool = False,
+                timeout: int = 300, progress_callback=None) -> dict:
+    """Build every deck that needs it on a process pool; returns the summary"""
+    started = time.time()
+    summary = {'decks': [], 'built': 0, 'skipped': 0, 'failed': 0}
+    pending = []
+    for deck in decks:
+        reasons, fingerprint = needs_build(deck, force)
+        if reasons:
+            pending.append({'deck': deck, 'reasons': reasons, 'fingerprint': fingerprint,
+                            'convert_only': convert_only, 'timeout': timeout, 'force': force})
+        else:
+            report = {'deck': deck, 'status': 'skipped', 'reasons': [], 'seconds': 0.0}
+            summary['decks'].append(report)
+            summary['skipped'] += 1
+            if progress_callback:
+                progress_callback(report)
+
+    if pending:
+        # Processes, not threads: the generator keeps module-level state and holds the GIL while converting
+        with ProcessPoolExecutor(max_workers=max(1, min(jobs or os.cpu_count() or 1, len(pending)))) as pool:
+            futures = [pool.submit(build_deck, job) for job in pending]
+            for future in as_completed(futures):
+                report = future.result()
+                summary['decks'].append(report)
+                if report['status'] in ('built', 'converted'):
+                    summary['built'] += 1
+                else:
+                    summary['failed'] += 1
+                if progress_callback:
+                    progress_callback(report)
+
+    order = {deck: i for i, deck in enumerate(decks)}
+    summary['decks'].sort(key=lambda report: order[report['deck']])
+    summary['seconds'] = round(time.time() - started, 3)
+    return summary
+
+
+STATUS_ICONS = {'built': '✓', 'converted': '✓', 'skipped': '⏭', 'built_with_errors': '⚠'}
+
+
+def print_report(report: dict, stream=None) -> None:
+    stream = stream or sys.stdout
+    icon = STATUS_ICONS.get(report['status'], '✗')
+    line = f"{icon} {report['status']:<17} {os.path.relpath(report['deck'])}"
+    if report['status'] != 'skipped':
+        line += f"  ({report['seconds']:.1f}s, {report.get('slides', 0)} slides, {report.get('passes', 0)} passes)"
+        if report.get('reasons'):
+            line += f"  [{', '.join(report['reasons'][:3])}]"
+    print(line, file=stream)
+    for error in report.get('errors', [])[:3] if report['status'] != 'built' else []:
+        print(f"      {error}", file=stream)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='bsg-build',
+                                     description="Convert and compile BSG decks without the IDE")
+    parser.add_argument('paths', nargs='+', help=".txt decks or directories containing them")
+    parser.add_argument('-r', '--recursive', action='store_true', help="also search subdirectories")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="parallel builds (default: CPU count)")
+    parser.add_argument('-f', '--force', action='store_true', help="rebuild decks even if nothing changed")
+    parser.add_argument('--convert-only', action='store_true', help="generate .tex files without compiling")
+    parser.add_argument('--timeout', type=int, default=300, help="seconds allowed per pdflatex pass")
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON instead of a table")
+    parser.add_argument('--summary', help="also write the JSON summary to this file")
+    options = parser.parse_args(argv)
+
+    decks = discover_decks(options.paths, options.recursive)
+    if not decks:
+        print("No decks found", file=sys.stderr)
+        return 2
+
+    # With --json stdout carries only the summary, so progress goes to stderr
+    progress_stream = sys.stderr if options.json else sys.stdout
+    if not options.json:
+        print(f"Building {len(decks)} deck(s)...")
+    summary = build_decks(decks, options.jobs, options.force, options.convert_only, options.timeout,
+                          progress_callback=lambda report: print_report(report, progress_stream))
+    summary['generator'] = generator_version()
+
+    if options.summary:
+        with open(options.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=1)
+    if options.json:
+        json.dump(summary, sys.stdout, indent=1)
+        print()
+    else:
+        print(f"\n{summary['built']} built, {summary['skipped']} up to date, {summary['failed']} failed "
+              f"in {summary['seconds']:.1f}s")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+#------------------------------------------End Batch Build -----------------------------------------
@@ -7,6 +7,7 @@ Supports local files, URL downloads, and content-only slides.
 import math
 import os,re
 import time
+import json
 import requests
 import webbrowser
 from PIL import Image
@@ -16,8 +17,44 @@ import tkinter as tk
 from urllib.parse import urlparse, unquote
 from pathlib import Path
 import mimetypes
+import threading
+from collections import namedtuple
 output_dir = ""
 
+# ============================================================
+# DECK BASE DIRECTORY
+# ============================================================
+# Paths in a deck (media_files/..., previews) are relative to the folder of its .tex, where
+# pdflatex runs. File access resolves them against the base directory of the deck being
+# generated on the current thread, so the process working directory never has to change.
+_generation = threading.local()
+_default_base_dir = None
+
+
+def deck_base_dir() -> str:
+    """Folder that deck-relative paths resolve against on this thread (default: the open project, else the working directory)"""
+    return getattr(_generation, 'base_dir', None) or _default_base_dir or os.getcwd()
+
+
+def set_default_deck_base_dir(base_dir) -> None:
+    """Base directory for threads not generating a deck of their own (the IDE's open presentation)"""
+    global _default_base_dir
+    _default_base_dir = os.path.abspath(base_dir) if base_dir else None
+
+
+def set_deck_base_dir(base_dir):
+    """Resolve deck-relative paths against base_dir on this thread; returns the previous setting"""
+    previous = getattr(_generation, 'base_dir', None)
+    _generation.base_dir = os.path.abspath(base_dir) if base_dir else None
+    return previous
+
+
+def resolve_deck_path(path: str) -> str:
+    """File system path of a path as written in the deck"""
+    if not path or os.path.isabs(path):
+        return path
+    return os.path.join(deck_base_dir(), path)
+
 # ============================================================
 # TIKZ FIX FUNCTIONS
 # ============================================================
@@ -1150,29 +1187,32 @@ def generate_preview_frame(filepath, output_path=None):
         _, ext = os.path.splitext(filepath)
         ext = ext.lower()
 
+        # The returned path goes into the .tex; the files are read and written relative to the deck
+        source, target = resolve_deck_path(filepath), resolve_deck_path(output_path)
+
         # Handle different media types
         if ext in ['.mp4', '.avi', '.mov', '.mkv']:
             # Video file
-            cap = cv2.VideoCapture(filepath)
+            cap = cv2.VideoCapture(source)
             ret, frame = cap.read()
             if ret:
                 # Convert BGR to RGB
                 frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 img = Image.fromarray(frame_rgb)
-                img.save(output_path)
+                img.save(target)
                 cap.release()
                 return output_path
         elif ext in ['.gif']:
             # Animated GIF - extract first frame
-            with Image.open(filepath) as img:
+            with Image.open(source) as img:
                 img.seek(0)
-                img.save(output_path, 'PNG')
+                img.save(target, 'PNG')
                 return output_path
         elif ext in ['.mp3', '.wav', '.ogg']:
             # Audio file - create a simple icon
             img = Image.new('RGB', (400, 300), color='black')
             # You could draw a music note or audio symbol here
-            img.save(output_path)
+            img.save(target)
             return output_path
         elif ext in ['.png', '.jpg', '.jpeg']:
             # Static image - use as is
@@ -2127,7 +2167,7 @@ def create_new_input_file(file_path):
     """
     global output_dir
     output_dir = os.path.dirname(os.path.abspath(file_path))
-    os.chdir(output_dir)
+    set_deck_base_dir(output_dir)
     print("\nPresentation Setup:")
     print("-----------------")
     title = input("Title: ").strip()
@@ -2441,7 +2481,7 @@ class MediaConverter:
         """
         try:
             # Create media_files directory if it doesn't exist
-            os.makedirs(output_folder, exist_ok=True)
+            os.makedirs(resolve_deck_path(output_folder), exist_ok=True)
 
             # Download content to temporary file
             response = requests.get(url, stream=True)
@@ -2478,6 +2518,8 @@ class MediaConverter:
         Returns (success, file_path, media_type)
         """
         try:
+            input_path = resolve_deck_path(input_path)
+
             # Determine media type
             media_type = self._detect_media_type(input_path)
             if not media_type:
@@ -2488,15 +2530,16 @@ class MediaConverter:
             output_ext = self.preferred_formats[media_type]
             output_path = os.path.join(output_folder, f"{base_name}{output_ext}")
 
-            # Convert based on media type
+            # Convert based on media type (output_path stays deck-relative for the caller)
+            target_path = resolve_deck_path(output_path)
             if media_type == 'image':
-                success = self._convert_image(input_path, output_path)
+                success = self._convert_image(input_path, target_path)
             elif media_type == 'video':
-                success = self._convert_video(input_path, output_path)
+                success = self._convert_video(input_path, target_path)
             elif media_type == 'animation':
-                success = self._convert_animation(input_path, output_path)
+                success = self._convert_animation(input_path, target_path)
             elif media_type == 'document':
-                success = self._convert_document(input_path, output_path)
+                success = self._convert_document(input_path, target_path)
             else:
                 success = False
 
@@ -2668,13 +2711,13 @@ def download_media(url, output_folder='media_files'):
     """
     try:
         # Create output folder if it doesn't exist
-        os.makedirs(output_folder, exist_ok=True)
+        os.makedirs(resolve_deck_path(output_folder), exist_ok=True)
 
         # Handle local files
         if url.startswith('local:'):
             local_file = url.split('local:')[1].strip()
             local_path = os.path.join(output_folder, local_file)
-            if os.path.exists(local_path):
+            if os.path.exists(resolve_deck_path(local_path)):
                 # Convert local file if needed
                 success, converted_path, media_type = convert_media(local_path, output_folder)
                 if success:
@@ -2710,7 +2753,7 @@ def download_media(url, output_folder='media_files'):
 
                 # Store metadata
                 metadata_path = os.path.join(output_folder, f"{base_name}_metadata.txt")
-                with open(metadata_path, 'w') as f:
+                with open(resolve_deck_path(metadata_path), 'w') as f:
                     f.write(f"Source: {url}\n")
                     f.write(f"Original Type: {media_type}\n")
                     f.write(f"Converted Format: {os.path.splitext(filename)[1]}\n")
@@ -2719,7 +2762,7 @@ def download_media(url, output_folder='media_files'):
                     # Add media-specific metadata
                     if media_type == 'image':
                         try:
-                            with Image.open(converted_path) as img:
+                            with Image.open(resolve_deck_path(converted_path)) as img:
                                 f.write(f"Dimensions: {img.size}\n")
                                 f.write(f"Mode: {img.mode}\n")
                         except Exception as e:
@@ -2727,7 +2770,7 @@ def download_media(url, output_folder='media_files'):
                     elif media_type == 'video':
                         try:
                             import cv2
-                            video = cv2.VideoCapture(converted_path)
+                            video = cv2.VideoCapture(resolve_deck_path(converted_path))
                             fps = video.get(cv2.CAP_PROP_FPS)
                             frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
                             duration = frame_count/fps if fps > 0 else 0
@@ -2737,6 +2780,7 @@ def download_media(url, output_folder='media_files'):
                         except Exception as e:
                             f.write(f"Video info error: {str(e)}\n")
 
+                emit_event('media_fetched', url=url, path=converted_path, size=len(response.content))
                 return base_name, filename, first_frame_path
 
         except requests.exceptions.RequestException as e:
@@ -2775,7 +2819,7 @@ def download_giphy_gif(url, output_folder='media_files'):
 
             # Store Giphy-specific metadata
             metadata_path = os.path.join(output_folder, f"{base_name}_metadata.txt")
-            with open(metadata_path, 'w') as f:
+            with open(resolve_deck_path(metadata_path), 'w') as f:
                 f.write(f"Source: {url}\n")
                 f.write(f"Giphy ID: {gif_id}\n")
                 f.write(f"Direct URL: {direct_url}\n")
@@ -2783,13 +2827,14 @@ def download_giphy_gif(url, output_folder='media_files'):
 
                 # Add animation metadata
                 try:
-                    with Image.open(converted_path) as img:
+                    with Image.open(resolve_deck_path(converted_path)) as img:
                         f.write(f"Dimensions: {img.size}\n")
                         f.write(f"Frames: {getattr(img, 'n_frames', 1)}\n")
                         f.write(f"Duration: {img.info.get('duration', 0)}ms\n")
                 except Exception as e:
                     f.write(f"Animation info error: {str(e)}\n")
 
+            emit_event('media_fetched', url=url, path=converted_path, size=os.path.getsize(resolve_deck_path(converted_path)))
             return base_name, filename, first_frame_path
 
         return None, None, None
@@ -3300,6 +3345,12 @@ def generate_latex_code(base_name, filename, first_frame_path, content=None, tit
         return latex_code
 
     # ========== GENERATE LAYOUT BASED ON DIRECTIVE ==========
+    if playable and first_frame_path:
+        record_asset(first_frame_path, 'preview', pair=filename)
+        record_asset(filename, 'video', pair=first_frame_path)
+    else:
+        record_asset(filename)
+
     latex_code = ""
 
     # SPLIT LAYOUT - Preserve user column widths
@@ -3862,22 +3913,19 @@ def verify_media_file(filepath):
     """
     Verifies that a media file exists and returns its proper path.
     """
-    if os.path.exists(filepath):
+    if os.path.exists(resolve_deck_path(filepath)):
         return filepath
 
     base_filepath = os.path.join('media_files', os.path.basename(filepath))
-    if os.path.exists(base_filepath):
+    if os.path.exists(resolve_deck_path(base_filepath)):
         return base_filepath
 
     # Try to find the file with any extension
-    global output_dir
     base_name = os.path.splitext(os.path.basename(filepath))[0]
-    output_dir = os.path.dirname(os.path.abspath(file_path))  # Get the directory of the input file
-    base_path = os.path.join(output_dir,'media_files', base_name)
     import glob
-    possible_files = glob.glob(base_path + '.*')
+    possible_files = glob.glob(resolve_deck_path(os.path.join('media_files', base_name)) + '.*')
     if possible_files:
-        return possible_files[0]
+        return os.path.join('media_files', os.path.basename(possible_files[0]))
 
     print(f"Warning: Media file not found: {filepath}")
     return None
@@ -3943,7 +3991,7 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
                 import requests
                 import time
 
-                os.makedirs(output_folder, exist_ok=True)
+                os.makedirs(resolve_deck_path(output_folder), exist_ok=True)
 
                 # Generate safe filename
                 timestamp = int(time.time())
@@ -3968,7 +4016,7 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
                 total_size = int(response.headers.get('content-length', 0))
                 downloaded = 0
 
-                with open(output_path, 'wb') as f:
+                with open(resolve_deck_path(output_path), 'wb') as f:
                     for chunk in response.iter_content(chunk_size=8192):
                         f.write(chunk)
                         downloaded += len(chunk)
@@ -4004,7 +4052,7 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
 
             # Save metadata file
             metadata_path = local_path.rsplit('.', 1)[0] + '_source.txt'
-            with open(metadata_path, 'w', encoding='utf-8') as f:
+            with open(resolve_deck_path(metadata_path), 'w', encoding='utf-8') as f:
                 f.write(f"Source URL: {media_source}\n")
                 f.write(f"Downloaded: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write(f"Local Path: {local_path}\n")
@@ -4015,18 +4063,18 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
             # Case 1: Playable local file
             if directive_type == 'file' and media_source:
                 media_path = media_source
-                if not os.path.exists(media_path):
+                if not os.path.exists(resolve_deck_path(media_path)):
                     test_paths = [
                         media_path,
                         os.path.join('media_files', os.path.basename(media_path)),
                         os.path.join('media_files', media_path),
                     ]
                     for test_path in test_paths:
-                        if os.path.exists(test_path):
+                        if os.path.exists(resolve_deck_path(test_path)):
                             media_path = test_path
                             break
 
-                if os.path.exists(media_path):
+                if os.path.exists(resolve_deck_path(media_path)):
                     first_frame_path = generate_preview_frame(media_path)
                     return generate_latex_code(
                         os.path.splitext(os.path.basename(media_path))[0],
@@ -4046,7 +4094,7 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
                     if 'youtube.com' in media_source or 'youtu.be' in media_source:
                         try:
                             import yt_dlp
-                            os.makedirs('media_files', exist_ok=True)
+                            os.makedirs(resolve_deck_path('media_files'), exist_ok=True)
 
                             # Generate safe filename from video title
                             timestamp = int(time.time())
@@ -4066,7 +4114,7 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
 
                             ydl_opts = {
                                 'format': 'best[ext=mp4]/best',
-                                'outtmpl': output_template,
+                                'outtmpl': resolve_deck_path(output_template),
                                 'quiet': False,
                                 'no_warnings': False,
                             }
@@ -4082,7 +4130,7 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
                                 ydl.download([media_source])
 
                             # Check for downloaded file
-                            if os.path.exists(output_template):
+                            if os.path.exists(resolve_deck_path(output_template)):
                                 downloaded_file = output_template
                                 if terminal_io:
                                     terminal_io.write(f"\n  ✓ Video downloaded successfully!\n", "green")
@@ -4095,15 +4143,15 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
                                 # Try to find any mp4 file with similar name
                                 import glob
                                 search_pattern = f"media_files/*{safe_title}*.mp4" if 'safe_title' in dir() else f"media_files/*youtube_video_{timestamp}*.mp4"
-                                possible_files = glob.glob(search_pattern)
+                                possible_files = glob.glob(resolve_deck_path(search_pattern))
                                 if possible_files:
-                                    downloaded_file = possible_files[0]
+                                    downloaded_file = os.path.join('media_files', os.path.basename(possible_files[0]))
                                     if terminal_io:
                                         terminal_io.write(f"\n  ✓ Video downloaded: {os.path.basename(downloaded_file)}\n", "green")
                                 else:
                                     raise Exception("Downloaded file not found")
 
-                            if downloaded_file and os.path.exists(downloaded_file):
+                            if downloaded_file and os.path.exists(resolve_deck_path(downloaded_file)):
                                 # Add source attribution
                                 add_source_attribution(media_source, downloaded_file)
 
@@ -4148,7 +4196,7 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
                             terminal_io.write(f"\n  📥 Downloading video from URL...\n", "cyan")
                         downloaded_file = download_video_from_url(media_source)
 
-                    if downloaded_file and os.path.exists(downloaded_file):
+                    if downloaded_file and os.path.exists(resolve_deck_path(downloaded_file)):
                         # Add source attribution for non-YouTube URLs too
                         add_source_attribution(media_source, downloaded_file)
 
@@ -4221,7 +4269,7 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
                         test_paths.append(test_path + ext)
 
             for test_path in test_paths:
-                if os.path.exists(test_path):
+                if os.path.exists(resolve_deck_path(test_path)):
                     media_path = test_path
                     found = True
                     break
@@ -4279,7 +4327,7 @@ def download_video_from_url(url, output_folder='media_files'):
     try:
         import requests
 
-        os.makedirs(output_folder, exist_ok=True)
+        os.makedirs(resolve_deck_path(output_folder), exist_ok=True)
 
         # Generate safe filename
         timestamp = int(time.time())
@@ -4299,18 +4347,14 @@ def download_video_from_url(url, output_folder='media_files'):
         total_size = int(response.headers.get('content-length', 0))
         downloaded = 0
 
-        with open(output_path, 'wb') as f:
+        with open(resolve_deck_path(output_path), 'wb') as f:
             for chunk in response.iter_content(chunk_size=8192):
                 f.write(chunk)
                 downloaded += len(chunk)
                 if total_size > 0:
-                    percent = (downloaded / total_size) * 100
-                    if hasattr(self, 'write'):
-                        self.write(f"  Downloading: {percent:.1f}%\r", "cyan")
-
-        if hasattr(self, 'write'):
-            self.write(f"\n", "cyan")
+                    emit_event('media_progress', url=url, percent=downloaded * 100 / total_size)
 
+        emit_event('media_fetched', url=url, path=output_path, size=downloaded)
         return output_path
 
     except Exception as e:
@@ -4465,7 +4509,7 @@ def handle_missing_media_fallback(original_url, content, title, playable):
     elif choice == '2':
         print("\nAvailable files in media_files folder:")
         try:
-            files = os.listdir('media_files')
+            files = os.listdir(resolve_deck_path('media_files'))
             for i, file in enumerate(files, 1):
                 print(f"{i}. {file}")
             file_choice = input("Enter file number or name: ").strip()
@@ -4475,7 +4519,7 @@ def handle_missing_media_fallback(original_url, content, title, playable):
                 chosen_file = file_choice
 
             # Verify file exists
-            if not os.path.exists(os.path.join('media_files', chosen_file)):
+            if not os.path.exists(resolve_deck_path(os.path.join('media_files', chosen_file))):
                 print(f"Error: File {chosen_file} not found in media_files directory")
                 return generate_latex_code(None, None, None, content, title, False), ("\\None", "\\None")
 
@@ -4525,7 +4569,7 @@ def download_youtube_video(url, file_path=None):
         import yt_dlp
 
     print("\nDownloading YouTube video...")
-    os.makedirs('media_files', exist_ok=True)
+    os.makedirs(resolve_deck_path('media_files'), exist_ok=True)
     clean_url = url.replace('\\play', '').strip()
 
     ydl_opts = {
@@ -4551,15 +4595,16 @@ def download_youtube_video(url, file_path=None):
             output_path = os.path.join('media_files', safe_filename)
 
             # Update options with output path
-            ydl_opts['outtmpl'] = output_path
+            ydl_opts['outtmpl'] = resolve_deck_path(output_path)
 
             # Download with updated options
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 ydl.download([clean_url])
 
-            if os.path.exists(output_path):
+            if os.path.exists(resolve_deck_path(output_path)):
                 base_name = os.path.splitext(safe_filename)[0]
-                print(f"Video downloaded successfully to: {output_path}")
+                emit_event('media_fetched', url=clean_url, path=output_path,
+                           size=os.path.getsize(resolve_deck_path(output_path)))
                 return base_name, safe_filename, output_path
 
             print(f"Error: Downloaded file not found at {output_path}")
@@ -4573,9 +4618,10 @@ def download_youtube_video(url, file_path=None):
             fallback_opts['format'] = 'best'
             with yt_dlp.YoutubeDL(fallback_opts) as ydl:
                 ydl.download([clean_url])
-                if os.path.exists(output_path):
+                if os.path.exists(resolve_deck_path(output_path)):
                     base_name = os.path.splitext(safe_filename)[0]
-                    print(f"Video downloaded successfully to: {output_path}")
+                    emit_event('media_fetched', url=clean_url, path=output_path,
+                               size=os.path.getsize(resolve_deck_path(output_path)))
                     return base_name, safe_filename, output_path
         except Exception as fallback_error:
             print(f"Fallback download failed: {str(fallback_error)}")
@@ -5274,7 +5320,327 @@ DEFAULT_CLEANING_LEVEL = 3  # None by default - preserves everything
 # ============================================================
 # COMPLETE UPDATED process_input_file FUNCTION
 # ============================================================
-def process_input_file(file_path, output_filename='movie.tex', presentation_info=None, ide_callback=None):
+# ============================================================
+# PROGRESS EVENTS
+# ============================================================
+
+EVENT_LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+# Default level of each event type; per-slide events are debug so the console stays quiet
+EVENT_TYPES = {
+    'content_preview': 'debug',
+    'slides_parsed': 'info',
+    'slide_started': 'debug',
+    'slide_done': 'debug',
+    'slide_failed': 'warning',
+    'tikz_fixed': 'debug',
+    'media_progress': 'debug',
+    'media_fetched': 'info',
+    'stage_done': 'debug',
+    'generation_done': 'info',
+    'warning': 'warning',
+}
+GeneratorEvent = namedtuple('GeneratorEvent', 'type level time data')
+
+
+def _event_level(level) -> int:
+    return level if isinstance(level, int) else EVENT_LEVELS[level]
+
+
+class EventChannel:
+    """Typed progress events with level-filtered subscribers; emitting with no listener is nearly free"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+        self.min_level = None
+
+    def subscribe(self, callback, level='info', types=None) -> int:
+        """Call callback(event) for events at or above level (and of the given types); returns a token"""
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = (callback, _event_level(level), frozenset(types) if types else None)
+            self._refresh()
+        return token
+
+    def unsubscribe(self, token) -> None:
+        with self._lock:
+            self._subscribers.pop(token, None)
+            self._refresh()
+
+    def _refresh(self):
+        levels = [level for callback, level, types in self._subscribers.values()]
+        self.min_level = min(levels) if levels else None
+
+    def wants(self, event_type, level=None) -> bool:
+        """Whether any subscriber would receive this event (check before building costly payloads)"""
+        if self.min_level is None:
+            return False
+        level = _event_level(level or EVENT_TYPES.get(event_type, 'info'))
+        if level < self.min_level:
+            return False
+        return any(level >= wanted and (types is None or event_type in types)
+                   for callback, wanted, types in list(self._subscribers.values()))
+
+    def emit(self, event_type, level=None, **data) -> None:
+        """Deliver an event; subscriber errors never reach the generator"""
+        if self.min_level is None:
+            return
+        level = _event_level(level or EVENT_TYPES.get(event_type, 'info'))
+        if level < self.min_level:
+            return
+        event = None
+        for callback, wanted, types in list(self._subscribers.values()):
+            if level < wanted or (types is not None and event_type not in types):
+                continue
+            if event is None:
+                event = GeneratorEvent(event_type, level, time.time(), data)
+            try:
+                callback(event)
+            except Exception:
+                pass
+
+
+generator_events = EventChannel()
+
+
+def emit_event(event_type, level=None, **data) -> None:
+    """Publish a progress event on the shared generator channel"""
+    generator_events.emit(event_type, level, **data)
+
+
+def format_event(event) -> str:
+    """Console text of an event, the way the generator used to print it"""
+    data = event.data
+    if event.type == 'content_preview':
+        return "\nFirst 20 content lines:\n" + '\n'.join(
+            f"  {i}: {line.rstrip()}" for i, line in enumerate(data['lines']))
+    if event.type == 'slides_parsed':
+        return f"✓ {data['parser'].capitalize()} parser found {data['total']} slides"
+    if event.type == 'slide_started':
+        return f"  → Slide {data['index']}/{data['total']}: {data['title']}"
+    if event.type == 'slide_done':
+        return f"  ✓ Slide {data['index']}/{data['total']} done in {data['duration'] * 1000:.1f} ms"
+    if event.type == 'slide_failed':
+        return f"  ⚠ Slide {data['index']}/{data['total']} failed: {data['error'][:50]}"
+    if event.type == 'tikz_fixed':
+        return f"  ✓ Fixed TikZ block {data['count']}"
+    if event.type == 'media_progress':
+        return f"  Downloading: {data['percent']:.1f}%"
+    if event.type == 'media_fetched':
+        return f"  ✓ Downloaded: {data['path']}"
+    if event.type == 'stage_done':
+        return f"  ⏱ {data['stage']}: {data['duration'] * 1000:.1f} ms"
+    if event.type == 'generation_done':
+        return f"\nProcessed {data['processed']} slides, {data['failed']} failed ({data['duration']:.2f}s)"
+    if 'message' in data:
+        return f"  ⚠ {data['message']}" if event.level >= EVENT_LEVELS['warning'] else data['message']
+    return f"{event.type}: {data}"
+
+
+def print_event(event) -> None:
+    print(format_event(event))
+
+
+# The console keeps its old output; raise or lower it with set_console_event_level
+_console_subscription = generator_events.subscribe(print_event, 'info')
+
+
+def set_console_event_level(level) -> None:
+    """Change (or with None, stop) the generator's console output"""
+    global _console_subscription
+    generator_events.unsubscribe(_console_subscription)
+    _console_subscription = None if level is None else generator_events.subscribe(print_event, level)
+
+# ============================================================
+# ASSET MANIFEST
+# ============================================================
+
+try:
+    from .SyncTexMap import slide_marker
+except ImportError:
+    from SyncTexMap import slide_marker
+
+ASSET_MANIFEST_SUFFIX = '.assets.json'
+ASSET_VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.webm', '.mkv', '.flv', '.wmv')
+ASSET_ANIMATION_EXTENSIONS = ('.gif', '.webp')
+ASSET_GRAPHICS_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg', '.eps')
+# Media written verbatim by the author inside content lines
+INLINE_ASSET_PATTERN = re.compile(
+    r'\\(?:includegraphics|pgfimage)\s*(?:\[[^\]]*\])?\{([^}]+)\}'
+    r'|\\movie\s*(?:\[[^\]]*\])?\{(?:[^{}]|\{(?:[^{}]|\{[^{}]*\})*\})*\}\{([^}]+)\}'
+)
+
+# Lines that can reference a media file; the manifest stays valid while these are unchanged
+MEDIA_LINE_PATTERN = re.compile(
+    r'\\(?:includegraphics|pgfimage|movie|animategraphics|animate|sound|audiofile|mediapath)\b'
+    r'|\\href\{run:|media_files/'
+)
+
+
+def asset_manifest_path(tex_file: str) -> str:
+    """Path of the asset manifest written beside a generated .tex file"""
+    return os.path.splitext(tex_file)[0] + ASSET_MANIFEST_SUFFIX
+
+
+def _hash_file(path: str) -> str:
+    """SHA-256 of a file, read in 1 MiB blocks"""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def tex_media_digest(tex_file: str) -> str:
+    """SHA-256 of the media-referencing lines of a .tex, comments included"""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(tex_file, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            if MEDIA_LINE_PATTERN.search(line):
+                digest.update(line.rstrip('\n').encode('utf-8', 'surrogatepass') + b'\n')
+    return digest.hexdigest()
+
+
+class AssetManifestRecorder:
+    """Collects, frame by frame, the media files the generator writes into the .tex"""
+
+    def __init__(self, tex_file):
+        self.tex_file = os.path.abspath(tex_file)
+        self.base_dir = os.path.dirname(self.tex_file)
+        self.frames = []
+        self.assets = {}
+        self.current = None
+
+        # Hashes from the last run are reused for files whose size and mtime are unchanged
+        self.previous = {}
+        try:
+            with open(asset_manifest_path(self.tex_file), 'r', encoding='utf-8') as f:
+                self.previous = json.load(f).get('assets', {})
+        except (OSError, ValueError):
+            pass
+
+    def begin_frame(self, title):
+        self.current = {'number': len(self.frames) + 1, 'title': title, 'assets': []}
+
+    def end_frame(self, emitted=True):
+        if self.current and emitted:
+            self.frames.append(self.current)
+        self.current = None
+
+    def record(self, path, role=None, pair=None):
+        """Register one media reference of the current frame"""
+        if not path or not isinstance(path, str) or path == '\\None' or '://' in path:
+            return
+        path = path.strip()
+
+        entry = self.assets.get(path)
+        if entry is None:
+            extension = os.path.splitext(path)[1].lower()
+            if role is None:
+                if extension in ASSET_VIDEO_EXTENSIONS:
+                    role = 'video'
+                elif extension in ASSET_ANIMATION_EXTENSIONS:
+                    role = 'animation'
+                else:
+                    role = 'image'
+            entry = self.assets[path] = self._describe(path, role)
+        if pair and 'pair' not in entry:
+            entry['pair'] = pair.strip()
+
+        if self.current is not None:
+            if path not in self.current['assets']:
+                self.current['assets'].append(path)
+            if self.current['number'] not in entry['frames']:
+                entry['frames'].append(self.current['number'])
+
+    def record_inline(self, lines):
+        """Register media the author referenced directly in the frame's content"""
+        for line in lines:
+            if not isinstance(line, str) or ('\\includegraphics' not in line and '\\movie' not in line
+                                             and '\\pgfimage' not in line):
+                continue
+            for match in INLINE_ASSET_PATTERN.finditer(line):
+                if match.group(1):
+                    self.record(match.group(1))
+                else:
+                    self.record(match.group(2), 'video')
+
+    def _describe(self, path, role):
+        """Size, mtime and hash of a referenced file, resolved against the .tex directory"""
+        full_path = path if os.path.isabs(path) else os.path.join(self.base_dir, path)
+        entry = {'role': role, 'file': os.path.normpath(os.path.relpath(full_path, self.base_dir)),
+                 'exists': False, 'size': None, 'mtime': None, 'sha256': None, 'frames': []}
+        if not os.path.splitext(full_path)[1]:
+            # \\includegraphics{name} lets graphicx pick the extension
+            for extension in ASSET_GRAPHICS_EXTENSIONS:
+                if os.path.exists(full_path + extension):
+                    full_path += extension
+                    entry['file'] = os.path.normpath(os.path.relpath(full_path, self.base_dir))
+                    break
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return entry
+
+        entry.update(exists=True, size=stat.st_size, mtime=stat.st_mtime)
+        previous = self.previous.get(path) or {}
+        if previous.get('size') == stat.st_size and previous.get('mtime') == stat.st_mtime and previous.get('sha256'):
+            entry['sha256'] = previous['sha256']
+        else:
+            try:
+                entry['sha256'] = _hash_file(full_path)
+            except OSError:
+                pass
+        return entry
+
+    def write(self):
+        """Write the manifest beside the .tex, stamped with the .tex size, mtime and media digest"""
+        tex_stat = os.stat(self.tex_file)
+        manifest = {
+            'version': 1,
+            'tex': os.path.basename(self.tex_file),
+            'tex_size': tex_stat.st_size,
+            'tex_mtime': tex_stat.st_mtime,
+            'media_digest': tex_media_digest(self.tex_file),
+            'generated': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'frames': self.frames,
+            'assets': self.assets
+        }
+        manifest_file = asset_manifest_path(self.tex_file)
+        with open(manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        return manifest_file
+
+
+def record_asset(path, role=None, pair=None):
+    """Note a media file emitted into the current frame (no-op outside process_input_file)"""
+    recorder = getattr(_generation, 'asset_recorder', None)
+    if recorder is not None:
+        recorder.record(path, role, pair)
+
+
+def load_asset_manifest(tex_file: str):
+    """Read the asset manifest of a .tex file, or None if it is missing or a media line of the .tex changed.
+    Rewrites that leave the media lines alone (color definitions, preprocessing, error fixes) keep it valid."""
+    try:
+        with open(asset_manifest_path(tex_file), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        tex_stat = os.stat(tex_file)
+        if manifest.get('tex_size') == tex_stat.st_size and manifest.get('tex_mtime') == tex_stat.st_mtime:
+            return manifest
+        if manifest.get('media_digest') and manifest['media_digest'] == tex_media_digest(tex_file):
+            return manifest
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def process_input_file(file_path, output_filename='movie.tex', presentation_info=None, ide_callback=None,
+                       base_dir=None):
     r"""
     Comprehensive input file processor for BeamerSlideGenerator.
     Handles ALL features: mosaic, YouTube, layouts, media, TikZ, effects, etc.
@@ -5287,6 +5653,10 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
 
     The cleaning level can be set in the file with:
     % CLEANING_LEVEL: 3
+
+    The media files each frame references are written to <output>.assets.json.
+    media_files/ and other deck-relative paths resolve against base_dir (default: the
+    folder of the output .tex), never against the process working directory.
     """
     import re
     from collections import deque
@@ -5306,7 +5676,15 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
     failed = 0
     errors = []
     warnings = []
+    run_started = time.time()
+    stage_clock = [run_started]
 
+    def stage_done(stage):
+        now = time.time()
+        emit_event('stage_done', stage=stage, duration=now - stage_clock[0])
+        stage_clock[0] = now
+
+    previous_base_dir = set_deck_base_dir(base_dir or os.path.dirname(os.path.abspath(output_filename)))
     try:
         # ========== READ INPUT FILE ==========
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -5362,6 +5740,7 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
         # ============================================================
         # CRITICAL FIX: ONLY FIX TIKZ IF cleaning_level < 3
         # ============================================================
+        stage_done('read_and_clean')
         print("\n🔧 Fixing TikZ content...")
         if cleaning_level < 3:
             fixed_lines = []
@@ -5407,7 +5786,7 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
                                 if '\\begin{tikzpicture}' in fixed_tikz and '\\end{tikzpicture}' in fixed_tikz:
                                     fixed_lines.extend(fixed_tikz.split('\n'))
                                     tikz_fix_count += 1
-                                    print(f"  ✓ Fixed TikZ block {tikz_fix_count}")
+                                    emit_event('tikz_fixed', count=tikz_fix_count, block=tikz_block_count)
                                 else:
                                     # If fix broke the environment, use original
                                     fixed_lines.extend(tikz_buffer)
@@ -5440,6 +5819,8 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
         else:
             print("  ⏭ Skipping TikZ fixing (level 3 - preserve everything)")
 
+        stage_done('tikz_fix')
+
         # ========== DETECT FILE FORMAT ==========
         file_content = ''.join(lines)
         has_document_begin = '\\begin{document}' in file_content
@@ -5514,9 +5895,10 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
             warnings.append("Generated default preamble (no preamble found in file)")
 
         # ========== DEBUG: Print first 20 content lines ==========
-        print("\nFirst 20 content lines:")
-        for i, line in enumerate(content_lines[:20]):
-            print(f"  {i}: {line.rstrip()}")
+        if generator_events.wants('content_preview'):
+            emit_event('content_preview', lines=content_lines[:20])
+
+        stage_done('split_preamble')
 
         # ========== PARSE SLIDES ==========
         slides = []
@@ -5526,7 +5908,7 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
         native_slides = parse_native_slides_full(content_lines, warnings, cleaning_level)
         if native_slides:
             slides = native_slides
-            print(f"✓ Native parser found {len(slides)} slides")
+            emit_event('slides_parsed', parser='native', total=len(slides))
         else:
             print("✗ Native parser found no slides")
 
@@ -5534,7 +5916,7 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
             hybrid_slides = parse_hybrid_slides(content_lines, warnings, cleaning_level)
             if hybrid_slides:
                 slides = hybrid_slides
-                print(f"✓ Hybrid parser found {len(slides)} slides")
+                emit_event('slides_parsed', parser='hybrid', total=len(slides))
             else:
                 print("✗ Hybrid parser found no slides")
 
@@ -5542,7 +5924,7 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
                 latex_slides = parse_latex_slides_full(content_lines, warnings, cleaning_level)
                 if latex_slides:
                     slides = latex_slides
-                    print(f"✓ LaTeX parser found {len(slides)} slides")
+                    emit_event('slides_parsed', parser='latex', total=len(slides))
                 else:
                     print("✗ LaTeX parser found no slides")
 
@@ -5553,6 +5935,7 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
         # ============================================================
         # CRITICAL FIX: Only apply final TikZ fixes if cleaning_level < 3
         # ============================================================
+        stage_done('parse_slides')
         print("\n🔧 Applying final TikZ fixes to slides...")
         if cleaning_level < 3:
             final_tikz_fix_count = 0
@@ -5580,7 +5963,10 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
         else:
             print("  ⏭ Skipping final TikZ fixes (level 3 - preserve everything)")
 
+        stage_done('tikz_slide_fix')
+
         # ========== WRITE OUTPUT ==========
+        asset_recorder = _generation.asset_recorder = AssetManifestRecorder(output_filename)
         with open(output_filename, 'w', encoding='utf-8') as outfile:
             # Write preamble
             if preamble_lines:
@@ -5607,7 +5993,8 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
                 outfile.write("\\maketitle\n\n")
 
             # Process each slide
-            for slide in slides:
+            total_slides = len(slides)
+            for slide_index, slide in enumerate(slides, 1):
                 # Protect TikZ content before any processing
                 if slide.get('content'):
                     protected_content = []
@@ -5616,22 +6003,36 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
                             protected_line = protect_tikz_content(line)
                             protected_content.append(protected_line)
                         except Exception as e:
-                            print(f"  ⚠ Protect TikZ error: {str(e)[:50]}, using original")
+                            emit_event('warning', message=f"Protect TikZ error: {str(e)[:50]}, using original")
                             protected_content.append(line)
                     slide['content'] = protected_content
 
+                asset_recorder.begin_frame(slide.get('title', ''))
+                emit_event('slide_started', index=slide_index, total=total_slides, title=slide.get('title', ''))
+                slide_started = time.time()
+                processed_slide = None
                 try:
                     processed_slide = process_slide_with_features(slide, outfile, warnings, cleaning_level)
                     if processed_slide:
+                        asset_recorder.record_inline(slide.get('content', []))
+                        # Lets a PDF page be traced back to its source slide (see SyncTexMap)
+                        outfile.write(slide_marker(slide_index, slide.get('title', '')))
                         outfile.write(processed_slide)
                         outfile.write('\n')
                         processed += 1
+                        emit_event('slide_done', index=slide_index, total=total_slides,
+                                   title=slide.get('title', ''), duration=time.time() - slide_started)
                     else:
                         failed += 1
+                        emit_event('slide_failed', index=slide_index, total=total_slides,
+                                   title=slide.get('title', ''), error='produced no output',
+                                   duration=time.time() - slide_started)
                 except Exception as e:
-                    print(f"  ⚠ Slide processing error: {str(e)[:50]}, skipping")
                     failed += 1
                     errors.append(f"Slide {processed + 1}: {str(e)}")
+                    emit_event('slide_failed', index=slide_index, total=total_slides,
+                               title=slide.get('title', ''), error=str(e), duration=time.time() - slide_started)
+                asset_recorder.end_frame(emitted=bool(processed_slide))
 
             # After processing all slides, add \end{document} if not present
             if not has_document_end:
@@ -5643,6 +6044,7 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
         # ============================================================
         # CRITICAL FIX: Only apply final TikZ fixes to TeX if cleaning_level < 3
         # ============================================================
+        stage_done('write_slides')
         print("\n🔧 Applying final TikZ fixes to TeX output...")
         if cleaning_level < 3:
             try:
@@ -5663,7 +6065,17 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
         else:
             print("  ⏭ Skipping final TikZ fixes to TeX (level 3 - preserve everything)")
 
-        print(f"\nProcessed {processed} slides, {failed} failed")
+        stage_done('tikz_tex_fix')
+
+        # Written last so the manifest is stamped with the final .tex size and mtime
+        try:
+            manifest_file = asset_recorder.write()
+            print(f"  ✓ Asset manifest: {os.path.basename(manifest_file)} ({len(asset_recorder.assets)} files)")
+        except OSError as e:
+            print(f"  ⚠ Could not write asset manifest: {str(e)[:50]}")
+
+        stage_done('asset_manifest')
+        emit_event('generation_done', processed=processed, failed=failed, duration=time.time() - run_started)
 
         if processed == 0:
             errors.append("No slides were processed")
@@ -5677,6 +6089,9 @@ def process_input_file(file_path, output_filename='movie.tex', presentation_info
         import traceback
         traceback.print_exc()
         return processed, failed, errors
+    finally:
+        _generation.asset_recorder = None
+        set_deck_base_dir(previous_base_dir)
 
 # ============================================================
 # HELPER CLEANING FUNCTIONS
@@ -6405,12 +6820,12 @@ def process_slide_with_features(slide, outfile=None, warnings=None, cleaning_lev
         # Handle local files
         elif directive_type == 'file' and media_source:
             media_path = media_source
-            if not os.path.exists(media_path):
+            if not os.path.exists(resolve_deck_path(media_path)):
                 # Try in media_files
                 test_path = os.path.join('media_files', os.path.basename(media_path))
-                if os.path.exists(test_path):
+                if os.path.exists(resolve_deck_path(test_path)):
                     media_path = test_path
-            if os.path.exists(media_path):
+            if os.path.exists(resolve_deck_path(media_path)):
                 # Generate preview for videos
                 video_extensions = ('.mp4', '.avi', '.mov', '.webm', '.mkv', '.flv', '.wmv')
                 if media_path.lower().endswith(video_extensions):
@@ -6429,6 +6844,8 @@ def process_slide_with_features(slide, outfile=None, warnings=None, cleaning_lev
     if media_path and media_path != "\\None":
         if playable and first_frame_path:
             # Playable media with preview
+            record_asset(first_frame_path, 'preview', pair=media_path)
+            record_asset(media_path, 'video', pair=first_frame_path)
             frame_lines.append("\\begin{center}")
             frame_lines.append(f"    \\includegraphics[width=0.7\\textwidth,keepaspectratio]{{{first_frame_path}}}")
             frame_lines.append("    \\vspace{0.3em}")
@@ -6437,11 +6854,13 @@ def process_slide_with_features(slide, outfile=None, warnings=None, cleaning_lev
             frame_lines.append("\\end{center}")
         elif playable:
             # Playable media without preview
+            record_asset(media_path, 'video')
             frame_lines.append("\\begin{center}")
             frame_lines.append(f"    \\movie[externalviewer]{{\\textcolor{{blue}}{{\\underline{{Play Video}}}}}}{{{media_path}}}")
             frame_lines.append("\\end{center}")
         else:
             # Static image
+            record_asset(media_path)
             frame_lines.append("\\begin{center}")
             frame_lines.append(f"    \\includegraphics[width=0.7\\textwidth,keepaspectratio]{{{media_path}}}")
             frame_lines.append("\\end{center}")
@@ -6732,8 +7151,9 @@ import sys
 
 # Setup debug logging
 def setup_debug_logging():
-    """Setup debug logging to a file"""
+    """Setup debug logging to a file (in $BSG_DEBUG_LOG_DIR when set, else the working directory)"""
     log_filename = f"tabular_debug_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    log_filename = os.path.join(os.environ.get('BSG_DEBUG_LOG_DIR', ''), log_filename)
 
     # Create logger
     logger = logging.getLogger('tabular_debug')
@@ -6838,6 +7258,7 @@ def generate_mosaic_layout(title, params, content, media):
         # Clean image path
         if not img_path.startswith(('media_files/', './', '/')):
             img_path = f"media_files/{img_path}"
+        record_asset(img_path)
 
         frame_lines.append(f"\\includegraphics[width={col_width}\\textwidth,height=0.25\\textheight,keepaspectratio]{{{img_path}}}")
 
@@ -6867,6 +7288,7 @@ def generate_split_layout(title, params, content, media):
     image_path = params.strip()
     if not image_path.startswith(('media_files/', './')):
         image_path = f"media_files/{image_path}"
+    record_asset(image_path)
 
     frame_lines = []
     frame_lines.append(f"\\begin{{frame}}{{{title}}}")
@@ -6893,6 +7315,7 @@ def generate_pip_layout(title, params, content, media):
     image_path = params.strip()
     if not image_path.startswith(('media_files/', './')):
         image_path = f"media_files/{image_path}"
+    record_asset(image_path)
 
     frame_lines = []
     frame_lines.append(f"\\begin{{frame}}{{{title}}}")
@@ -6920,6 +7343,7 @@ def generate_fullframe_layout(title, params, content, media):
     image_path = params.strip()
     if not image_path.startswith(('media_files/', './')):
         image_path = f"media_files/{image_path}"
+    record_asset(image_path)
 
     frame_lines = []
     frame_lines.append(f"\\begin{{frame}}{{{title}}}")
@@ -6945,6 +7369,7 @@ def generate_watermark_layout(title, params, content, media):
     image_path = params.strip()
     if not image_path.startswith(('media_files/', './')):
         image_path = f"media_files/{image_path}"
+    record_asset(image_path)
 
     frame_lines = []
     frame_lines.append(f"\\begin{{frame}}{{{title}}}")
@@ -6969,6 +7394,7 @@ def generate_highlight_layout(title, params, content, media):
     image_path = params.strip()
     if not image_path.startswith(('media_files/', './')):
         image_path = f"media_files/{image_path}"
+    record_asset(image_path)
 
     frame_lines = []
     frame_lines.append(f"\\begin{{frame}}{{{title}}}")
@@ -6999,6 +7425,7 @@ def generate_background_layout(title, params, content, media):
     image_path = params.strip()
     if not image_path.startswith(('media_files/', './')):
         image_path = f"media_files/{image_path}"
+    record_asset(image_path)
 
     frame_lines = []
     frame_lines.append(f"\\begin{{frame}}{{{title}}}")
@@ -7025,6 +7452,7 @@ def generate_topbottom_layout(title, params, content, media):
     image_path = params.strip()
     if not image_path.startswith(('media_files/', './')):
         image_path = f"media_files/{image_path}"
+    record_asset(image_path)
 
     frame_lines = []
     frame_lines.append(f"\\begin{{frame}}{{{title}}}")
@@ -7049,6 +7477,7 @@ def generate_overlay_layout(title, params, content, media):
     image_path = parts[0].strip()
     if not image_path.startswith(('media_files/', './')):
         image_path = f"media_files/{image_path}"
+    record_asset(image_path)
 
     frame_lines = []
     frame_lines.append(f"\\begin{{frame}}{{{title}}}")
@@ -7077,6 +7506,7 @@ def generate_corner_layout(title, params, content, media):
 
     if not image_path.startswith(('media_files/', './')):
         image_path = f"media_files/{image_path}"
+    record_asset(image_path)
 
     positions = {
         'tl': ('0.05\\textwidth', '0.05\\textheight', 'north west'),
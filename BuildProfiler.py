@@ -0,0 +1,170 @@
+#----------------------------------------------Build Profiler ------------------------------------
+"""
+BuildProfiler.py
+Timing spans and counters for one PDF build. Spans are context managers that nest
+per thread; the result is written as Chrome trace-event JSON (open it in
+chrome://tracing or ui.perfetto.dev) and summarised as a per-stage table.
+Generator progress events can be attached so per-slide work shows up in the trace.
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+TRACE_SUFFIX = '.trace.json'
+
+
+class BuildProfiler:
+    """Records spans (name, start, duration) and counters relative to its creation"""
+
+    def __init__(self, name: str = 'build'):
+        self.name = name
+        self.spans = []          # (name, category, start, duration, thread id, args)
+        self.counters = {}       # name -> current value
+        self.counter_samples = []  # (name, time, value) for the trace's counter tracks
+        self.instants = []       # (name, category, time, thread id, args)
+        self.started = time.time()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        """Seconds since the profiler was created"""
+        return time.perf_counter() - self._origin
+
+    @contextmanager
+    def span(self, name: str, category: str = 'build', **args):
+        """Time the enclosed block; exceptions are recorded and re-raised"""
+        start = self.now()
+        try:
+            yield args
+        except BaseException as e:
+            args['error'] = type(e).__name__
+            raise
+        finally:
+            self.add_span(name, start, self.now() - start, category, args)
+
+    def add_span(self, name: str, start: float, duration: float, category: str = 'build',
+                 args: dict = None, thread_id: int = None) -> None:
+        """Record a span measured elsewhere (start in profiler seconds)"""
+        with self._lock:
+            self.spans.append((name, category, start, max(0.0, duration),
+                               thread_id or threading.get_ident(), args or {}))
+
+    def count(self, name: str, value=1) -> None:
+        """Add to a counter"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            self.counter_samples.append((name, self.now(), self.counters[name]))
+
+    def mark(self, name: str, category: str = 'build', **args) -> None:
+        """Record a point in time"""
+        with self._lock:
+            self.instants.append((name, category, self.now(), threading.get_ident(), args))
+
+    # ---------- generator events ----------
+
+    def attach(self, channel) -> int:
+        """Record the slide generator's events on this profiler; returns the subscription token"""
+        return channel.subscribe(self._on_generator_event, 'debug',
+                                 types=('slide_done', 'slide_failed', 'stage_done', 'tikz_fixed', 'media_fetched'))
+
+    def _on_generator_event(self, event) -> None:
+        data = event.data
+        if event.type in ('slide_done', 'slide_failed'):
+            # The event arrives when the slide finishes; place the span where the work happened
+            end = self.now() - (time.time() - event.time)
+            args = {'index': data['index'], 'title': data['title']}
+            if event.type == 'slide_failed':
+                args['error'] = data['error'][:200]
+            self.add_span('slide', end - data['duration'], data['duration'], 'generator', args)
+            self.count('slides' if event.type == 'slide_done' else 'slides_failed')
+        elif event.type == 'stage_done':
+            end = self.now() - (time.time() - event.time)
+            self.add_span('generator.' + data['stage'], end - data['duration'], data['duration'], 'generator')
+        elif event.type == 'tikz_fixed':
+            self.count('tikz_fixes')
+        elif event.type == 'media_fetched':
+            self.count('media_fetched')
+            self.mark('media_fetched', 'generator', path=data['path'])
+
+    # ---------- reports ----------
+
+    def chrome_trace(self) -> dict:
+        """The recording in Chrome trace-event format (timestamps in microseconds)"""
+        pid = os.getpid()
+        threads = {}
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': self.name}}]
+
+        def tid(thread_id):
+            return threads.setdefault(thread_id, len(threads) + 1)
+
+        with self._lock:
+            for name, category, start, duration, thread_id, args in self.spans:
+                events.append({'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': tid(thread_id),
+                               'ts': round(start * 1e6, 1), 'dur': round(duration * 1e6, 1), 'args': args})
+            for name, category, at, thread_id, args in self.instants:
+                events.append({'name': name, 'cat': category, 'ph': 'i', 's': 't', 'pid': pid,
+                               'tid': tid(thread_id), 'ts': round(at * 1e6, 1), 'args': args})
+            for name, at, value in self.counter_samples:
+                events.append({'name': name, 'ph': 'C', 'pid': pid, 'ts': round(at * 1e6, 1),
+                               'args': {name: value}})
+
+        # Sorting by start, longest first, keeps parents ahead of their children
+        events[1:] = sorted(events[1:], key=lambda e: (e['ts'], -e.get('dur', 0)))
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'build': self.name, 'started': time.strftime('%Y-%m-%d %H:%M:%S',
+                                                                       time.localtime(self.started)),
+                          'counters': dict(self.counters)},
+        }
+
+    def write_trace(self, path: str) -> str:
+        """Write the Chrome trace JSON; returns the path"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    def summary(self) -> list:
+        """Per-name totals, as dicts sorted by total time"""
+        rows = {}
+        with self._lock:
+            for name, category, start, duration, thread_id, args in self.spans:
+                row = rows.setdefault(name, {'name': name, 'category': category, 'calls': 0,
+                                             'total': 0.0, 'max': 0.0, 'first': start})
+                row['calls'] += 1
+                row['total'] += duration
+                row['max'] = max(row['max'], duration)
+                row['first'] = min(row['first'], start)
+        return sorted(rows.values(), key=lambda row: (-row['total'], row['first']))
+
+    def format_summary(self, root: str = None) -> str:
+        """Text table of the summary; shares are relative to the root span (or the time so far)"""
+        rows = self.summary()
+        if not rows:
+            return "No spans recorded\n"
+        reference = next((row['total'] for row in rows if row['name'] == root), None) or self.now() or 1e-9
+
+        name_width = max(12, max(len(row['name']) for row in rows))
+        lines = [f"{'Stage':<{name_width}}  {'Calls':>5}  {'Total s':>9}  {'Mean ms':>9}  {'Max ms':>9}  {'Share':>6}",
+                 '-' * (name_width + 50)]
+        for row in rows:
+            lines.append(f"{row['name']:<{name_width}}  {row['calls']:>5}  {row['total']:>9.3f}  "
+                         f"{row['total'] / row['calls'] * 1000:>9.1f}  {row['max'] * 1000:>9.1f}  "
+                         f"{row['total'] / reference:>6.1%}")
+        lines.append(f"{'Elapsed':<{name_width}}  {'':>5}  {self.now():>9.3f}")
+        if self.counters:
+            lines.append('')
+            lines.append('Counters: ' + ', '.join(f"{name}={value}" for name, value in sorted(self.counters.items())))
+        return '\n'.join(lines) + '\n'
+
+
+def trace_path_for(tex_file: str, directory: str = None) -> str:
+    """Trace file of a build: <build dir>/<deck>.trace.json"""
+    stem = os.path.splitext(os.path.basename(tex_file))[0]
+    return os.path.join(directory or os.path.dirname(os.path.abspath(tex_file)), stem + TRACE_SUFFIX)
+
+#------------------------------------------End Build Profiler -----------------------------------------
@@ -97,6 +97,15 @@ class BSGIDEBuildDeploy:
             "InteractiveTerminal.py",
             "Grammarly.py",
             "EnhancedCommandDialog.py",
+            "LatexBuild.py",
+            "DeckSearchIndex.py",
+            "DeckExport.py",
+            "PackageIndex.py",
+            "LatexCommandDB.py",
+            "BuildProfiler.py",
+            "BatchBuild.py",
+            "SlidePreview.py",
+            "SyncTexMap.py",
         ]
 
         for file in source_files:
@@ -535,6 +544,7 @@ class BSGIDEBuildDeploy:
             '        "console_scripts": [',
             '            "bsg-ide = bsg_ide.BSG_IDE:launch_ide",',
             '            "bsg = bsg_ide.BSG_IDE:launch_ide",',
+            '            "bsg-build = bsg_ide.BatchBuild:main",',
             '        ],',
             '        "gui_scripts": [',
             '            "bsg-ide-gui = bsg_ide.BSG_IDE:launch_ide",',
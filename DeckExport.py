@@ -0,0 +1,148 @@
+#----------------------------------------------Deck Export ------------------------------------
+"""
+DeckExport.py
+Streams a generated deck and its media into a zip archive (Overleaf upload or backup).
+Already-compressed media is stored as-is and only text is deflated. When an existing
+archive's media is unchanged, those entries are copied from it instead of being re-read
+from the media folder. The archive is always written to a temporary file and swapped in
+on success, so a failed export never touches the previous one.
+Nothing in here touches Tk, so the IDE can run it on a worker thread.
+"""
+import os
+import time
+import shutil
+import zipfile
+
+# Deflating these again costs CPU and saves next to nothing
+STORED_EXTENSIONS = {
+    '.mp4', '.m4v', '.mov', '.avi', '.mkv', '.webm', '.flv', '.wmv', '.ogv',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf',
+    '.mp3', '.m4a', '.ogg', '.flac', '.aac',
+    '.zip', '.gz', '.bz2', '.xz', '.7z'
+}
+COMPRESS_LEVEL = 6
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def _zip_date_time(mtime: float) -> tuple:
+    """Zip timestamp of an mtime, with the two-second resolution the format stores"""
+    date_time = time.localtime(mtime)[:6]
+    return date_time[:5] + (date_time[5] // 2 * 2,)
+
+
+def _compress_type(path: str) -> int:
+    """ZIP_STORED for already-compressed media, ZIP_DEFLATED for everything else"""
+    return zipfile.ZIP_STORED if os.path.splitext(path)[1].lower() in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def plan_archive(tex_file: str, assets: dict) -> tuple:
+    """Split the export into media entries and the volatile tail (.tex), as (arcname, path) pairs"""
+    tex_dir = os.path.dirname(os.path.abspath(tex_file))
+    media = []
+    for name in sorted(assets):
+        entry = assets[name]
+        if not entry.get('exists', True):
+            continue
+        path = os.path.join(tex_dir, entry.get('file', name))
+        arcname = os.path.normpath(entry.get('file', name)).replace(os.sep, '/')
+        if arcname.startswith('../') or os.path.isabs(arcname):
+            arcname = 'media_files/' + os.path.basename(path)
+        media.append((arcname, path))
+    return media, [(os.path.basename(tex_file), os.path.abspath(tex_file))]
+
+
+def _reusable_archive(zip_path: str, media: list, tail_names: set):
+    """Open an existing archive for reading if its media entries match the files on disk, else None"""
+    try:
+        previous = zipfile.ZipFile(zip_path, 'r')
+    except (OSError, zipfile.BadZipFile):
+        return None
+
+    infos = {info.filename: info for info in previous.infolist()}
+    unchanged = set(infos) - tail_names == {arcname for arcname, path in media}
+    if unchanged:
+        for arcname, path in media:
+            info = infos[arcname]
+            try:
+                stat = os.stat(path)
+            except OSError:
+                unchanged = False
+                break
+            if (info.file_size != stat.st_size or info.date_time != _zip_date_time(stat.st_mtime)
+                    or info.compress_type != _compress_type(path)):
+                unchanged = False
+                break
+
+    if not unchanged:
+        previous.close()
+        return None
+    return previous
+
+
+def _copy_entry(previous: zipfile.ZipFile, zipf: zipfile.ZipFile, arcname: str) -> None:
+    """Copy one entry between archives, keeping its timestamp, attributes and compression"""
+    info = previous.getinfo(arcname)
+    copied = zipfile.ZipInfo(arcname, info.date_time)
+    copied.compress_type = info.compress_type
+    copied.external_attr = info.external_attr
+    copied.file_size = info.file_size   # lets zipfile decide on zip64 up front
+    with previous.open(info) as source, zipf.open(copied, 'w', force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as target:
+        shutil.copyfileobj(source, target, COPY_BUFFER_SIZE)
+
+
+def export_deck_archive(zip_path: str, tex_file: str, assets: dict, extra_entries: dict = None,
+                        incremental: bool = True, progress_callback=None) -> dict:
+    """Write the deck archive; returns counts of written, reused, stored and deflated entries"""
+    media, tail = plan_archive(tex_file, assets)
+    extra_entries = extra_entries or {}
+    tail_names = {arcname for arcname, path in tail} | set(extra_entries)
+    report = {'mode': 'full', 'written': 0, 'reused': 0, 'stored': 0, 'deflated': 0,
+              'bytes': 0, 'total_bytes': 0, 'zip_path': zip_path}
+
+    previous = _reusable_archive(zip_path, media, tail_names) if incremental and os.path.exists(zip_path) else None
+    if previous is not None:
+        report['mode'] = 'incremental'
+
+    sizes = {path: os.path.getsize(path) for arcname, path in media + tail}
+    report['total_bytes'] = sum(sizes.values())
+
+    def advance(arcname, path):
+        report['written'] += 1
+        report['bytes'] += sizes[path]
+        if progress_callback:
+            progress_callback(report['bytes'], report['total_bytes'], arcname)
+
+    # The previous archive stays untouched until the new one is complete
+    target = zip_path + '.part'
+    try:
+        with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as zipf:
+            for arcname, path in media:
+                if previous is not None:
+                    _copy_entry(previous, zipf, arcname)
+                    report['reused'] += 1
+                else:
+                    zipf.write(path, arcname, compress_type=_compress_type(path))
+                    report['stored' if _compress_type(path) == zipfile.ZIP_STORED else 'deflated'] += 1
+                advance(arcname, path)
+
+            for arcname, path in tail:
+                zipf.write(path, arcname, compress_type=_compress_type(path))
+                report['stored' if _compress_type(path) == zipfile.ZIP_STORED else 'deflated'] += 1
+                advance(arcname, path)
+
+            for arcname, content in extra_entries.items():
+                zipf.writestr(arcname, content)
+    except BaseException:
+        try:
+            os.remove(target)
+        except OSError:
+            pass
+        raise
+    finally:
+        if previous is not None:
+            previous.close()
+
+    os.replace(target, zip_path)
+    return report
+
+#------------------------------------------End Deck Export -----------------------------------------
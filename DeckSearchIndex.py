@@ -0,0 +1,223 @@
+#----------------------------------------------Deck Search Index ------------------------------------
+"""
+DeckSearchIndex.py
+In-memory inverted index over slide titles, media directives, content and notes.
+Decks are indexed slide by slide so the IDE can refresh a single slide on save,
+and every .txt deck in a folder can be added for cross-deck lookups.
+"""
+import os
+import re
+import bisect
+import hashlib
+
+TOKEN_PATTERN = re.compile(r'\\?[\w@]+')
+FIELD_ORDER = {'title': 0, 'media': 1, 'content': 2, 'notes': 3}
+
+
+def tokenize(text: str) -> list:
+    """Lower-cased words and LaTeX control sequences; paths split on / . and -"""
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+def index_tokens(text: str) -> set:
+    """Tokens stored for a line: control sequences are findable with and without the backslash"""
+    tokens = set(tokenize(text))
+    tokens.update(token[1:] for token in list(tokens) if token.startswith('\\'))
+    return tokens
+
+
+def slide_signature(slide: dict) -> str:
+    """Digest of every indexed field of a slide, so in-place edits are noticed"""
+    parts = [slide.get('title', ''), slide.get('media', '')]
+    for field in ('content', 'notes'):
+        parts.append(str(len(slide.get(field, []))))
+        parts.extend(slide.get(field, []))
+    return hashlib.sha1('\x00'.join(parts).encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def parse_deck_text(text: str) -> list:
+    """Read the slides of a BSG .txt deck (title, media directive, content and notes)"""
+    slides = []
+    slide = None
+    section = None
+    media_pending = False
+
+    for raw in text.split('\n'):
+        line = raw.rstrip()
+        bare = re.sub(r'^\s*%\s*', '', line)
+
+        title_match = re.match(r'^\\title\s+(.+)$', bare)
+        if title_match and section is None:
+            slide = {'title': title_match.group(1).strip(), 'media': '', 'content': [], 'notes': []}
+            slides.append(slide)
+            continue
+        if slide is None:
+            continue
+
+        if re.match(r'^\\begin\{Content\}', bare):
+            section, media_pending = 'content', True
+        elif re.match(r'^\\end\{Content\}', bare) or re.match(r'^\\end\{Notes\}', bare):
+            section = None
+        elif re.match(r'^\\begin\{Notes\}', bare):
+            section = 'notes'
+        elif section == 'content' and media_pending:
+            media_pending = False
+            slide['media'] = '' if bare.strip() == '\\None' else bare.strip()
+        elif section and bare.strip():
+            slide[section].append(bare)
+
+    return slides
+
+
+class DeckSearchIndex:
+    """Inverted index answering prefix and regex queries over one or more decks"""
+
+    def __init__(self):
+        self.records = {}        # record id -> (deck, slide, field, line, text)
+        self.postings = {}       # token -> set of record ids
+        self.sorted_tokens = []  # all tokens, sorted, for prefix lookups
+        self.slide_records = {}  # (deck, slide) -> list of record ids
+        self.slide_signatures = {} # deck -> slide_signature of each slide at indexing time
+        self.deck_mtimes = {}    # deck path -> mtime of the indexed file
+        self._next_id = 0
+
+    # ---------- maintenance ----------
+
+    def index_slide(self, deck: str, slide_index: int, slide: dict) -> None:
+        """(Re)index one slide"""
+        self.remove_slide(deck, slide_index)
+        record_ids = []
+
+        fields = [('title', [slide.get('title', '')]), ('media', [slide.get('media', '')]),
+                  ('content', slide.get('content', [])), ('notes', slide.get('notes', []))]
+        for field, lines in fields:
+            for line_index, text in enumerate(lines):
+                if not text:
+                    continue
+                record_id = self._next_id
+                self._next_id += 1
+                self.records[record_id] = (deck, slide_index, field, line_index, text)
+                record_ids.append(record_id)
+                for token in index_tokens(text):
+                    postings = self.postings.get(token)
+                    if postings is None:
+                        postings = self.postings[token] = set()
+                        bisect.insort(self.sorted_tokens, token)
+                    postings.add(record_id)
+
+        self.slide_records[(deck, slide_index)] = record_ids
+
+    def remove_slide(self, deck: str, slide_index: int) -> None:
+        """Drop every record of one slide from the index"""
+        for record_id in self.slide_records.pop((deck, slide_index), []):
+            text = self.records.pop(record_id)[4]
+            for token in index_tokens(text):
+                postings = self.postings.get(token)
+                if postings is None:
+                    continue
+                postings.discard(record_id)
+                if not postings:
+                    del self.postings[token]
+                    position = bisect.bisect_left(self.sorted_tokens, token)
+                    if position < len(self.sorted_tokens) and self.sorted_tokens[position] == token:
+                        del self.sorted_tokens[position]
+
+    def sync_deck(self, deck: str, slides: list, changed_index: int = None) -> int:
+        """Reindex only slides whose text changed, moved, or were added or removed; returns the count"""
+        previous = self.slide_signatures.get(deck, [])
+        current = [slide_signature(slide) for slide in slides]
+        updated = 0
+
+        for index, slide in enumerate(slides):
+            if index == changed_index or index >= len(previous) or previous[index] != current[index]:
+                self.index_slide(deck, index, slide)
+                updated += 1
+        for index in range(len(slides), len(previous)):
+            self.remove_slide(deck, index)
+            updated += 1
+
+        self.slide_signatures[deck] = current
+        return updated
+
+    def remove_deck(self, deck: str) -> None:
+        """Forget a deck entirely"""
+        for index in range(len(self.slide_signatures.pop(deck, []))):
+            self.remove_slide(deck, index)
+        self.deck_mtimes.pop(deck, None)
+
+    def index_file(self, path: str) -> bool:
+        """Index a .txt deck from disk unless it is unchanged since the last run"""
+        path = os.path.abspath(path)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return False
+        if self.deck_mtimes.get(path) == mtime:
+            return False
+
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            slides = parse_deck_text(f.read())
+        if not slides:
+            return False
+
+        self.remove_deck(path)
+        self.sync_deck(path, slides)
+        self.deck_mtimes[path] = mtime
+        return True
+
+    def index_directory(self, directory: str, skip: str = None) -> int:
+        """Index every .txt deck in a directory; returns how many were (re)indexed"""
+        indexed = 0
+        skip = os.path.abspath(skip) if skip else None
+        for name in sorted(os.listdir(directory)):
+            path = os.path.abspath(os.path.join(directory, name))
+            if name.lower().endswith('.txt') and path != skip and os.path.isfile(path):
+                indexed += self.index_file(path)
+        return indexed
+
+    # ---------- queries ----------
+
+    def search(self, query: str, regex: bool = False, case_sensitive: bool = False,
+               deck: str = None, limit: int = 500) -> list:
+        """Find lines matching all query words (last word as a prefix) or a regular expression"""
+        if not query.strip():
+            return []
+
+        if regex:
+            pattern = re.compile(query, 0 if case_sensitive else re.IGNORECASE)
+            candidates = (rid for rid, record in self.records.items() if pattern.search(record[4]))
+        else:
+            terms = tokenize(query)
+            if not terms:
+                return []
+            matched = None
+            for position, term in enumerate(terms):
+                ids = self._postings_for(term, prefix=position == len(terms) - 1)
+                matched = ids if matched is None else matched & ids
+                if not matched:
+                    return []
+            candidates = matched
+
+        results = []
+        for record_id in candidates:
+            record = self.records[record_id]
+            if deck is None or record[0] == deck:
+                results.append(record)
+
+        results.sort(key=lambda r: (r[0], r[1], FIELD_ORDER.get(r[2], 9), r[3]))
+        return [{'deck': r[0], 'slide': r[1], 'field': r[2], 'line': r[3], 'text': r[4]}
+                for r in results[:limit]]
+
+    def _postings_for(self, term: str, prefix: bool) -> set:
+        """Record ids for an exact token, or for every token starting with it"""
+        if not prefix:
+            return set(self.postings.get(term, ()))
+
+        ids = set()
+        position = bisect.bisect_left(self.sorted_tokens, term)
+        while position < len(self.sorted_tokens) and self.sorted_tokens[position].startswith(term):
+            ids |= self.postings[self.sorted_tokens[position]]
+            position += 1
+        return ids
+
+#------------------------------------------End Deck Search Index -----------------------------------------
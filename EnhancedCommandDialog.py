@@ -1,6 +1,16 @@
+import sys
+import bisect
+import tkinter as tk
+import customtkinter as ctk
+from tkinter import messagebox
+
 class EnhancedCommandIndexDialog(ctk.CTkToplevel):
     """Enhanced LaTeX command index with comprehensive listing and filtering"""
 
+    ROW_OVERSCAN = 4           # rows built above and below the viewport
+    _shared_commands = None    # command database, built once and shared by every opening
+    _shared_entries = None     # (category, command, lowercase search key) for each command
+
     def __init__(self, parent):
         super().__init__(parent)
         self.title("BSG-IDE Enhanced Command Reference")
@@ -11,8 +21,16 @@ class EnhancedCommandIndexDialog(ctk.CTkToplevel):
         self.center_dialog()
 
         # Enhanced command database
-        self.commands = self.build_enhanced_command_database()
+        self.commands, self.search_entries = self.get_shared_command_database()
         self.filtered_commands = self.commands.copy()
+        self.active_category = "All"
+        self._last_query = ""
+        self._last_matches = self.search_entries
+
+        # Virtualized list state
+        self._rows = []          # (kind, data, height) for every row of the current view
+        self._row_offsets = []   # y of each row inside the list canvas
+        self._row_widgets = {}   # row index -> (widget, canvas item) for rows built so far
 
         # Display options
         self.display_options = {
@@ -25,6 +43,20 @@ class EnhancedCommandIndexDialog(ctk.CTkToplevel):
         self.create_enhanced_widgets()
         self.after(100, self._safe_grab_set)
 
+    def get_shared_command_database(self):
+        """Command database and precomputed search keys, built on the first opening only"""
+        cls = type(self)
+        if cls._shared_commands is None:
+            commands = self.build_enhanced_command_database()
+            cls._shared_entries = [
+                (category, cmd, '\n'.join((cmd['command'], cmd['description'],
+                                           cmd.get('usage', ''), cmd['syntax'])).lower())
+                for category, category_commands in commands.items()
+                for cmd in category_commands
+            ]
+            cls._shared_commands = commands
+        return cls._shared_commands, cls._shared_entries
+
     def build_enhanced_command_database(self):
         """Build comprehensive command database with display options"""
         return {
@@ -422,9 +454,20 @@ class EnhancedCommandIndexDialog(ctk.CTkToplevel):
         content_frame = ctk.CTkFrame(main_frame)
         content_frame.pack(fill="both", expand=True, padx=5, pady=5)
 
-        # Create scrollable content area
-        self.scrollable_frame = ctk.CTkScrollableFrame(content_frame)
-        self.scrollable_frame.pack(fill="both", expand=True)
+        # Virtualized content area: only rows inside the viewport get widgets
+        canvas_bg = "#2b2b2b" if ctk.get_appearance_mode() == "Dark" else "#dbdbdb"
+        self.list_canvas = tk.Canvas(content_frame, highlightthickness=0, bg=canvas_bg,
+                                     yscrollincrement=40)
+        self.list_scrollbar = ctk.CTkScrollbar(content_frame, command=self.list_canvas.yview)
+        self.list_scrollbar.pack(side="right", fill="y")
+        self.list_canvas.pack(side="left", fill="both", expand=True)
+        self.list_canvas.configure(yscrollcommand=self._on_list_scrolled)
+        self.list_canvas.bind('<Configure>', self._on_list_resized)
+        self.list_canvas.bind('<Enter>', self._bind_mousewheel)
+        self.list_canvas.bind('<Leave>', self._unbind_mousewheel)
+        self.bind('<Destroy>', self._on_destroy, add='+')
+        # Rows are created as children of the canvas
+        self.scrollable_frame = self.list_canvas
 
         # Statistics label
         self.stats_label = ctk.CTkLabel(main_frame, text="", font=("Arial", 10))
@@ -448,10 +491,7 @@ class EnhancedCommandIndexDialog(ctk.CTkToplevel):
 
     def filter_by_category(self, category):
         """Filter commands by category"""
-        if category == "All":
-            self.filtered_commands = self.commands.copy()
-        else:
-            self.filtered_commands = {category: self.commands.get(category, [])}
+        self.active_category = category
 
         # Update button states
         for cat, btn in self.category_buttons.items():
@@ -460,59 +500,48 @@ class EnhancedCommandIndexDialog(ctk.CTkToplevel):
             else:
                 btn.configure(fg_color="#3B8ED0", hover_color="#3672A4")
 
+        self.apply_filters()
+
+    def apply_filters(self):
+        """Combine the current search matches with the category filter"""
+        self.filtered_commands = {}
+        for category, cmd, key in self._last_matches:
+            if self.active_category in ("All", category):
+                self.filtered_commands.setdefault(category, []).append(cmd)
         self.refresh_display()
 
     def display_commands(self):
         """Display commands based on current view mode"""
         # Clear existing content
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        self._clear_rows()
 
         if not self.filtered_commands:
-            ctk.CTkLabel(self.scrollable_frame,
-                        text="No commands found matching your criteria",
-                        font=("Arial", 12)).pack(pady=20)
-            return
+            self._rows = [('message', "No commands found matching your criteria", 60)]
+            self.stats_label.configure(text="Showing 0 commands")
+        else:
+            total_commands = sum(len(commands) for commands in self.filtered_commands.values())
+            self.stats_label.configure(text=f"Showing {total_commands} commands")
 
-        total_commands = sum(len(commands) for commands in self.filtered_commands.values())
-        self.stats_label.configure(text=f"Showing {total_commands} commands")
+            if self.view_var.get() == "categorized":
+                self.display_categorized()
+            else:
+                self.display_flat_list()
 
-        if self.view_var.get() == "categorized":
-            self.display_categorized()
-        else:
-            self.display_flat_list()
+        self._layout_rows()
 
     def display_categorized(self):
         """Display commands organized by categories"""
-        row = 0
         for category, commands in self.filtered_commands.items():
             if not commands:
                 continue
 
-            # Category header
-            cat_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="#2B3A42")
-            cat_frame.grid(row=row, column=0, sticky="ew", padx=5, pady=10)
-            cat_frame.grid_columnconfigure(0, weight=1)
-
-            ctk.CTkLabel(cat_frame, text=category, font=("Arial", 14, "bold"),
-                        text_color="#4ECDC4").grid(row=0, column=0, sticky="w", padx=10, pady=5)
-
-            row += 1
-
-            # Commands in this category
-            for i, cmd in enumerate(commands):
-                cmd_frame = self.create_command_frame(cmd, i)
-                cmd_frame.grid(row=row, column=0, sticky="ew", padx=10, pady=5)
-                row += 1
-
-            # Add some space between categories
-            spacer = ctk.CTkFrame(self.scrollable_frame, height=10, fg_color="transparent")
-            spacer.grid(row=row, column=0, sticky="ew", pady=5)
-            row += 1
+            # Category header, with the space between categories folded into its height
+            self._rows.append(('header', category, 60))
+            for cmd in commands:
+                self._rows.append(('command', cmd, self._command_row_height(cmd)))
 
     def display_flat_list(self):
         """Display all commands in a flat list"""
-        row = 0
         all_commands = []
         for commands in self.filtered_commands.values():
             all_commands.extend(commands)
@@ -520,10 +549,115 @@ class EnhancedCommandIndexDialog(ctk.CTkToplevel):
         # Sort alphabetically by command name
         all_commands.sort(key=lambda x: x['command'])
 
-        for i, cmd in enumerate(all_commands):
-            cmd_frame = self.create_command_frame(cmd, i)
-            cmd_frame.grid(row=row, column=0, sticky="ew", padx=10, pady=2)
-            row += 1
+        for cmd in all_commands:
+            self._rows.append(('command', cmd, self._command_row_height(cmd)))
+
+    def _command_row_height(self, command_data):
+        """Fixed height of a command row for the current display toggles"""
+        height = 110
+        if self.syntax_var.get():
+            height += 32
+        if self.examples_var.get() and command_data.get('example'):
+            height += 90
+        return height
+
+    def _clear_rows(self):
+        """Destroy every built row and forget the current view"""
+        for widget, item in self._row_widgets.values():
+            widget.destroy()
+        self.list_canvas.delete("all")
+        self._row_widgets = {}
+        self._rows = []
+        self._row_offsets = []
+
+    def _layout_rows(self):
+        """Compute row positions and the scroll region, then build the visible rows"""
+        offset = 0
+        for kind, data, height in self._rows:
+            self._row_offsets.append(offset)
+            offset += height
+        self.list_canvas.configure(scrollregion=(0, 0, 0, offset))
+        self.list_canvas.yview_moveto(0)
+        self._render_visible_rows()
+
+    def _render_visible_rows(self):
+        """Build widgets for rows in (or near) the viewport and destroy the rest"""
+        if not self._rows:
+            return
+        top = self.list_canvas.canvasy(0)
+        bottom = top + max(self.list_canvas.winfo_height(), 1)
+        first = max(0, bisect.bisect_right(self._row_offsets, top) - 1 - self.ROW_OVERSCAN)
+        last = min(len(self._rows), bisect.bisect_left(self._row_offsets, bottom) + self.ROW_OVERSCAN)
+
+        for index in [i for i in self._row_widgets if not first <= i < last]:
+            widget, item = self._row_widgets.pop(index)
+            self.list_canvas.delete(item)
+            widget.destroy()
+
+        width = max(self.list_canvas.winfo_width() - 20, 200)
+        for index in range(first, last):
+            if index in self._row_widgets:
+                continue
+            kind, data, height = self._rows[index]
+            if kind == 'header':
+                widget = ctk.CTkFrame(self.scrollable_frame, fg_color="#2B3A42")
+                widget.grid_columnconfigure(0, weight=1)
+                ctk.CTkLabel(widget, text=data, font=("Arial", 14, "bold"),
+                            text_color="#4ECDC4").grid(row=0, column=0, sticky="w", padx=10, pady=5)
+                pad = 10
+            elif kind == 'message':
+                widget = ctk.CTkLabel(self.scrollable_frame, text=data, font=("Arial", 12))
+                pad = 20
+            else:
+                widget = self.create_command_frame(data, index)
+                pad = 5
+            item = self.list_canvas.create_window(10, self._row_offsets[index] + pad, window=widget,
+                                                  anchor="nw", width=width, height=height - 2 * pad)
+            self._row_widgets[index] = (widget, item)
+
+    def _on_list_scrolled(self, first, last):
+        """Keep the scrollbar in sync and build the rows that scrolled into view"""
+        self.list_scrollbar.set(first, last)
+        self._render_visible_rows()
+
+    def _on_list_resized(self, event):
+        """Stretch built rows to the new width and fill a taller viewport"""
+        width = max(event.width - 20, 200)
+        for widget, item in self._row_widgets.values():
+            self.list_canvas.itemconfigure(item, width=width)
+        self._render_visible_rows()
+
+    def _bind_mousewheel(self, event=None):
+        """Scroll the list with the wheel while the pointer is over it (rows included)"""
+        self.list_canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+        if sys.platform.startswith('linux'):
+            self.list_canvas.bind_all("<Button-4>", self._on_mousewheel)
+            self.list_canvas.bind_all("<Button-5>", self._on_mousewheel)
+
+    def _unbind_mousewheel(self, event=None):
+        """Release the global wheel bindings"""
+        try:
+            self.list_canvas.unbind_all("<MouseWheel>")
+            if sys.platform.startswith('linux'):
+                self.list_canvas.unbind_all("<Button-4>")
+                self.list_canvas.unbind_all("<Button-5>")
+        except tk.TclError:
+            pass
+
+    def _on_mousewheel(self, event):
+        """Handle mouse wheel and touchpad scrolling"""
+        if event.num == 4:  # Linux up
+            step = -1
+        elif event.num == 5:  # Linux down
+            step = 1
+        else:
+            step = -1 if event.delta > 0 else 1
+        self.list_canvas.yview_scroll(step, "units")
+
+    def _on_destroy(self, event):
+        """Drop global bindings when the dialog goes away"""
+        if event.widget == self:
+            self._unbind_mousewheel()
 
     def create_command_frame(self, command_data, index):
         """Create a detailed frame for a single command"""
@@ -577,7 +711,7 @@ class EnhancedCommandIndexDialog(ctk.CTkToplevel):
             ctk.CTkLabel(example_frame, text="Example:", font=("Arial", 10, "bold")).grid(
                 row=0, column=0, sticky="w", padx=5, pady=2)
 
-            example_text = ctk.CTkTextbox(example_frame, height=3, font=("Courier", 9))
+            example_text = ctk.CTkTextbox(example_frame, height=48, font=("Courier", 9))
             example_text.grid(row=1, column=0, sticky="ew", padx=5, pady=2)
             example_text.insert("1.0", command_data['example'])
             example_text.configure(state="disabled")
@@ -599,23 +733,18 @@ class EnhancedCommandIndexDialog(ctk.CTkToplevel):
     def filter_commands(self, event=None):
         """Filter commands based on search text"""
         search_text = self.search_var.get().lower()
+        if search_text == self._last_query:
+            return
 
-        if not search_text:
-            self.filtered_commands = self.commands.copy()
+        # A query that extends the previous one can only narrow its matches
+        candidates = self._last_matches if search_text.startswith(self._last_query) else self.search_entries
+        if search_text:
+            self._last_matches = [entry for entry in candidates if search_text in entry[2]]
         else:
-            self.filtered_commands = {}
-            for category, commands in self.commands.items():
-                filtered = []
-                for cmd in commands:
-                    if (search_text in cmd['command'].lower() or
-                        search_text in cmd['description'].lower() or
-                        search_text in cmd.get('usage', '').lower() or
-                        search_text in cmd['syntax'].lower()):
-                        filtered.append(cmd)
-                if filtered:
-                    self.filtered_commands[category] = filtered
+            self._last_matches = self.search_entries
+        self._last_query = search_text
 
-        self.refresh_display()
+        self.apply_filters()
 
     def refresh_display(self):
         """Refresh the command display"""
@@ -2,6 +2,218 @@ import tkinter as tk
 from tkinter import ttk
 import customtkinter as ctk
 from tkinter import messagebox
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+#------------------------------------ Grammar check client ------------------------------------
+def make_http_session(pool_size=4):
+    """Pooled requests session (keep-alive across checks), or None without requests"""
+    try:
+        import requests
+        from requests.adapters import HTTPAdapter
+    except ImportError:
+        return None
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class GrammarBackend:
+    """A grammar checker: check(paragraph) returns {'issues': [...]} with offsets into the paragraph"""
+
+    name = 'base'
+
+    def __init__(self, timeout=10, pool_size=4):
+        self.timeout = timeout
+        self.session = make_http_session(pool_size)
+
+    def post(self, url, headers=None, json_payload=None, form=None):
+        """POST through the pooled session (urllib without requests); returns the decoded JSON"""
+        headers = dict(headers or {})
+        if self.session is not None:
+            response = self.session.post(url, headers=headers, json=json_payload, data=form,
+                                         timeout=self.timeout)
+            if response.status_code != 200:
+                raise RuntimeError(f"{self.name} API error: {response.status_code}")
+            return response.json()
+
+        import urllib.request
+        import urllib.parse
+        if json_payload is not None:
+            data = json.dumps(json_payload).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        else:
+            data = urllib.parse.urlencode(form or {}).encode('utf-8')
+        request = urllib.request.Request(url, data=data, headers=headers, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    def check(self, text):
+        raise NotImplementedError
+
+
+class GrammarlyBackend(GrammarBackend):
+    """Grammarly HTTP API"""
+
+    name = 'grammarly'
+
+    def __init__(self, api_key, url="https://api.grammarly.com/api/check", **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = api_key
+        self.url = url
+
+    def check(self, text):
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        payload = {
+            'text': text,
+            'language': 'en-US',
+            'style': 'academic'  # academic, business, casual, etc.
+        }
+        result = self.post(self.url, headers=headers, json_payload=payload)
+        return {'issues': result.get('issues', [])}
+
+
+class LanguageToolBackend(GrammarBackend):
+    """LanguageTool-compatible server, e.g. a local one for offline checking"""
+
+    name = 'languagetool'
+    DEFAULT_URL = "http://localhost:8081/v2/check"
+
+    def __init__(self, url=None, language='en-US', **kwargs):
+        super().__init__(**kwargs)
+        self.url = url or self.DEFAULT_URL
+        self.language = language
+
+    def check(self, text):
+        result = self.post(self.url, form={'text': text, 'language': self.language})
+        issues = []
+        for match in result.get('matches', []):
+            start = match.get('offset', 0)
+            end = start + match.get('length', 0)
+            issues.append({
+                'start': start,
+                'end': end,
+                'original': text[start:end],
+                'suggestions': [r.get('value', '') for r in match.get('replacements', [])[:5]],
+                'reason': match.get('message', '')
+            })
+        return {'issues': issues}
+
+
+class GrammarCheckClient:
+    """Checks text paragraph by paragraph: cached by paragraph hash, uncached ones sent concurrently"""
+
+    PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n')
+
+    def __init__(self, backend, max_workers=4, cache_size=2048):
+        self.backend = backend
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='grammar')
+        self.cache = OrderedDict()   # paragraph hash -> issues with paragraph-relative offsets
+        self.cache_size = cache_size
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._generations = {}       # request key -> number of the newest request
+        self._timers = {}            # request key -> pending debounce timer
+
+    @classmethod
+    def split_paragraphs(cls, text):
+        """(offset, paragraph) for every non-blank paragraph of the text"""
+        paragraphs = []
+        start = 0
+        for match in cls.PARAGRAPH_BREAK.finditer(text):
+            if text[start:match.start()].strip():
+                paragraphs.append((start, text[start:match.start()]))
+            start = match.end()
+        if text[start:].strip():
+            paragraphs.append((start, text[start:]))
+        return paragraphs
+
+    def paragraph_key(self, paragraph):
+        """Cache key of a paragraph for this backend"""
+        return hashlib.sha1((self.backend.name + '\0' + paragraph).encode('utf-8')).hexdigest()
+
+    def check(self, text):
+        """Blocking check of a whole text; returns None when every request failed"""
+        paragraphs = [(offset, paragraph, self.paragraph_key(paragraph))
+                      for offset, paragraph in self.split_paragraphs(text)]
+
+        pending = {}
+        with self._lock:
+            for offset, paragraph, key in paragraphs:
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                elif key not in pending:
+                    pending[key] = self.pool.submit(self.backend.check, paragraph)
+
+        failed = 0
+        for key, future in pending.items():
+            try:
+                issues = future.result().get('issues', [])
+            except Exception as e:
+                self.last_error = e
+                failed += 1
+                continue
+            with self._lock:
+                self.cache[key] = issues
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+
+        if pending and failed == len(pending):
+            return None
+
+        issues = []
+        with self._lock:
+            for offset, paragraph, key in paragraphs:
+                for issue in self.cache.get(key, ()):
+                    issues.append(dict(issue, start=issue['start'] + offset, end=issue['end'] + offset))
+        return {'issues': issues, 'paragraphs': len(paragraphs), 'sent': len(pending), 'failed': failed}
+
+    def check_async(self, text, callback, key='default', delay=0.0):
+        """Check off the calling thread; callback(result) runs on a worker thread, newest request only"""
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+            timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        def run():
+            with self._lock:
+                if self._generations.get(key) != generation:
+                    return
+                self._timers.pop(key, None)
+            try:
+                result = self.check(text)
+            except RuntimeError as e:
+                # shutdown() stopped the pool while this request waited out its delay
+                self.last_error = e
+                result = None
+            # A newer request for the same key makes this result stale
+            if self._generations.get(key) == generation:
+                callback(result)
+
+        worker = threading.Timer(delay, run)
+        worker.daemon = True
+        if delay:
+            with self._lock:
+                self._timers[key] = worker
+        worker.start()
+
+    def shutdown(self):
+        """Stop the worker pool without waiting for in-flight requests"""
+        self.pool.shutdown(wait=False)
+
+#------------------------------------ End grammar check client ------------------------------------
 
 class GrammarlyIntegration:
     """Grammarly integration for advanced grammar and spelling checking"""
@@ -12,6 +224,12 @@ class GrammarlyIntegration:
         self.grammarly_api_key = None
         self.grammarly_session = None
 
+        # Checking backend: 'grammarly' or 'languagetool' (a LanguageTool-compatible server)
+        self.backend_name = 'grammarly'
+        self.languagetool_url = LanguageToolBackend.DEFAULT_URL
+        self.grammar_client = None
+        self._client_config = None
+
         # Grammarly API endpoints (using free tier where possible)
         self.api_base = "https://api.grammarly.com"
         self.free_endpoints = {
@@ -32,6 +250,8 @@ class GrammarlyIntegration:
                     config = json.load(f)
                     self.grammarly_api_key = config.get('api_key')
                     self.grammarly_enabled = config.get('enabled', False)
+                    self.backend_name = config.get('backend', self.backend_name)
+                    self.languagetool_url = config.get('languagetool_url', self.languagetool_url)
         except:
             pass
 
@@ -44,6 +264,8 @@ class GrammarlyIntegration:
             config = {
                 'api_key': self.grammarly_api_key,
                 'enabled': self.grammarly_enabled,
+                'backend': self.backend_name,
+                'languagetool_url': self.languagetool_url,
                 'last_updated': datetime.now().isoformat()
             }
 
@@ -62,63 +284,64 @@ class GrammarlyIntegration:
             self.save_grammarly_settings()
             self.parent.write("✓ Grammarly integration enabled\n", "green")
 
+    def is_check_available(self):
+        """Checking is on and the backend has what it needs"""
+        if not self.grammarly_enabled:
+            return False
+        return self.backend_name == 'languagetool' or bool(self.grammarly_api_key)
+
+    def get_grammar_client(self):
+        """Shared grammar-check client, rebuilt when the backend settings change"""
+        config = (self.backend_name, self.grammarly_api_key, self.languagetool_url)
+        if self.grammar_client is None or config != self._client_config:
+            if self.grammar_client is not None:
+                self.grammar_client.shutdown()
+            if self.backend_name == 'languagetool':
+                backend = LanguageToolBackend(self.languagetool_url)
+            else:
+                backend = GrammarlyBackend(self.grammarly_api_key,
+                                           f"{self.api_base}{self.free_endpoints['check']}")
+            self.grammar_client = GrammarCheckClient(backend)
+            self._client_config = config
+        return self.grammar_client
+
     def check_text_grammarly(self, text):
-        """Check text using Grammarly API"""
-        if not self.grammarly_enabled or not self.grammarly_api_key:
+        """Check text using Grammarly API (blocking; editors use check_text_async)"""
+        if not self.is_check_available():
             return None
 
-        try:
-            headers = {
-                'Authorization': f'Bearer {self.grammarly_api_key}',
-                'Content-Type': 'application/json'
-            }
-
-            payload = {
-                'text': text,
-                'language': 'en-US',
-                'style': 'academic'  # academic, business, casual, etc.
-            }
+        client = self.get_grammar_client()
+        result = client.check(text)
+        if result is None:
+            self.parent.write(f"Grammarly check failed: {client.last_error}\n", "red")
+        return result
 
-            # Using requests if available, otherwise fallback
-            try:
-                import requests
-                response = requests.post(
-                    f"{self.api_base}{self.free_endpoints['check']}",
-                    headers=headers,
-                    json=payload,
-                    timeout=10
-                )
-
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    self.parent.write(f"Grammarly API error: {response.status_code}\n", "yellow")
-                    return None
+    def check_text_async(self, text, callback, key='default', delay=0.0):
+        """Check text on worker threads; callback(result) is called on the Tk thread"""
+        if not self.is_check_available():
+            return False
 
-            except ImportError:
-                # Fallback to urllib if requests not available
-                import urllib.request
-                import json as json_lib
+        client = self.get_grammar_client()
 
-                req = urllib.request.Request(
-                    f"{self.api_base}{self.free_endpoints['check']}",
-                    data=json_lib.dumps(payload).encode('utf-8'),
-                    headers=headers,
-                    method='POST'
-                )
-
-                with urllib.request.urlopen(req, timeout=10) as response:
-                    return json_lib.loads(response.read().decode('utf-8'))
+        def deliver(result):
+            if result is None:
+                self.parent.after(0, lambda: self.parent.write(
+                    f"Grammar check failed: {client.last_error}\n", "yellow"))
+                return
+            self.parent.after(0, lambda: callback(result))
 
-        except Exception as e:
-            self.parent.write(f"Grammarly check failed: {str(e)}\n", "red")
-            return None
+        client.check_async(text, deliver, key=key, delay=delay)
+        return True
 
     def apply_grammarly_suggestions(self, text_widget, suggestions):
         """Apply Grammarly suggestions to text widget"""
         if not suggestions or 'issues' not in suggestions:
             return
 
+        # Results always cover the whole text, so they replace the previous ones
+        text_widget.tag_remove("grammarly_issue", "1.0", "end")
+        text_widget.grammarly_issues = {}
+
         for issue in suggestions['issues']:
             start_pos = f"1.0+{issue['start']}c"
             end_pos = f"1.0+{issue['end']}c"
@@ -133,9 +356,9 @@ class GrammarlyIntegration:
             # Store suggestion info
             text_widget.grammarly_issues = getattr(text_widget, 'grammarly_issues', {})
             text_widget.grammarly_issues[f"{issue['start']}-{issue['end']}"] = {
-                'original': issue['original'],
-                'suggestions': issue['suggestions'],
-                'reason': issue['reason']
+                'original': issue.get('original', ''),
+                'suggestions': issue.get('suggestions', []),
+                'reason': issue.get('reason', '')
             }
 
 class GrammarlySetupDialog(ctk.CTkToplevel):
@@ -294,7 +517,6 @@ Features:
 
 import webbrowser
 import tempfile
-import json
 from pathlib import Path
 
 class AutomatedGrammarlyIntegration:
@@ -5,9 +5,47 @@ import threading
 import queue
 import socket
 import os
+import sys
+import time
+import codecs
+import signal
+import itertools
+import subprocess
+from collections import deque
+
+
+class TerminalJob:
+    """A shell command started from the terminal, with its process and output readers"""
+
+    def __init__(self, job_id, command, process):
+        self.id = job_id
+        self.command = command
+        self.process = process
+        self.started = time.time()
+        self.interrupted = False
+
+    def signal(self, interrupt=False):
+        """Interrupt (Ctrl+C) or kill the job's whole process group"""
+        self.interrupted = True
+        if self.process.poll() is not None:
+            return
+        if os.name == 'posix':
+            os.killpg(self.process.pid, signal.SIGINT if interrupt else signal.SIGKILL)
+        elif interrupt:
+            self.process.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            self.process.kill()
+
 
 class InteractiveTerminal(ctk.CTkFrame):
     """Interactive terminal with proper input capture and validation"""
+
+    OUTPUT_INTERVAL_MS = 50          # how often buffered output is moved into the display
+    OUTPUT_CHUNK_LIMIT = 256 * 1024  # characters inserted per flush; the rest waits for the next one
+    OUTPUT_BUFFER_CHUNKS = 50000     # pending writes kept before the oldest are dropped
+    MAX_SCROLLBACK_LINES = 10000     # older lines are trimmed from the top
+    OUTPUT_MARK = "output"           # output goes here: just before the prompt line, never into the input
+
     def __init__(self, master, initial_directory=None, **kwargs):
         super().__init__(master, **kwargs)
 
@@ -20,8 +58,21 @@ class InteractiveTerminal(ctk.CTkFrame):
         self.input_event = threading.Event()
         self.current_prompt = None
 
+        # Background jobs
+        self.jobs = {}
+        self.jobs_lock = threading.Lock()
+        self._job_ids = itertools.count(1)
+
+        # Buffered output: write() only queues, flush_output() inserts coalesced chunks
+        self.output_buffer = deque()   # (text, color) from any thread
+        self.output_lock = threading.Lock()
+        self.dropped_chunks = 0
+        self._last_flush = 0.0
+        self._ui_thread = threading.get_ident()
+
         # Create UI
         self._create_ui()
+        self.after(self.OUTPUT_INTERVAL_MS, self._pump_output)
 
         # Start command processor
         self.running = True
@@ -38,9 +89,18 @@ class InteractiveTerminal(ctk.CTkFrame):
         self.dir_label = ctk.CTkLabel(header, text=f"📁 {self.working_dir}")
         self.dir_label.pack(side="left", padx=5)
 
+        # Progress of a running generation; packed only while one is reported
+        self.progress_label = ctk.CTkLabel(header, text="")
+        self.progress_bar = ctk.CTkProgressBar(header, width=160)
+        self.progress_bar.set(0)
+
         # Control buttons
         ctk.CTkButton(header, text="Clear",
                      command=self.clear).pack(side="right", padx=5)
+        ctk.CTkButton(header, text="Kill", width=60,
+                     command=lambda: self.kill_job(interrupt=False)).pack(side="right", padx=5)
+        ctk.CTkButton(header, text="Interrupt", width=80,
+                     command=lambda: self.kill_job(interrupt=True)).pack(side="right", padx=5)
 
         # Terminal display
         self.display = ctk.CTkTextbox(
@@ -57,6 +117,8 @@ class InteractiveTerminal(ctk.CTkFrame):
         self.display._textbox.tag_configure("white", foreground="white")
         self.display._textbox.tag_configure("prompt", foreground="cyan")
         self.display._textbox.tag_configure("input", foreground="white")
+        self.display._textbox.mark_set(self.OUTPUT_MARK, "1.0")
+        self.display._textbox.mark_gravity(self.OUTPUT_MARK, "right")
 
         # Enhanced input handling
         self.display.bind("<Return>", self._handle_input)
@@ -105,8 +167,8 @@ class InteractiveTerminal(ctk.CTkFrame):
             self.input_done = False  # Flag to track input completion
             self.input_result = None  # Store input result
 
-            # Show prompt
-            self.write(prompt, "yellow")
+            # Show prompt on its own line, ahead of any output still queued
+            self._insert_prompt("\n" + prompt, "yellow")
 
             # Focus the display
             self.display.focus_set()
@@ -146,8 +208,10 @@ class InteractiveTerminal(ctk.CTkFrame):
                 self.input_result = input_text
                 self.input_done = True
 
-                # Add newline for visual feedback
-                self.write("\n")
+                # The answered line becomes history; later output goes below it
+                self.display._textbox.insert("end", "\n")
+                self.waiting_for_input = False
+                self.show_prompt()
                 return "break"
 
             # Handle regular command input
@@ -156,7 +220,7 @@ class InteractiveTerminal(ctk.CTkFrame):
                 command = current_line[2:]
                 if command.strip():
                     self.command_queue.put(command)
-                self.write("\n")
+                self.display._textbox.insert("end", "\n")
                 self.show_prompt()
                 return "break"
 
@@ -166,73 +230,245 @@ class InteractiveTerminal(ctk.CTkFrame):
         return "break"
 
     def write(self, text, color="white"):
-        """Write text to terminal with proper scroll"""
+        """Queue text for the terminal; safe from any thread, shown in coalesced chunks"""
+        if not text:
+            return
+        with self.output_lock:
+            if len(self.output_buffer) >= self.OUTPUT_BUFFER_CHUNKS:
+                self.output_buffer.popleft()
+                self.dropped_chunks += 1
+            self.output_buffer.append((text, color))
+
+        # Long-running work on the UI thread still shows progress, a few times per second
+        if (threading.get_ident() == self._ui_thread and
+                time.monotonic() - self._last_flush >= self.OUTPUT_INTERVAL_MS / 1000):
+            self.flush_output(redraw=True)
+
+    def flush_output(self, redraw=False):
+        """Insert buffered output above the prompt in one call per flush, then trim the scrollback"""
+        with self.output_lock:
+            if not self.output_buffer and not self.dropped_chunks:
+                return
+            parts = []
+            if self.dropped_chunks:
+                parts = [f"[... {self.dropped_chunks} earlier writes dropped ...]\n", "yellow"]
+                self.dropped_chunks = 0
+            size = 0
+            while self.output_buffer and size < self.OUTPUT_CHUNK_LIMIT:
+                text, color = self.output_buffer.popleft()
+                size += len(text)
+                # Merge runs of the same color into one text/tag pair
+                if parts and parts[-1] == color:
+                    parts[-2] += text
+                else:
+                    parts.extend([text, color])
+        self._last_flush = time.monotonic()
+
         try:
-            # Insert text with color tag
-            self.display._textbox.insert("end", text, color)
-            self.display.see("end")
-            self.update_idletasks()
+            textbox = self.display._textbox
+            # The mark has right gravity, so it stays after the output and ahead of the prompt;
+            # the insert cursor and whatever is being typed are left alone
+            textbox.insert(self.OUTPUT_MARK, *parts)
 
-            # Move cursor to end
-            self.display._textbox.mark_set("insert", "end")
+            lines = int(textbox.index("end-1c").split('.')[0])
+            if lines > self.MAX_SCROLLBACK_LINES * 1.1:
+                textbox.delete("1.0", f"{lines - self.MAX_SCROLLBACK_LINES + 1}.0")
 
+            self.display.see("end")
+            if redraw:
+                self.update_idletasks()
         except Exception as e:
             print(f"Write error: {e}", file=sys.__stdout__)
 
+    def _pump_output(self):
+        """Periodic flush of output queued by other threads or between UI-thread flushes"""
+        self.flush_output()
+        if self.running:
+            self.after(self.OUTPUT_INTERVAL_MS, self._pump_output)
+
+    def set_progress(self, fraction, text=""):
+        """Show a progress bar in the header (call from the UI thread)"""
+        if not self.progress_bar.winfo_ismapped():
+            self.progress_bar.pack(side="left", padx=5)
+            self.progress_label.pack(side="left", padx=5)
+        self.progress_bar.set(max(0.0, min(1.0, fraction)))
+        self.progress_label.configure(text=text)
+
+    def hide_progress(self):
+        """Remove the header progress bar"""
+        self.progress_bar.pack_forget()
+        self.progress_label.pack_forget()
+        self.progress_bar.set(0)
+
     def clear(self):
         """Clear terminal content"""
+        with self.output_lock:
+            self.output_buffer.clear()
+            self.dropped_chunks = 0
         self.display._textbox.delete("1.0", "end")
         self.show_prompt()
 
     def _process_commands(self):
-        """Process commands in background"""
+        """Start queued commands as background jobs; several can run at once"""
         while self.running:
             try:
                 command = self.command_queue.get(timeout=0.1)
                 if command.startswith("cd "):
                     path = command[3:].strip()
-                    self._change_directory(path)
+                    self.after(0, self._change_directory, path)
+                elif command.strip() == "jobs":
+                    self.write(self._describe_jobs(), "white")
+                elif self._is_job_kill(command):
+                    self._handle_kill_command(command)
                 else:
-                    try:
-                        process = subprocess.Popen(
-                            command,
-                            shell=True,
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE,
-                            cwd=self.working_dir,
-                            text=True
-                        )
-                        out, err = process.communicate()
-                        if out:
-                            self.after(0, lambda: self.write(out))
-                        if err:
-                            self.after(0, lambda: self.write(err, "red"))
-                    except Exception as e:
-                        self.after(0, lambda: self.write(f"\nError: {str(e)}\n", "red"))
+                    self.start_job(command)
             except queue.Empty:
                 continue
             except Exception as e:
                 print(f"Command processing error: {e}", file=sys.__stdout__)
 
+    def start_job(self, command):
+        """Run a shell command in the background, streaming its output; returns the job id"""
+        if os.name == 'posix':
+            platform_args = {'start_new_session': True}
+        else:
+            platform_args = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        try:
+            process = subprocess.Popen(
+                command,
+                shell=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=self.working_dir,
+                **platform_args
+            )
+        except Exception as e:
+            self.write(f"\nError: {str(e)}\n", "red")
+            return None
+
+        job = TerminalJob(next(self._job_ids), command, process)
+        with self.jobs_lock:
+            self.jobs[job.id] = job
+        self.write(f"[{job.id}] {process.pid} {command}\n", "prompt")
+        threading.Thread(target=self._run_job, args=(job,), daemon=True).start()
+        return job.id
+
+    def _run_job(self, job):
+        """Stream a job's stdout and stderr until it exits, then report its status"""
+        stderr_reader = threading.Thread(target=self._read_stream,
+                                         args=(job.process.stderr, "red"), daemon=True)
+        stderr_reader.start()
+        self._read_stream(job.process.stdout, "white")
+        stderr_reader.join()
+        returncode = job.process.wait()
+
+        with self.jobs_lock:
+            self.jobs.pop(job.id, None)
+        elapsed = time.time() - job.started
+        if job.interrupted:
+            status, color = "Interrupted", "yellow"
+        elif returncode == 0:
+            status, color = "Done", "green"
+        else:
+            status, color = f"Exit {returncode}", "red"
+        self.write(f"[{job.id}] {status} ({elapsed:.1f}s) {job.command}\n", color)
+
+    def _read_stream(self, stream, color):
+        """Forward whatever output is available as soon as it arrives (not line by line)"""
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        try:
+            while True:
+                chunk = stream.read1(65536)
+                if not chunk:
+                    break
+                text = decoder.decode(chunk)
+                if text:
+                    self.write(text, color)
+            text = decoder.decode(b'', final=True)
+            if text:
+                self.write(text, color)
+        finally:
+            stream.close()
+
+    def kill_job(self, job_id=None, interrupt=False):
+        """Interrupt or kill a job (the most recent one by default)"""
+        with self.jobs_lock:
+            if job_id is None and self.jobs:
+                job_id = max(self.jobs)
+            job = self.jobs.get(job_id)
+        if job is None:
+            self.write("No such job\n" if job_id is not None else "No running jobs\n", "yellow")
+            return False
+        try:
+            job.signal(interrupt=interrupt)
+        except (OSError, ValueError) as e:
+            self.write(f"[{job.id}] could not be signalled: {e}\n", "red")
+            return False
+        return True
+
+    @staticmethod
+    def _is_job_kill(command):
+        """kill [-INT] [%N] addresses a terminal job; kill <pid>, killall and the rest go to the shell"""
+        args = command.split()
+        if not args or args[0] != "kill":
+            return False
+        args = args[1:]
+        if args and args[0].upper() in ("-INT", "-2", "-SIGINT"):
+            args = args[1:]
+        return not args or (len(args) == 1 and args[0].startswith('%'))
+
+    def _handle_kill_command(self, command):
+        """kill [-INT] [%job id]"""
+        args = command.split()[1:]
+        interrupt = bool(args) and args[0].upper() in ("-INT", "-2", "-SIGINT")
+        if interrupt:
+            args = args[1:]
+        try:
+            job_id = int(args[0].lstrip('%')) if args else None
+        except ValueError:
+            self.write(f"kill: invalid job id {args[0]}\n", "red")
+            return
+        self.kill_job(job_id, interrupt=interrupt)
+
+    def _describe_jobs(self):
+        """One line per running job"""
+        with self.jobs_lock:
+            jobs = sorted(self.jobs.values(), key=lambda job: job.id)
+        if not jobs:
+            return "No running jobs\n"
+        return ''.join(f"[{job.id}] Running {time.time() - job.started:6.1f}s  pid {job.process.pid}  {job.command}\n"
+                       for job in jobs)
+
     def show_prompt(self):
         """Show command prompt if not waiting for input"""
         if not self.waiting_for_input:
-            self.write("\n$ ", "prompt")
+            self._insert_prompt("\n$ ", "prompt")
+
+    def _insert_prompt(self, text, color):
+        """Put a prompt at the end right away (UI thread) and keep later output above it"""
+        self.flush_output()
+        textbox = self.display._textbox
+        position = textbox.index("end-1c")
+        textbox.insert("end", text, color)
+        textbox.mark_set(self.OUTPUT_MARK, position)
+        textbox.mark_set("insert", "end")
+        self.display.see("end")
 
     def set_working_directory(self, directory):
-        """Set working directory"""
-        if os.path.exists(directory):
-            self.working_dir = directory
-            os.chdir(directory)
+        """Set the directory commands run in (passed as cwd=, the process directory is untouched)"""
+        if os.path.isdir(directory):
+            self.working_dir = os.path.abspath(directory)
             self.dir_label.configure(text=f"📁 {self.working_dir}")
+
     def _change_directory(self, path):
-        """Change working directory"""
-        try:
-            os.chdir(path)
-            self.working_dir = os.getcwd()
-            self.dir_label.configure(text=f"📁 {self.working_dir}")
-            self.write(f"Changed directory to: {self.working_dir}\n", "green")
-        except Exception as e:
-            self.write(f"Error changing directory: {str(e)}\n", "red")
+        """Change working directory, relative to the current one"""
+        target = os.path.normpath(os.path.join(self.working_dir, os.path.expanduser(path.strip('\'"') or '~')))
+        if not os.path.isdir(target):
+            self.write(f"Error changing directory: no such directory: {path}\n", "red")
+            return
+        self.working_dir = target
+        self.dir_label.configure(text=f"📁 {self.working_dir}")
+        self.write(f"Changed directory to: {self.working_dir}\n", "green")
 
 #------------------------------------------End Interactive Terminal -----------------------------------------
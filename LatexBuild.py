@@ -0,0 +1,590 @@
+#----------------------------------------------LaTeX Build Helpers ------------------------------------
+"""
+LatexBuild.py
+Headless helpers for compiling generated Beamer decks and reading pdflatex logs.
+Nothing in here touches Tk, so the IDE, worker threads and command line tools can share it.
+"""
+import os
+import re
+import json
+import shutil
+import hashlib
+import time
+import threading
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# "! Undefined control sequence." or, with -file-line-error, "./deck.tex:123: Undefined control sequence."
+LOG_ERROR_PATTERN = re.compile(r'^(?:!\s*(?P<bang>.*)|(?P<file>[^\s:][^:]*\.tex):(?P<line>\d+):\s*(?P<msg>.*))$')
+LOG_LINE_PATTERN = re.compile(r'^l\.(\d+)\s?(.*)$')
+FRAME_TITLE_PATTERN = re.compile(r'\\begin\{frame\}(?:<[^>]*>)?(?:\[[^\]]*\])?\{([^}]*)\}|\\frametitle\{([^}]*)\}')
+# Build outputs live in <deck folder>/.bsg-build/<variant>/, never beside the sources
+BUILD_DIR_NAME = '.bsg-build'
+DEFAULT_VARIANT = 'main'
+# Files pdflatex reads back on the next pass: a pass is repeated only while one of them changes
+RERUN_AUX_EXTENSIONS = ('.aux', '.nav', '.snm', '.toc', '.out')
+MAX_RERUN_PASSES = 5
+DEPENDENCY_STATE_VERSION = 2
+# Every pass records its inputs (for skipping unchanged builds) and writes SyncTeX data
+BUILD_PASS_ARGS = ('-recorder', '-synctex=1')
+COLOR_DEFINITIONS = """
+    % Color Information for TikZ Figures
+    % Use these color definitions for consistent theming
+    % Text colors are automatically chosen using XOR rule
+
+    % Default color palette
+    \\definecolor{airis4d_blue}{RGB}{41,128,185}
+    \\definecolor{airis4d_green}{RGB}{39,174,96}
+    \\definecolor{airis4d_orange}{RGB}{243,156,18}
+    \\definecolor{airis4d_red}{RGB}{231,76,60}
+    \\definecolor{airis4d_purple}{RGB}{155,89,182}
+    \\definecolor{airis4d_teal}{RGB}{26,188,156}
+    \\definecolor{airis4d_gray}{RGB}{149,165,166}
+
+    % XOR Rule for text colors:
+    % - Use text=white on dark backgrounds (luminance < 0.179)
+    % - Use text=black on light backgrounds (luminance > 0.179)
+
+    % Example usage:
+    % \\node[fill=airis4d_blue, text=white] {White text on blue};
+    % \\node[fill=airis4d_orange, text=black] {Black text on orange};
+    """
+
+
+def add_color_definitions(content: str) -> str:
+    """Insert the airis4D palette before \\begin{document} of a generated deck"""
+    if "\\documentclass" in content:
+        parts = content.split("\\documentclass", 1)
+        return parts[0] + "\\documentclass" + parts[1].replace(
+            "\\begin{document}",
+            COLOR_DEFINITIONS + "\n\\begin{document}",
+            1
+        )
+    return COLOR_DEFINITIONS + "\n" + content
+
+
+def parse_latex_log_errors(log_text: str, max_errors: int = 100, main_file: str = None) -> list:
+    """Collect every error in a pdflatex log together with its source line and context
+
+    With main_file, errors raised inside other files (\\input, packages) keep line None,
+    since their line numbers do not point into the main document.
+    """
+    errors = []
+    current = None
+    foreign = False
+
+    for raw in log_text.splitlines():
+        line = raw.rstrip()
+        match = LOG_ERROR_PATTERN.match(line)
+        if match:
+            if current:
+                errors.append(current)
+                if len(errors) >= max_errors:
+                    return errors
+            if match.group('bang') is not None:
+                message = line.strip()
+            else:
+                message = '! ' + match.group('msg').strip()
+            foreign = (main_file is not None and match.group('file') is not None and
+                       os.path.basename(match.group('file')) != os.path.basename(main_file))
+            current = {
+                'message': message,
+                'line': int(match.group('line')) if match.group('line') and not foreign else None,
+                'context': []
+            }
+            continue
+
+        if current is None:
+            continue
+
+        line_match = LOG_LINE_PATTERN.match(line)
+        if line_match:
+            if current['line'] is None and not foreign:
+                current['line'] = int(line_match.group(1))
+            current['context'].append(line)
+            errors.append(current)
+            current = None
+            if len(errors) >= max_errors:
+                return errors
+        elif len(current['context']) < 10:
+            current['context'].append(line)
+
+    if current:
+        errors.append(current)
+    return errors
+
+
+def build_dir_for(tex_file: str, variant: str = DEFAULT_VARIANT) -> str:
+    """Persistent build directory of a deck variant, <deck folder>/.bsg-build/<variant>/ (created if needed)"""
+    build_dir = os.path.join(os.path.dirname(os.path.abspath(tex_file)), BUILD_DIR_NAME, variant)
+    os.makedirs(build_dir, exist_ok=True)
+    return build_dir
+
+
+def find_build_output(tex_file: str, extension: str, variant: str = DEFAULT_VARIANT) -> str:
+    """A build output of a deck (.log, .aux, ...): from its build directory, else beside the .tex as older builds left it"""
+    tex_file = os.path.abspath(tex_file)
+    stem, _ = os.path.splitext(os.path.basename(tex_file))
+    built = os.path.join(os.path.dirname(tex_file), BUILD_DIR_NAME, variant, stem + extension)
+    return built if os.path.exists(built) else os.path.splitext(tex_file)[0] + extension
+
+
+def output_base(tex_file: str, output_dir: str = None) -> str:
+    """Path of the build outputs without extension: <output dir>/<job name>"""
+    tex_file = os.path.abspath(tex_file)
+    stem = os.path.splitext(os.path.basename(tex_file))[0]
+    return os.path.join(os.path.abspath(output_dir) if output_dir else os.path.dirname(tex_file), stem)
+
+
+def pdflatex_command(tex_file: str, cwd: str, output_dir: str = None, extra_args: list = None) -> list:
+    """pdflatex arguments with paths relative to cwd, which keeps spaces in parent folders away from TeX"""
+    cmd = ['pdflatex', '-interaction=nonstopmode', '-file-line-error']
+    if output_dir:
+        cmd.append('-output-directory=' + os.path.relpath(output_dir, cwd))
+    cmd.extend(extra_args or [])
+    cmd.append(os.path.relpath(tex_file, cwd))
+    return cmd
+
+
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+
+
+@contextmanager
+def build_lock(output_dir: str, job_name: str, timeout: float = 600):
+    """Exclusive use of one job's outputs in a build directory, across threads and processes
+
+    Builds of other variants use other directories and never wait on each other.
+    """
+    lock_file = os.path.join(os.path.abspath(output_dir), job_name + '.lock')
+    with _build_locks_guard:
+        thread_lock = _build_locks.setdefault(lock_file, threading.Lock())
+
+    with thread_lock:
+        deadline = time.time() + timeout
+        while True:
+            try:
+                fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                break
+            except FileExistsError:
+                try:
+                    # A lock older than any build could take was left by a crashed process
+                    if time.time() - os.path.getmtime(lock_file) > timeout:
+                        os.remove(lock_file)
+                        continue
+                except OSError:
+                    continue
+                if time.time() > deadline:
+                    raise TimeoutError(f"Build directory busy: {lock_file}")
+                time.sleep(0.2)
+        try:
+            yield lock_file
+        finally:
+            try:
+                os.remove(lock_file)
+            except OSError:
+                pass
+
+
+def publish_pdf(built_pdf: str, target_pdf: str) -> str:
+    """Copy a PDF out of the build directory; the replace is atomic, so viewers never see half a file"""
+    if os.path.abspath(built_pdf) == os.path.abspath(target_pdf):
+        return target_pdf
+    try:
+        built, target = os.stat(built_pdf), os.stat(target_pdf)
+        if built.st_size == target.st_size and built.st_mtime_ns == target.st_mtime_ns:
+            return target_pdf
+    except OSError:
+        pass
+    temp_pdf = f"{target_pdf}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copy2(built_pdf, temp_pdf)
+    os.replace(temp_pdf, target_pdf)
+    return target_pdf
+
+
+def run_pdflatex_nonstop(tex_file: str, timeout: int = 300, extra_args: list = None,
+                         output_dir: str = None, cwd: str = None) -> dict:
+    """Run a single pdflatex pass that keeps going after errors and report everything it hit
+
+    Outputs go to output_dir (default: beside the .tex); relative \\includegraphics paths
+    resolve against cwd (default: the folder of the .tex).
+    """
+    tex_file = os.path.abspath(tex_file)
+    cwd = cwd or os.path.dirname(tex_file)
+    base = output_base(tex_file, output_dir)
+
+    result = {
+        'returncode': None,
+        'errors': [],
+        'log': '',
+        'pdf': base + '.pdf',
+        'timed_out': False
+    }
+
+    cmd = pdflatex_command(tex_file, cwd, output_dir, extra_args)
+
+    try:
+        process = subprocess.run(
+            cmd,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors='replace',
+            timeout=timeout
+        )
+        result['returncode'] = process.returncode
+        output = process.stdout or ''
+    except subprocess.TimeoutExpired as e:
+        result['timed_out'] = True
+        output = e.stdout if isinstance(e.stdout, str) else ''
+    except FileNotFoundError:
+        result['errors'].append({'message': '! pdflatex not found in PATH', 'line': None, 'context': []})
+        return result
+
+    log_file = base + '.log'
+    if os.path.exists(log_file):
+        with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
+            result['log'] = f.read()
+    else:
+        result['log'] = output
+
+    result['errors'] = parse_latex_log_errors(result['log'], main_file=tex_file)
+    return result
+
+
+def _file_digest(path: str):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def aux_file_hashes(tex_file: str, output_dir: str = None) -> dict:
+    """Content hash of each auxiliary file of a document (None when it does not exist)"""
+    base = output_base(tex_file, output_dir)
+    return {extension: _file_digest(base + extension) for extension in RERUN_AUX_EXTENSIONS}
+
+
+def read_recorder_inputs(tex_file: str, output_dir: str = None) -> list:
+    """Absolute paths of the files the last pass read, from the -recorder .fls file
+
+    Files the pass also wrote (the .aux and friends) are left out; they are outputs.
+    """
+    base = output_base(tex_file, output_dir)
+    working_dir = os.path.dirname(base)
+    inputs, outputs = [], set()
+    try:
+        with open(base + '.fls', 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                kind, _, path = line.rstrip('\n').partition(' ')
+                if kind == 'PWD':
+                    working_dir = path
+                elif kind in ('INPUT', 'OUTPUT'):
+                    path = os.path.normpath(os.path.join(working_dir, path))
+                    if kind == 'OUTPUT':
+                        outputs.add(path)
+                    elif path not in inputs:
+                        inputs.append(path)
+    except OSError:
+        return []
+    return [path for path in inputs if path not in outputs]
+
+
+def dependency_state_path(tex_file: str, output_dir: str = None) -> str:
+    return output_base(tex_file, output_dir) + '.deps.json'
+
+
+def _input_signature(path: str, project_dir: str):
+    """Content hash for the document's own files (the IDE rewrites them unchanged), size and mtime for the TeX tree"""
+    if path.startswith(project_dir + os.sep):
+        return _file_digest(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def write_dependency_state(tex_file: str, command: list = None, output_dir: str = None, cwd: str = None) -> None:
+    """Record the inputs of a clean build so an unchanged document is not compiled again"""
+    tex_file = os.path.abspath(tex_file)
+    project_dir = os.path.abspath(cwd or os.path.dirname(tex_file))
+    pdf = output_base(tex_file, output_dir) + '.pdf'
+    inputs = read_recorder_inputs(tex_file, output_dir)
+    if not inputs or not os.path.exists(pdf):
+        return
+    pdf_stat = os.stat(pdf)
+    state = {
+        'version': DEPENDENCY_STATE_VERSION,
+        'command': command or [],
+        'pdf': [pdf_stat.st_size, pdf_stat.st_mtime_ns],
+        'inputs': {path: _input_signature(path, project_dir) for path in inputs},
+    }
+    with open(dependency_state_path(tex_file, output_dir), 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1)
+
+
+def rebuild_reason(tex_file: str, command: list = None, output_dir: str = None, cwd: str = None):
+    """Why the document must be compiled, or None when no recorded input changed since its last clean build"""
+    tex_file = os.path.abspath(tex_file)
+    project_dir = os.path.abspath(cwd or os.path.dirname(tex_file))
+    try:
+        with open(dependency_state_path(tex_file, output_dir), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return 'no previous build'
+    if state.get('version') != DEPENDENCY_STATE_VERSION or state.get('command') != (command or []):
+        return 'build settings changed'
+    try:
+        pdf_stat = os.stat(output_base(tex_file, output_dir) + '.pdf')
+    except OSError:
+        return 'pdf missing'
+    if [pdf_stat.st_size, pdf_stat.st_mtime_ns] != state.get('pdf'):
+        return 'pdf modified'
+    for path, signature in state.get('inputs', {}).items():
+        if _input_signature(path, project_dir) != signature:
+            return 'changed: ' + os.path.basename(path)
+    return None
+
+
+def _pass_succeeded(result: dict) -> bool:
+    # A halted pass can leave the previous PDF behind, so any error counts as a failure
+    return bool(result.get('success', True)) and not result.get('errors') and not result.get('timed_out')
+
+
+def pdf_signature(pdf: str):
+    """(size, mtime) of a PDF, or None when there is none"""
+    try:
+        stat = os.stat(pdf)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def fresh_pdf(pdf: str, before) -> bool:
+    """Whether a pass wrote a non-empty PDF, given its pdf_signature from before the pass
+
+    A failed pass can leave the previous PDF untouched; that one must not count as output.
+    """
+    signature = pdf_signature(pdf)
+    return signature is not None and signature[0] > 0 and signature != before
+
+
+def compile_until_stable(tex_file: str, run_pass=None, force: bool = False, max_passes: int = MAX_RERUN_PASSES,
+                         timeout: int = 300, command: list = None, progress_callback=None,
+                         output_dir: str = None, cwd: str = None, pdf_file: str = None) -> dict:
+    """latexmk-style build: skip it when no recorded input changed, otherwise rerun only while the aux files change
+
+    run_pass() runs one pdflatex pass with -recorder and returns its result dict (a 'success' flag, or
+    'errors'/'timed_out' as from run_pdflatex_nonstop, which is the default). command identifies the
+    build settings; a different one invalidates the recorded state. progress_callback(pass_number, changed)
+    is called before every rerun.
+
+    With an output_dir (see build_dir_for) the aux files persist there between builds and a PDF
+    written by the last pass is published to pdf_file (default: beside the .tex); result['pdf'] is
+    then the published copy, or None when the last pass wrote no new PDF. The build holds build_lock
+    for its outputs throughout.
+    """
+    tex_file = os.path.abspath(tex_file)
+    built_pdf = output_base(tex_file, output_dir) + '.pdf'
+    pdf_file = pdf_file or os.path.splitext(tex_file)[0] + '.pdf'
+    if run_pass is None:
+        run_pass = lambda: run_pdflatex_nonstop(tex_file, timeout=timeout, extra_args=list(BUILD_PASS_ARGS),
+                                                output_dir=output_dir, cwd=cwd)
+
+    with build_lock(os.path.dirname(built_pdf), os.path.basename(os.path.splitext(built_pdf)[0])):
+        if not force and rebuild_reason(tex_file, command, output_dir, cwd) is None:
+            return {'success': True, 'skipped': True, 'passes': 0, 'rerun_reasons': [], 'errors': [],
+                    'log': '', 'pdf': publish_pdf(built_pdf, pdf_file), 'timed_out': False, 'returncode': 0}
+
+        # A failed build must not leave a state that makes the next one look up to date
+        try:
+            os.remove(dependency_state_path(tex_file, output_dir))
+        except OSError:
+            pass
+
+        before = aux_file_hashes(tex_file, output_dir)
+        rerun_reasons = []
+        passes = 0
+        while True:
+            pdf_before = pdf_signature(built_pdf)
+            result = run_pass()
+            passes += 1
+            if not _pass_succeeded(result):
+                break
+            after = aux_file_hashes(tex_file, output_dir)
+            changed = [extension for extension in RERUN_AUX_EXTENSIONS if after[extension] != before[extension]]
+            if not changed:
+                write_dependency_state(tex_file, command, output_dir, cwd)
+                break
+            if passes >= max_passes:
+                break
+            rerun_reasons.append(changed)
+            if progress_callback:
+                progress_callback(passes + 1, changed)
+            before = after
+
+        if fresh_pdf(built_pdf, pdf_before) and not result.get('timed_out'):
+            result['pdf'] = publish_pdf(built_pdf, pdf_file)
+        else:
+            # What is left in the build directory is the previous build's PDF
+            result['pdf'] = None
+
+    result['skipped'] = False
+    result['passes'] = passes
+    result['rerun_reasons'] = rerun_reasons
+    return result
+
+
+def split_tex_frames(tex_content: str) -> tuple:
+    """Split a Beamer document into its preamble and a list of frames with original line ranges"""
+    lines = tex_content.split('\n')
+    preamble_end = None
+    for i, line in enumerate(lines):
+        if '\\begin{document}' in line and not line.lstrip().startswith('%'):
+            preamble_end = i
+            break
+    if preamble_end is None:
+        return tex_content, []
+
+    preamble = '\n'.join(lines[:preamble_end + 1])
+    frames = []
+    start = None
+    for i in range(preamble_end + 1, len(lines)):
+        stripped = lines[i].lstrip()
+        if stripped.startswith('%'):
+            continue
+        if start is None and stripped.startswith('\\begin{frame}'):
+            start = i
+        elif start is not None and stripped.startswith('\\end{frame}'):
+            body = '\n'.join(lines[start:i + 1])
+            title_match = FRAME_TITLE_PATTERN.search(body)
+            title = (title_match.group(1) or title_match.group(2)) if title_match else ''
+            frames.append({
+                'number': len(frames) + 1,
+                'start_line': start + 1,
+                'end_line': i + 1,
+                'title': title.strip() or f"Slide {len(frames) + 1}",
+                'text': body
+            })
+            start = None
+
+    return preamble, frames
+
+
+def _compile_frame_chunk(preamble: str, chunk: list, scratch_dir: str, source_dir: str, timeout: int) -> dict:
+    """Compile a standalone document holding only the given frames and map its errors back"""
+    if chunk:
+        job_name = f"frames_{chunk[0]['number']:04d}_{chunk[-1]['number']:04d}"
+    else:
+        job_name = "preamble_only"
+    tex_path = os.path.join(scratch_dir, job_name + '.tex')
+
+    # Original line of each chunk line, so errors point into the real deck
+    body_lines = []
+    line_origin = {}
+    offset = preamble.count('\n') + 2
+    for frame in chunk:
+        for j, text_line in enumerate(frame['text'].split('\n')):
+            line_origin[offset + len(body_lines)] = (frame, frame['start_line'] + j)
+            body_lines.append(text_line)
+
+    with open(tex_path, 'w', encoding='utf-8') as f:
+        f.write(preamble + '\n' + '\n'.join(body_lines) + '\n\\end{document}\n')
+
+    env = os.environ.copy()
+    # Let \\includegraphics{media_files/...} resolve against the deck's own directory
+    env['TEXINPUTS'] = source_dir + os.pathsep + env.get('TEXINPUTS', '')
+
+    cmd = ['pdflatex', '-interaction=nonstopmode', '-file-line-error', '-draftmode', job_name + '.tex']
+    try:
+        subprocess.run(cmd, cwd=scratch_dir, env=env, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, timeout=timeout)
+        timed_out = False
+    except subprocess.TimeoutExpired:
+        timed_out = True
+
+    log_text = ''
+    log_path = os.path.join(scratch_dir, job_name + '.log')
+    if os.path.exists(log_path):
+        with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+            log_text = f.read()
+
+    errors = []
+    for error in parse_latex_log_errors(log_text, main_file=tex_path):
+        frame, original_line = line_origin.get(error['line'], (None, None))
+        errors.append(dict(error, line=original_line,
+                           frame=frame['number'] if frame else None))
+    if timed_out:
+        errors.append({'message': f'! Compilation timed out after {timeout}s', 'line': None,
+                       'context': [], 'frame': None})
+
+    return {'chunk': chunk, 'errors': errors}
+
+
+def diagnose_tex_frames(tex_file: str, chunk_size: int = 8, max_workers: int = None,
+                        timeout: int = 120, progress_callback=None) -> dict:
+    """Compile frame chunks concurrently and bisect failing chunks down to the broken frames"""
+    tex_file = os.path.abspath(tex_file)
+    with open(tex_file, 'r', encoding='utf-8', errors='replace') as f:
+        preamble, frames = split_tex_frames(f.read())
+
+    report = {'total_frames': len(frames), 'failing_frames': [], 'compiles': 0, 'preamble_errors': []}
+    if not frames:
+        return report
+
+    max_workers = max_workers or os.cpu_count() or 2
+    scratch_dir = tempfile.mkdtemp(prefix='bsg_diagnose_')
+    source_dir = os.path.dirname(tex_file)
+
+    try:
+        # A frameless document first: a broken preamble would make every chunk fail
+        preamble_check = _compile_frame_chunk(preamble, [], scratch_dir, source_dir, timeout)
+        report['compiles'] += 1
+        if preamble_check['errors']:
+            report['preamble_errors'] = preamble_check['errors']
+            return report
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = [frames[i:i + chunk_size] for i in range(0, len(frames), chunk_size)]
+            while pending:
+                results = list(pool.map(
+                    lambda chunk: _compile_frame_chunk(preamble, chunk, scratch_dir, source_dir, timeout),
+                    pending
+                ))
+                report['compiles'] += len(pending)
+                pending = []
+
+                for result in results:
+                    chunk, errors = result['chunk'], result['errors']
+                    if not errors:
+                        continue
+                    if len(chunk) > 1:
+                        middle = len(chunk) // 2
+                        pending.extend([chunk[:middle], chunk[middle:]])
+                        continue
+
+                    frame = chunk[0]
+                    report['failing_frames'].append({
+                        'number': frame['number'],
+                        'title': frame['title'],
+                        'start_line': frame['start_line'],
+                        'end_line': frame['end_line'],
+                        'errors': errors
+                    })
+
+                if progress_callback:
+                    progress_callback(report['compiles'], len(report['failing_frames']))
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    report['failing_frames'].sort(key=lambda frame: frame['number'])
+    return report
+
+#------------------------------------------End LaTeX Build Helpers -----------------------------------------
@@ -0,0 +1,408 @@
+#----------------------------------------------LaTeX Command Database ------------------------------------
+"""
+LatexCommandDB.py
+Offline LaTeX command reference built in one batch run from the local TeX sources:
+user documentation in .dtx files (\\DescribeMacro, \\begin{macro}, ...) plus the
+definitions and argument specs found in .sty/.cls files, stored as SQLite under
+~/.bsg-ide. Also holds the write-behind journal LatexHelp uses for lookup misses.
+
+Build it with:  python LatexCommandDB.py [TEXMF_ROOT ...]
+"""
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+try:
+    from .PackageIndex import find_texmf_roots, iter_package_files, COMMENT_PATTERN
+except ImportError:
+    from PackageIndex import find_texmf_roots, iter_package_files, COMMENT_PATTERN
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser('~'), '.bsg-ide', 'latex_commands.sqlite')
+DEFAULT_MISS_JOURNAL = os.path.join(os.path.expanduser('~'), '.bsg-ide', 'latex_help_misses.jsonl')
+DB_VERSION = '1'
+MAX_DESCRIPTION = 240
+
+# \DescribeMacro{\foo}, \DescribeMacro\foo, \DescribeEnv{bar}, \begin{macro}{\foo}, \begin{environment}{bar}
+DESCRIBE_PATTERN = re.compile(
+    r'\\(?:(?P<describe>DescribeMacro|DescribeEnv)\s*\{?\s*|begin\{(?P<impl>macro|environment)\}\s*\{\s*)'
+    r'(?P<name>\\[A-Za-z@]+|[A-Za-z]+\*?)\s*\}?'
+)
+# Argument markup right after the name: \marg{x} \oarg{x} \parg{x} \meta{x} {x} [x]
+ARGUMENT_PATTERN = re.compile(r'\s*(?:\\(?P<kind>marg|oarg|parg|meta)\s*\{(?P<arg>[^}]*)\}|\{(?P<brace>[^{}]*)\}|\[(?P<bracket>[^\]]*)\])')
+NEWCOMMAND_PATTERN = re.compile(
+    r'\\(?:newcommand|providecommand|DeclareRobustCommand)\*?\s*\{?\s*\\([A-Za-z]+)\s*\}?'
+    r'\s*(?:\[(\d)\])?\s*(\[[^\]]*\])?'
+)
+DOCUMENT_COMMAND_PATTERN = re.compile(
+    r'\\(?:NewDocumentCommand|DeclareDocumentCommand|ProvideDocumentCommand)\s*\{?\s*\\([A-Za-z]+)\s*\}?\s*\{((?:[^{}]|\{[^{}]*\})*)\}'
+)
+NEWENVIRONMENT_PATTERN = re.compile(r'\\(?:newenvironment|NewDocumentEnvironment)\*?\s*\{([A-Za-z]+\*?)\}\s*(?:\[(\d)\])?')
+
+# Documentation markup reduced to plain text, in order
+MARKUP_REPLACEMENTS = [
+    (re.compile(r'\\cs\{([^}]*)\}'), r'\\\1'),
+    (re.compile(r'\\marg\{([^}]*)\}'), r'{\1}'),
+    (re.compile(r'\\oarg\{([^}]*)\}'), r'[\1]'),
+    (re.compile(r'\\meta\{([^}]*)\}'), r'<\1>'),
+    (re.compile(r'\\(?:emph|textbf|textit|texttt|textsf|pkg|env|cls|opt|file|option|Lpack|package)\{([^}]*)\}'), r'\1'),
+    (re.compile(r'\|([^|]*)\|'), r'\1'),
+    (re.compile(r'\\(?:verb)\s*(.)(.*?)\1'), r'\2'),
+    (re.compile(r'\\(?:index|label|ref|changes|SpecialMainIndex|SpecialEnvIndex)\*?(?:\{[^}]*\})+'), ''),
+    (re.compile(r'~'), ' '),
+    (re.compile(r'[{}]'), ''),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def clean_documentation(text: str) -> str:
+    """Plain-text version of a few lines of .dtx documentation, trimmed to a tooltip sentence"""
+    for pattern, replacement in MARKUP_REPLACEMENTS:
+        text = pattern.sub(replacement, text)
+    text = text.strip()
+    if len(text) > MAX_DESCRIPTION:
+        cut = text.rfind('. ', 0, MAX_DESCRIPTION)
+        text = text[:cut + 1] if cut > 40 else text[:MAX_DESCRIPTION].rstrip() + '...'
+    return text
+
+
+def _argument_syntax(rest: str) -> tuple:
+    """Argument part of a syntax line from the markup that follows a described name, and where it ends"""
+    syntax = ''
+    position = 0
+    while True:
+        match = ARGUMENT_PATTERN.match(rest, position)
+        if not match:
+            return syntax, position
+        kind = match.group('kind')
+        if kind == 'oarg':
+            syntax += '[' + match.group('arg') + ']'
+        elif kind == 'parg':
+            syntax += '(' + match.group('arg') + ')'
+        elif kind:
+            syntax += '{' + match.group('arg') + '}'
+        elif match.group('bracket') is not None:
+            syntax += '[' + match.group('bracket') + ']'
+        else:
+            syntax += '{' + match.group('brace') + '}'
+        position = match.end()
+
+
+def parse_dtx_file(path: str) -> dict:
+    """Documented commands and environments of a .dtx file: name -> (syntax, description, category)"""
+    with open(path, 'r', encoding='latin-1') as f:
+        lines = f.read().split('\n')
+
+    entries = {}
+    described = set()
+    current = None
+    in_code = False
+
+    def finish():
+        if current is None:
+            return
+        name, syntax, category, text, from_describe = current
+        if name in described and not from_describe:
+            return
+        description = clean_documentation(' '.join(text))
+        if name in entries and not description:
+            return
+        entries[name] = (syntax, description, category)
+        if from_describe:
+            described.add(name)
+
+    for raw in lines:
+        if not raw.startswith('%'):
+            continue
+        line = raw[1:]
+        if line.startswith(' '):
+            line = line[1:]
+        stripped = line.strip()
+
+        if stripped.startswith('\\begin{macrocode}'):
+            finish()
+            current, in_code = None, True
+            continue
+        if stripped.startswith('\\end{macrocode}'):
+            in_code = False
+            continue
+        if in_code:
+            continue
+
+        match = DESCRIBE_PATTERN.search(line)
+        if match:
+            finish()
+            name = match.group('name')
+            environment = match.group('describe') == 'DescribeEnv' or match.group('impl') == 'environment'
+            rest = line[match.end():]
+            arguments, end = _argument_syntax(rest)
+            if environment:
+                name = name.lstrip('\\')
+                syntax = '\\begin{' + name + '}' + arguments + ' ... \\end{' + name + '}'
+            else:
+                syntax = name + arguments
+            current = [name, syntax, 'environment' if environment else 'command', [],
+                       match.group('describe') is not None]
+            remainder = rest[end:].strip()
+            if remainder and not DESCRIBE_PATTERN.search(remainder):
+                current[3].append(remainder)
+            continue
+
+        if current is None:
+            continue
+        if not stripped or len(current[3]) >= 4:
+            finish()
+            current = None
+        else:
+            current[3].append(stripped)
+
+    finish()
+    return entries
+
+
+def parse_sty_definitions(path: str) -> dict:
+    """Commands and environments a .sty/.cls defines, with a syntax built from the argument spec"""
+    with open(path, 'r', encoding='latin-1') as f:
+        text = COMMENT_PATTERN.sub('', f.read())
+
+    entries = {}
+    for name, count, optional in NEWCOMMAND_PATTERN.findall(text):
+        count = int(count or 0)
+        syntax = '\\' + name + ('[...]' if optional else '')
+        syntax += '{...}' * (count - 1 if optional else count)
+        entries.setdefault('\\' + name, (syntax, '', 'command'))
+    for name, spec in DOCUMENT_COMMAND_PATTERN.findall(text):
+        syntax = '\\' + name
+        # Argument types only: defaults like O{left} are not arguments
+        spec = re.sub(r'\{[^{}]*\}', '', spec)
+        for token in re.findall(r'[smoOrRdDgGeEvbtu]', spec.replace('+', '').replace('!', '')):
+            syntax += {'s': '*', 'o': '[...]', 'O': '[...]', 'd': '<...>', 'D': '<...>',
+                       't': ''}.get(token, '{...}')
+        entries.setdefault('\\' + name, (syntax, '', 'command'))
+    for name, count in NEWENVIRONMENT_PATTERN.findall(text):
+        arguments = '{...}' * int(count or 0)
+        entries.setdefault(name, ('\\begin{' + name + '}' + arguments + ' ... \\end{' + name + '}',
+                                  '', 'environment'))
+    return entries
+
+
+def iter_dtx_files(roots: list):
+    """Every .dtx below the source/ directory of each TEXMF root, as (package, path)"""
+    seen = set()
+    for root in roots:
+        source_dir = os.path.join(root, 'source')
+        if not os.path.isdir(source_dir):
+            continue
+        for directory, subdirs, files in os.walk(source_dir):
+            for name in files:
+                stem, extension = os.path.splitext(name)
+                if extension == '.dtx' and stem not in seen:
+                    seen.add(stem)
+                    yield stem, os.path.join(directory, name)
+
+
+def build_command_database(db_path: str = None, roots: list = None, progress_callback=None) -> dict:
+    """Scan .dtx documentation and .sty/.cls definitions in one batch; returns counts"""
+    db_path = db_path or DEFAULT_DB_PATH
+    roots = roots if roots is not None else find_texmf_roots()
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    temp_path = db_path + '.building'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    db = sqlite3.connect(temp_path)
+    db.executescript("""
+        CREATE TABLE commands (name TEXT PRIMARY KEY, lname TEXT, syntax TEXT, description TEXT,
+                               category TEXT, package TEXT, source TEXT) WITHOUT ROWID;
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+    """)
+
+    stats = {'dtx_files': 0, 'sty_files': 0, 'documented': 0, 'defined': 0, 'roots': roots}
+    started = time.time()
+
+    def insert(entries, package, source):
+        rows = [(name, name.lower(), syntax, description or f'Defined by the {package} package',
+                 category, package, source)
+                for name, (syntax, description, category) in entries.items() if '@' not in name]
+        before = db.total_changes
+        db.executemany("INSERT OR IGNORE INTO commands VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return db.total_changes - before
+
+    # Documented entries first: an undocumented definition never overrides them
+    for package, path in iter_dtx_files(roots):
+        try:
+            entries = parse_dtx_file(path)
+        except OSError:
+            continue
+        stats['dtx_files'] += 1
+        stats['documented'] += insert({name: entry for name, entry in entries.items() if entry[1]},
+                                      package, 'dtx')
+        if progress_callback and stats['dtx_files'] % 100 == 0:
+            progress_callback(stats['dtx_files'] + stats['sty_files'], path)
+
+    for package, kind, path in iter_package_files(roots):
+        try:
+            entries = parse_sty_definitions(path)
+        except OSError:
+            continue
+        stats['sty_files'] += 1
+        stats['defined'] += insert(entries, package, kind)
+        if progress_callback and stats['sty_files'] % 200 == 0:
+            progress_callback(stats['dtx_files'] + stats['sty_files'], path)
+
+    db.execute("CREATE INDEX commands_by_lname ON commands (lname)")
+    db.executemany("INSERT INTO meta VALUES (?, ?)", [
+        ('version', DB_VERSION), ('built', time.strftime('%Y-%m-%d %H:%M:%S')),
+        ('roots', os.pathsep.join(roots))
+    ])
+    db.commit()
+    db.close()
+    os.replace(temp_path, db_path)
+
+    stats['seconds'] = time.time() - started
+    return stats
+
+
+class LatexCommandDatabase:
+    """Read side of the offline command database; lookups are cached and thread safe"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.get = lru_cache(maxsize=2048)(self._get)
+
+    @classmethod
+    def open(cls, db_path: str = None):
+        """The database, or None when it has not been built yet"""
+        path = db_path or DEFAULT_DB_PATH
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except sqlite3.Error:
+            return None
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _get(self, name: str):
+        """Help entry in the LatexCommandHelper format, or None"""
+        rows = self._query("SELECT syntax, description, category, package, source FROM commands WHERE name = ?",
+                           (name,))
+        if not rows:
+            return None
+        syntax, description, category, package, source = rows[0]
+        return {'syntax': syntax, 'description': description, 'category': category,
+                'package': package, 'source': 'offline', 'example': syntax}
+
+    def prefix(self, partial_lower: str, limit: int) -> list:
+        """(name, description) of commands whose lowercase name starts with the partial"""
+        if not partial_lower:
+            return []
+        return self._query("SELECT name, description FROM commands WHERE lname >= ? AND lname < ? "
+                           "ORDER BY lname LIMIT ?", (partial_lower, partial_lower + '\uffff', limit))
+
+
+class HelpMissJournal:
+    """Write-behind store for help entries made up on lookup misses
+
+    Misses are kept in memory and appended to a JSON-lines journal by a timer
+    thread, so a hover never writes to disk on the calling (UI) thread.
+    """
+
+    def __init__(self, path: str = None, flush_interval: float = 5.0, max_pending: int = 100):
+        self.path = path or DEFAULT_MISS_JOURNAL
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def load(self, max_age_days: int = 30) -> dict:
+        """Entries recorded within max_age_days; compacts the journal when it is mostly duplicates"""
+        entries = {}
+        lines = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                        recorded = datetime.fromisoformat(record['date'])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if datetime.now() - recorded < timedelta(days=max_age_days):
+                        entries[record['command']] = (record['date'], record['info'])
+                    else:
+                        entries.pop(record['command'], None)
+        except OSError:
+            return {}
+
+        if lines > 2 * len(entries) + 50:
+            self._rewrite(entries)
+        return {command: info for command, (date, info) in entries.items()}
+
+    def _rewrite(self, entries: dict) -> None:
+        """Replace the journal with one line per live entry"""
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for command, (date, info) in entries.items():
+                    f.write(json.dumps({'command': command, 'date': date, 'info': info}) + '\n')
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+    def record(self, command: str, info: dict) -> None:
+        """Queue an entry; a timer thread appends it to the journal shortly after"""
+        with self._lock:
+            self._pending[command] = info
+            if self._timer is None or len(self._pending) >= self.max_pending:
+                if self._timer is not None:
+                    self._timer.cancel()
+                delay = 0 if len(self._pending) >= self.max_pending else self.flush_interval
+                self._timer = threading.Timer(delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> int:
+        """Append every queued entry to the journal; returns how many were written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._timer = None
+        if not pending:
+            return 0
+
+        date = datetime.now().isoformat()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps({'command': command, 'date': date, 'info': info}) + '\n'
+                                for command, info in pending.items()))
+        except OSError:
+            # Keep them for the next attempt rather than losing them
+            with self._lock:
+                for command, info in pending.items():
+                    self._pending.setdefault(command, info)
+            return 0
+        return len(pending)
+
+
+if __name__ == "__main__":
+    roots = sys.argv[1:] or None
+    print("Building LaTeX command database from", roots or find_texmf_roots())
+    stats = build_command_database(roots=roots, progress_callback=lambda count, path: print(f"  {count} files..."))
+    print(f"{stats['documented']} documented and {stats['defined']} defined commands from "
+          f"{stats['dtx_files']} .dtx and {stats['sty_files']} .sty/.cls files in {stats['seconds']:.1f}s")
+    print("Written to", DEFAULT_DB_PATH)
+
+#------------------------------------------End LaTeX Command Database -----------------------------------------
@@ -5,11 +5,19 @@ import webbrowser
 import tempfile
 import subprocess
 import re
+import bisect
+import heapq
+from collections import Counter, OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
 from tkinter import messagebox
 from typing import Dict, List, Optional, Tuple
 
+try:
+    from .LatexCommandDB import LatexCommandDatabase, HelpMissJournal
+except ImportError:
+    from LatexCommandDB import LatexCommandDatabase, HelpMissJournal
+
 #---------------Enhanced Latex Help Library --------------------------
 class LatexSymbolsDatabase:
     """Database of LaTeX symbols and mathematical constructs"""
@@ -162,6 +170,120 @@ class LatexSymbolsDatabase:
                 results.append((cmd, info))
         return results
 
+class LatexCommandIndex:
+    """Prefix and n-gram indexes over command names, descriptions and categories"""
+
+    WORD_PATTERN = re.compile(r'[a-z0-9@]+')
+
+    def __init__(self):
+        self.entries = {}        # command -> (lowercase command, lowercase description, lowercase category)
+        self.sorted_names = []   # (lowercase command, command), sorted for prefix lookups
+        self.word_commands = {}  # word -> set of commands whose name, description or category uses it
+        self.gram_words = {}     # 2- and 3-gram -> set of words containing it
+        self.name_grams = {}     # 3-gram of a command name -> set of commands, for fuzzy ranking
+        self.source = None
+
+    @staticmethod
+    def grams(text: str, size: int) -> set:
+        """Distinct character n-grams of a string"""
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def build(self, commands_db: Dict) -> None:
+        """Index a whole command database"""
+        self.__init__()
+        self.source = commands_db
+        for cmd, info in commands_db.items():
+            self.add(cmd, info)
+
+    def add(self, cmd: str, info: Dict) -> None:
+        """Index (or re-index) one command"""
+        if cmd in self.entries:
+            self.remove(cmd)
+        name = cmd.lower()
+        entry = (name, info.get('description', '').lower(), info.get('category', '').lower())
+        self.entries[cmd] = entry
+        bisect.insort(self.sorted_names, (name, cmd))
+
+        for word in set(self.WORD_PATTERN.findall(' '.join(entry))):
+            commands = self.word_commands.get(word)
+            if commands is None:
+                commands = self.word_commands[word] = set()
+                for gram in self.grams(word, 2) | self.grams(word, 3):
+                    self.gram_words.setdefault(gram, set()).add(word)
+            commands.add(cmd)
+        for gram in self.grams(name, 3):
+            self.name_grams.setdefault(gram, set()).add(cmd)
+
+    def remove(self, cmd: str) -> None:
+        """Drop one command from every index"""
+        entry = self.entries.pop(cmd, None)
+        if entry is None:
+            return
+        position = bisect.bisect_left(self.sorted_names, (entry[0], cmd))
+        if position < len(self.sorted_names) and self.sorted_names[position] == (entry[0], cmd):
+            del self.sorted_names[position]
+
+        for word in set(self.WORD_PATTERN.findall(' '.join(entry))):
+            commands = self.word_commands.get(word)
+            if commands is None:
+                continue
+            commands.discard(cmd)
+            if not commands:
+                del self.word_commands[word]
+                for gram in self.grams(word, 2) | self.grams(word, 3):
+                    self.gram_words[gram].discard(word)
+        for gram in self.grams(entry[0], 3):
+            self.name_grams.get(gram, set()).discard(cmd)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def prefix(self, partial_lower: str, limit: int) -> List[str]:
+        """Commands whose lowercase name starts with the partial, in sorted order"""
+        matches = []
+        position = bisect.bisect_left(self.sorted_names, (partial_lower,))
+        while (position < len(self.sorted_names) and len(matches) < limit
+               and self.sorted_names[position][0].startswith(partial_lower)):
+            matches.append(self.sorted_names[position][1])
+            position += 1
+        return matches
+
+    def containing(self, query_lower: str) -> set:
+        """Candidate commands for a substring query: every word of the query must occur in some indexed word"""
+        candidates = None
+        for term in sorted(set(self.WORD_PATTERN.findall(query_lower)), key=len, reverse=True):
+            if len(term) == 1:
+                words = [word for word in self.word_commands if term in word]
+            else:
+                grams = self.grams(term, 3) if len(term) > 2 else {term}
+                words = None
+                for gram in grams:
+                    bucket = self.gram_words.get(gram, set())
+                    words = set(bucket) if words is None else words & bucket
+                    if not words:
+                        return set()
+                words = [word for word in words if term in word]
+
+            commands = set()
+            for word in words:
+                commands |= self.word_commands[word]
+            candidates = commands if candidates is None else candidates & commands
+            if not candidates:
+                return set()
+
+        # Queries without letters or digits (e.g. a lone backslash) cannot use the word index
+        return set(self.entries) if candidates is None else candidates
+
+    def fuzzy(self, query_lower: str, limit: int, exclude: set = ()) -> List[str]:
+        """Command names sharing the most 3-grams with the query"""
+        scores = Counter()
+        for gram in self.grams(query_lower, 3):
+            scores.update(self.name_grams.get(gram, ()))
+        ranked = heapq.nsmallest(limit + len(exclude), scores.items(),
+                                 key=lambda item: (-item[1], len(item[0]), item[0]))
+        return [cmd for cmd, score in ranked if cmd not in exclude][:limit]
+
+
 class LatexCommandHelper:
     """Enhanced LaTeX command help system with symbols and autocompletion"""
 
@@ -170,6 +292,10 @@ class LatexCommandHelper:
         self.symbols_db = LatexSymbolsDatabase()
         self.cache_file = Path.home() / '.bsg-ide' / 'latex_help_cache.json'
         self.cache_expiry_days = 30
+        self.index = LatexCommandIndex()
+        self.offline_db = LatexCommandDatabase.open()  # built by LatexCommandDB.py, None until then
+        self.miss_journal = HelpMissJournal()
+        self.online_misses = {}  # placeholder entries, consulted only after offline_db has no answer
         self.load_local_database()
 
     def load_local_database(self):
@@ -332,6 +458,13 @@ class LatexCommandHelper:
 
         # Try to load cached online data
         self.load_cached_online_data()
+        self.index.build(self.commands_db)
+
+    def _command_index(self) -> LatexCommandIndex:
+        """The search index, rebuilt if commands_db was replaced or changed behind its back"""
+        if self.index.source is not self.commands_db or len(self.index) != len(self.commands_db):
+            self.index.build(self.commands_db)
+        return self.index
 
     def _generate_example(self, command: str, info: Dict) -> str:
         """Generate example usage for a command"""
@@ -355,23 +488,16 @@ class LatexCommandHelper:
                 from datetime import datetime, timedelta
                 cache_date = datetime.fromisoformat(cache_data.get('cache_date', ''))
                 if datetime.now() - cache_date < timedelta(days=self.cache_expiry_days):
-                    self.commands_db.update(cache_data.get('commands', {}))
+                    self.online_misses.update(cache_data.get('commands', {}))
         except:
             pass  # Use basic database if cache fails
 
+        # Misses recorded since then live in the append-only journal
+        self.online_misses.update(self.miss_journal.load(self.cache_expiry_days))
+
     def save_cache(self):
-        """Save online data to cache"""
-        try:
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            cache_data = {
-                'cache_date': datetime.now().isoformat(),
-                'commands': {k: v for k, v in self.commands_db.items()
-                           if v.get('source') == 'online'}
-            }
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
-        except:
-            pass
+        """Write queued online data to the miss journal now instead of waiting for the timer"""
+        self.miss_journal.flush()
 
     def get_command_help(self, command: str) -> Optional[Dict]:
         """Get help for a LaTeX command with online fallback"""
@@ -382,6 +508,14 @@ class LatexCommandHelper:
         if base_command in self.commands_db:
             return self.commands_db[base_command]
 
+        if self.offline_db:
+            offline_info = self.offline_db.get(base_command)
+            if offline_info:
+                return offline_info
+
+        if base_command in self.online_misses:
+            return self.online_misses[base_command]
+
         # Try to fetch from online if not found locally
         return self.fetch_online_help(base_command)
 
@@ -402,9 +536,9 @@ class LatexCommandHelper:
                 'example': f'Example usage of {command}'
             }
 
-            # Add to database
-            self.commands_db[command] = help_info
-            self.save_cache()
+            # Remember the placeholder apart from the real entries so it never shadows them
+            self.online_misses[command] = help_info
+            self.miss_journal.record(command, help_info)
 
             return help_info
 
@@ -418,31 +552,41 @@ class LatexCommandHelper:
                 'example': f'Use {command} in your document'
             }
 
-    def get_autocomplete_suggestions(self, partial_command: str, max_results: int = 10) -> List[Tuple[str, str]]:
+    def get_autocomplete_suggestions(self, partial_command: str, max_results: int = 10,
+                                     fuzzy: bool = False) -> List[Tuple[str, str]]:
         """Get autocomplete suggestions for partial command"""
-        suggestions = []
+        index = self._command_index()
         partial_lower = partial_command.lower()
 
-        for cmd, info in self.commands_db.items():
-            if cmd.lower().startswith(partial_lower):
-                description = info.get('description', 'LaTeX command')
-                suggestions.append((cmd, description))
-
-            if len(suggestions) >= max_results:
-                break
-
-        # If not enough prefix matches, search in descriptions
-        if len(suggestions) < max_results:
-            for cmd, info in self.commands_db.items():
-                if (partial_lower in cmd.lower() or
-                    partial_lower in info.get('description', '').lower()) and cmd not in [s[0] for s in suggestions]:
-                    description = info.get('description', 'LaTeX command')
-                    suggestions.append((cmd, description))
-
-                if len(suggestions) >= max_results:
-                    break
-
-        return suggestions
+        # Prefix matches first, straight from the sorted name index
+        matches = index.prefix(partial_lower, max_results)
+        descriptions = {}
+
+        # Then the offline database built from the local TeX sources
+        if len(matches) < max_results and self.offline_db:
+            seen = set(matches)
+            for cmd, description in self.offline_db.prefix(partial_lower, max_results):
+                if cmd not in seen and len(matches) < max_results:
+                    matches.append(cmd)
+                    descriptions[cmd] = description
+
+        # If not enough prefix matches, search names and descriptions
+        if len(matches) < max_results:
+            seen = set(matches)
+            extra = []
+            for cmd in index.containing(partial_lower):
+                name, description, category = index.entries[cmd]
+                if cmd not in seen and (partial_lower in name or partial_lower in description):
+                    extra.append((partial_lower not in name, len(cmd), cmd))
+            matches.extend(cmd for rank in heapq.nsmallest(max_results - len(matches), extra)
+                           for cmd in rank[2:])
+
+        # Optionally fill up with near misses (typos) ranked by shared 3-grams
+        if fuzzy and len(matches) < max_results:
+            matches.extend(index.fuzzy(partial_lower, max_results - len(matches), set(matches)))
+
+        return [(cmd, descriptions[cmd] if cmd in descriptions else
+                 self.commands_db[cmd].get('description', 'LaTeX command')) for cmd in matches]
 
     def get_symbols_by_category(self, category: str) -> List[Tuple[str, str]]:
         """Get symbols by category with their visual representation"""
@@ -456,20 +600,19 @@ class LatexCommandHelper:
 
     def search_commands(self, query: str, max_results: int = 20) -> List[Tuple[str, Dict]]:
         """Search commands and symbols by query"""
-        results = []
+        index = self._command_index()
         query_lower = query.lower()
 
-        # Search in commands database
-        for cmd, info in self.commands_db.items():
-            if (query_lower in cmd.lower() or
-                query_lower in info.get('description', '').lower() or
-                query_lower in info.get('category', '').lower()):
-                results.append((cmd, info))
+        # Name prefix matches rank first, then other name matches, then description/category matches
+        ranked = []
+        for cmd in index.containing(query_lower):
+            name, description, category = index.entries[cmd]
+            if query_lower in name:
+                ranked.append((0 if name.startswith(query_lower) else 1, name, cmd))
+            elif query_lower in description or query_lower in category:
+                ranked.append((2, name, cmd))
 
-            if len(results) >= max_results:
-                break
-
-        return results
+        return [(cmd, self.commands_db[cmd]) for rank, name, cmd in heapq.nsmallest(max_results, ranked)]
 
 class LatexAutocomplete:
     """Autocomplete system for LaTeX commands"""
@@ -516,72 +659,75 @@ class CommandTooltip:
         self.tooltip = None
         self.helper = LatexCommandHelper()
         self.autocomplete = LatexAutocomplete(self.helper)
+        self.lookup_help = lru_cache(maxsize=512)(self.helper.get_command_help)
+        self.help_window = None     # built once, then withdrawn and re-shown
+        self.help_labels = {}
+        self.shown_command = None
+        self._leave_bound = set()
 
     def show_tooltip(self, widget, command, x, y):
         """Show command help tooltip"""
-        self.hide_tooltip()
-
-        help_info = self.helper.get_command_help(command)
+        help_info = self.lookup_help(command)
         if not help_info:
+            self.hide_tooltip()
             return
 
-        # Create tooltip content
-        content = self.format_tooltip_content(command, help_info)
+        if self.help_window is None or not self.help_window.winfo_exists():
+            self._build_help_window(widget)
+        if command != self.shown_command:
+            self._fill_help_window(command, help_info)
+            self.shown_command = command
 
-        # Create tooltip window
-        self.tooltip = tk.Toplevel(widget)
-        self.tooltip.wm_overrideredirect(True)
-        self.tooltip.wm_geometry(f"+{x+20}+{y+20}")
+        self.help_window.wm_geometry(f"+{x+20}+{y+20}")
+        self.help_window.deiconify()
+        self.help_window.lift()
 
-        # Style the tooltip
-        self.tooltip.configure(background='#FFFFE0', relief='solid', borderwidth=1)
+        # Make tooltip disappear when mouse leaves
+        if str(widget) not in self._leave_bound:
+            widget.bind('<Leave>', lambda e: self.hide_tooltip(), add='+')
+            self._leave_bound.add(str(widget))
 
-        # Create content with better formatting
-        frame = tk.Frame(self.tooltip, background='#FFFFE0', padx=10, pady=10)
-        frame.pack(fill='both', expand=True)
+    def _build_help_window(self, widget):
+        """Create the tooltip window and its labels once"""
+        self.help_window = tk.Toplevel(widget)
+        self.help_window.wm_overrideredirect(True)
+        self.help_window.withdraw()
 
-        # Command title
-        title_label = tk.Label(frame, text=f"Command: {command}",
-                              font=('Arial', 11, 'bold'),
-                              background='#FFFFE0', justify='left')
-        title_label.pack(anchor='w')
-
-        # Syntax
-        syntax_label = tk.Label(frame, text=f"Syntax: {help_info.get('syntax', 'Unknown')}",
-                               font=('Arial', 10),
-                               background='#FFFFE0', justify='left')
-        syntax_label.pack(anchor='w', pady=(5,0))
-
-        # Description
-        desc_label = tk.Label(frame, text=f"Description: {help_info.get('description', 'No description')}",
-                             font=('Arial', 10),
-                             background='#FFFFE0', justify='left', wraplength=300)
-        desc_label.pack(anchor='w', pady=(5,0))
-
-        # Example
-        if 'example' in help_info:
-            example_label = tk.Label(frame, text=f"Example: {help_info['example']}",
-                                   font=('Arial', 9, 'italic'),
-                                   background='#FFFFE0', justify='left', wraplength=300)
-            example_label.pack(anchor='w', pady=(5,0))
-
-        # Category and package
-        meta_text = f"Category: {help_info.get('category', 'General')} | Package: {help_info.get('package', 'LaTeX')}"
-        meta_label = tk.Label(frame, text=meta_text,
-                             font=('Arial', 9),
-                             background='#FFFFE0', justify='left')
-        meta_label.pack(anchor='w', pady=(5,0))
-
-        # URL if available
-        if 'url' in help_info:
-            url_label = tk.Label(frame, text=f"Docs: {help_info['url']}",
-                               font=('Arial', 9), fg='blue', cursor='hand2',
-                               background='#FFFFE0', justify='left')
-            url_label.pack(anchor='w', pady=(5,0))
-            url_label.bind('<Button-1>', lambda e: webbrowser.open(help_info['url']))
+        # Style the tooltip
+        self.help_window.configure(background='#FFFFE0', relief='solid', borderwidth=1)
+        frame = tk.Frame(self.help_window, background='#FFFFE0', padx=10, pady=10)
+        frame.pack(fill='both', expand=True)
 
-        # Make tooltip disappear when mouse leaves
-        widget.bind('<Leave>', lambda e: self.hide_tooltip())
+        label_styles = [
+            ('title', {'font': ('Arial', 11, 'bold')}),
+            ('syntax', {'font': ('Arial', 10)}),
+            ('description', {'font': ('Arial', 10), 'wraplength': 300}),
+            ('example', {'font': ('Arial', 9, 'italic'), 'wraplength': 300}),
+            ('meta', {'font': ('Arial', 9)}),
+            ('url', {'font': ('Arial', 9), 'fg': 'blue', 'cursor': 'hand2'}),
+        ]
+        self.help_labels = {}
+        for name, style in label_styles:
+            self.help_labels[name] = tk.Label(frame, background='#FFFFE0', justify='left', **style)
+        self.help_labels['url'].bind('<Button-1>', lambda e: webbrowser.open(self.help_labels['url'].url))
+        self.shown_command = None
+
+    def _fill_help_window(self, command, help_info):
+        """Put a command's help into the existing labels"""
+        texts = {
+            'title': f"Command: {command}",
+            'syntax': f"Syntax: {help_info.get('syntax', 'Unknown')}",
+            'description': f"Description: {help_info.get('description', 'No description')}",
+            'example': f"Example: {help_info['example']}" if 'example' in help_info else '',
+            'meta': f"Category: {help_info.get('category', 'General')} | Package: {help_info.get('package', 'LaTeX')}",
+            'url': f"Docs: {help_info['url']}" if 'url' in help_info else '',
+        }
+        self.help_labels['url'].url = help_info.get('url', '')
+        for name, label in self.help_labels.items():
+            label.pack_forget()
+            if texts[name]:
+                label.configure(text=texts[name])
+                label.pack(anchor='w', pady=(0 if name == 'title' else 5, 0))
 
     def format_tooltip_content(self, command, help_info):
         """Format tooltip content (legacy method)"""
@@ -606,6 +752,11 @@ class CommandTooltip:
         if self.tooltip:
             self.tooltip.destroy()
             self.tooltip = None
+        if self.help_window is not None:
+            try:
+                self.help_window.withdraw()
+            except tk.TclError:
+                self.help_window = None
 
     def show_autocomplete(self, widget, text, cursor_position, x, y):
         """Show autocomplete suggestions"""
@@ -661,6 +812,101 @@ class CommandTooltip:
             # For now, just hide the tooltip
             self.hide_tooltip()
 
+class HoverService:
+    """Throttled detection of the LaTeX command under the mouse in Text and Entry widgets
+
+    Motion events only record the pointer; the lookup runs at most once per delay,
+    each line is scanned for commands once per revision of its text, and the
+    callbacks fire only when the command under the pointer changes.
+    """
+
+    COMMAND_PATTERN = re.compile(r'\\[A-Za-z@]+\*?')
+
+    def __init__(self, show_callback, hide_callback, delay_ms: int = 60, line_cache_size: int = 512):
+        self.show_callback = show_callback    # show_callback(widget, command, x_root, y_root)
+        self.hide_callback = hide_callback
+        self.delay_ms = delay_ms
+        self.line_cache_size = line_cache_size
+        self._line_spans = OrderedDict()      # (widget path, line) -> (line text, command spans)
+        self._event = None                    # latest (widget, x, y, x_root, y_root)
+        self._pending = None                  # after() id of the scheduled lookup
+        self._last_position = None            # (widget path, line, column) of the last lookup
+        self._shown = None                    # (widget path, line, start column) of the command shown
+
+    def on_motion(self, event):
+        """<Motion> handler: remember the pointer and schedule a lookup if none is pending"""
+        self._event = (event.widget, event.x, event.y, event.x_root, event.y_root)
+        if self._pending is None:
+            self._pending = event.widget.after(self.delay_ms, self._resolve)
+
+    def on_leave(self, event=None):
+        """<Leave> handler: drop any pending lookup and hide the tooltip"""
+        if self._pending is not None and self._event is not None:
+            try:
+                self._event[0].after_cancel(self._pending)
+            except tk.TclError:
+                pass
+        self._pending = None
+        self._event = None
+        self._last_position = None
+        self._shown = None
+        self.hide_callback()
+
+    def command_at(self, widget, line: int, column: int, text: str = None):
+        """(start, end, command) of the command covering a column of a line, or None"""
+        if text is None:
+            text = widget.get(f"{line}.0", f"{line}.end")
+        key = (str(widget), line)
+        cached = self._line_spans.get(key)
+        if cached is not None and cached[0] == text:
+            spans = cached[1]
+            self._line_spans.move_to_end(key)
+        else:
+            spans = [(m.start(), m.end(), m.group()) for m in self.COMMAND_PATTERN.finditer(text)]
+            self._line_spans[key] = (text, spans)
+            if len(self._line_spans) > self.line_cache_size:
+                self._line_spans.popitem(last=False)
+
+        for start, end, command in spans:
+            if start > column:
+                break
+            if column < end:
+                return start, end, command
+        return None
+
+    def _resolve(self):
+        """Look up the command under the latest pointer position"""
+        self._pending = None
+        if self._event is None:
+            return
+        widget, x, y, x_root, y_root = self._event
+
+        try:
+            if isinstance(widget, tk.Text):
+                line, column = map(int, widget.index(f"@{x},{y}").split('.'))
+                text = None
+            else:
+                line, column = 0, widget.index(f"@{x}")
+                text = widget.get()
+            position = (str(widget), line, column)
+            if position == self._last_position:
+                return
+            self._last_position = position
+            span = self.command_at(widget, line, column, text)
+        except (tk.TclError, AttributeError, ValueError):
+            return
+
+        if span is None:
+            if self._shown is not None:
+                self._shown = None
+                self.hide_callback()
+            return
+
+        shown = (str(widget), line, span[0])
+        if shown != self._shown:
+            self._shown = shown
+            self.show_callback(widget, span[2], x_root, y_root)
+
 # Example usage and integration
 class LatexHelpLibrary:
     """Main library class for LaTeX help functionality"""
@@ -669,14 +915,17 @@ class LatexHelpLibrary:
         self.helper = LatexCommandHelper()
         self.autocomplete = LatexAutocomplete(self.helper)
         self.tooltip = None  # Will be set when attached to a widget
+        self.hover = None
 
     def attach_to_text_widget(self, text_widget):
         """Attach the help system to a text widget"""
         self.tooltip = CommandTooltip(text_widget)
+        self.hover = HoverService(self.tooltip.show_tooltip, self.tooltip.hide_tooltip)
 
         # Bind events for tooltips
         text_widget.bind('<KeyRelease>', self._on_key_release)
         text_widget.bind('<Motion>', self._on_motion)
+        text_widget.bind('<Leave>', self.hover.on_leave)
 
     def _on_key_release(self, event):
         """Handle key release for autocomplete"""
@@ -694,19 +943,7 @@ class LatexHelpLibrary:
 
     def _on_motion(self, event):
         """Handle mouse motion for tooltips"""
-        widget = event.widget
-        cursor_pos = widget.index(f"@{event.x},{event.y}")
-
-        # Get the word under cursor
-        word_start = widget.index(f"{cursor_pos} wordstart")
-        word_end = widget.index(f"{cursor_pos} wordend")
-        word = widget.get(word_start, word_end)
-
-        if word.startswith('\\'):
-            # Show tooltip for LaTeX command
-            self.tooltip.show_tooltip(widget, word, event.x_root, event.y_root)
-        else:
-            self.tooltip.hide_tooltip()
+        self.hover.on_motion(event)
 
 #------------------------------------------------------------------------------------------
 
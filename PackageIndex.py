@@ -0,0 +1,280 @@
+#----------------------------------------------Package Index ------------------------------------
+"""
+PackageIndex.py
+Command -> package index built offline from the locally installed TEXMF trees.
+Every .sty/.cls file is scanned once for the control sequences and environments it
+defines and the packages it loads; the result is stored as SQLite under ~/.bsg-ide
+so missing-package detection and "Undefined control sequence" fixes are lookups.
+The kernel's .ltx files are indexed as the always-loaded package KERNEL_PACKAGE.
+"""
+import os
+import re
+import sqlite3
+import subprocess
+import threading
+import time
+from functools import lru_cache
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.bsg-ide', 'package_index.sqlite')
+INDEX_VERSION = '2'
+KERNEL_PACKAGE = 'latex'   # latex.ltx and the other format files in tex/latex/base
+
+# Public names only: the lookahead rejects the prefix of internal names like \reserved@a or \cs_new:Npn
+_NAME = r'\\([A-Za-z]+)(?![A-Za-z@_:])'
+COMMAND_DEFINITION_PATTERN = re.compile(
+    r'\\(?:newcommand|NewDocumentCommand|DeclareDocumentCommand|'
+    r'NewExpandableDocumentCommand|DeclareExpandableDocumentCommand|'
+    r'DeclareMathOperator|DeclareTextCommand|DeclareTextSymbol|DeclareMathSymbol|DeclareMathAccent|'
+    r'DeclareMathDelimiter|DeclareMathRadical|DeclareMathAlphabet|DeclareSymbolFontAlphabet|'
+    r'DeclareTextFontCommand|DeclareOldFontCommand)'
+    r'\*?\s*\{?\s*' + _NAME
+)
+# Also used to redefine or patch commands from elsewhere; these only count when nothing else defines the name
+REDEFINITION_PATTERN = re.compile(
+    r'\\(?:[egx]?def|let|DeclareRobustCommand|providecommand|ProvideDocumentCommand)\*?\s*\{?\s*' + _NAME
+)
+ENVIRONMENT_DEFINITION_PATTERN = re.compile(
+    r'\\(?:newenvironment|NewDocumentEnvironment|DeclareDocumentEnvironment|ProvideDocumentEnvironment)'
+    r'\*?\s*\{([A-Za-z]+\*?)\}'
+)
+REQUIRE_PATTERN = re.compile(r'\\(?:RequirePackage|RequirePackageWithOptions|LoadClass|LoadClassWithOptions)'
+                             r'\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}')
+COMMENT_PATTERN = re.compile(r'(?<!\\)%.*')
+
+FALLBACK_TEXMF_ROOTS = [
+    '/usr/share/texlive/texmf-dist', '/usr/share/texmf', '/usr/local/share/texmf',
+    '/Library/TeX/Root/texmf-dist', '~/texmf', '~/Library/texmf',
+]
+
+
+def find_texmf_roots() -> list:
+    """TEXMF trees of the local TeX installation, asking kpsewhich first"""
+    roots = []
+    for variable in ('TEXMFDIST', 'TEXMFLOCAL', 'TEXMFHOME'):
+        try:
+            result = subprocess.run(['kpsewhich', f'-var-value={variable}'], capture_output=True,
+                                    text=True, timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            break
+        for value in result.stdout.strip().split(os.pathsep):
+            value = os.path.expanduser(value.strip().lstrip('!'))
+            if value and os.path.isdir(value) and value not in roots:
+                roots.append(value)
+
+    if not roots:
+        for candidate in FALLBACK_TEXMF_ROOTS:
+            candidate = os.path.expanduser(candidate)
+            if os.path.isdir(candidate):
+                roots.append(candidate)
+        for base in ('/usr/local/texlive', 'C:\\texlive'):
+            if os.path.isdir(base):
+                for year in sorted(os.listdir(base), reverse=True):
+                    candidate = os.path.join(base, year, 'texmf-dist')
+                    if os.path.isdir(candidate):
+                        roots.append(candidate)
+                        break
+    return roots
+
+
+def scan_package_file(path: str) -> tuple:
+    """Commands a .sty/.cls defines, commands it (re)defines with \\def-like macros,
+    the environments it defines and the packages it loads"""
+    with open(path, 'r', encoding='latin-1') as f:
+        text = COMMENT_PATTERN.sub('', f.read())
+
+    commands = set(COMMAND_DEFINITION_PATTERN.findall(text))
+    redefinitions = set(REDEFINITION_PATTERN.findall(text)) - commands
+    environments = set(ENVIRONMENT_DEFINITION_PATTERN.findall(text))
+    requires = set()
+    for group in REQUIRE_PATTERN.findall(text):
+        requires.update(name.strip() for name in group.split(',') if name.strip() and '#' not in name)
+    return commands, redefinitions, environments, requires
+
+
+def iter_package_files(roots: list):
+    """Every .sty and .cls below the tex/ directory of each TEXMF root"""
+    seen = set()
+    for root in roots:
+        tex_dir = os.path.join(root, 'tex')
+        for directory, subdirs, files in os.walk(tex_dir if os.path.isdir(tex_dir) else root):
+            for name in files:
+                stem, extension = os.path.splitext(name)
+                if extension in ('.sty', '.cls') and (stem, extension) not in seen:
+                    seen.add((stem, extension))
+                    yield stem, extension[1:], os.path.join(directory, name)
+
+
+def iter_kernel_files(roots: list):
+    """The format files (latex.ltx, fonttext.ltx, ...) of the first TEXMF root that has them"""
+    for root in roots:
+        base_dir = os.path.join(root, 'tex', 'latex', 'base')
+        if os.path.isdir(base_dir):
+            names = sorted(name for name in os.listdir(base_dir) if name.endswith('.ltx'))
+            if 'latex.ltx' in names:
+                for name in names:
+                    yield os.path.join(base_dir, name)
+                return
+
+
+def build_package_index(index_path: str = None, roots: list = None, progress_callback=None) -> dict:
+    """Scan the TEXMF trees and write the SQLite index; returns file, package and command counts"""
+    index_path = index_path or DEFAULT_INDEX_PATH
+    roots = roots if roots is not None else find_texmf_roots()
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+
+    temp_path = index_path + '.building'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    db = sqlite3.connect(temp_path)
+    db.executescript("""
+        CREATE TABLE packages (name TEXT, kind TEXT, path TEXT, required_by INTEGER DEFAULT 0);
+        CREATE TABLE definitions (name TEXT, package TEXT, kind TEXT, redefinition INTEGER DEFAULT 0);
+        CREATE TABLE requires (package TEXT, requires TEXT);
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+    """)
+
+    stats = {'files': 0, 'commands': 0, 'environments': 0, 'roots': roots}
+    started = time.time()
+    files = [(KERNEL_PACKAGE, 'ltx', path) for path in iter_kernel_files(roots)]
+    for package, kind, path in files + list(iter_package_files(roots)):
+        try:
+            commands, redefinitions, environments, requires = scan_package_file(path)
+        except OSError:
+            continue
+        if kind == 'ltx':
+            # Everything the kernel sets up is available in every document
+            commands |= redefinitions
+            redefinitions = set()
+        db.execute("INSERT INTO packages (name, kind, path) VALUES (?, ?, ?)", (package, kind, path))
+        db.executemany("INSERT INTO definitions VALUES (?, ?, 'command', 0)", ((c, package) for c in commands))
+        db.executemany("INSERT INTO definitions VALUES (?, ?, 'command', 1)", ((c, package) for c in redefinitions))
+        db.executemany("INSERT INTO definitions VALUES (?, ?, 'environment', 0)",
+                       ((e, package) for e in environments))
+        db.executemany("INSERT INTO requires VALUES (?, ?)", ((package, r) for r in requires))
+        stats['files'] += 1
+        stats['commands'] += len(commands)
+        stats['environments'] += len(environments)
+        if progress_callback and stats['files'] % 200 == 0:
+            progress_callback(stats['files'], path)
+
+    # A \def or \let of a name the kernel or another package properly defines is a patch, not a definition
+    db.executescript("""
+        CREATE INDEX definitions_by_name ON definitions (kind, name);
+        DELETE FROM definitions WHERE redefinition = 1 AND EXISTS
+            (SELECT 1 FROM definitions d WHERE d.kind = definitions.kind AND d.name = definitions.name
+             AND d.redefinition = 0);
+    """)
+    stats['commands'] = db.execute("SELECT COUNT(*) FROM definitions WHERE kind = 'command'").fetchone()[0]
+
+    # How many packages load each one: the ranking when several define the same command
+    db.executescript("""
+        UPDATE packages SET required_by =
+            (SELECT COUNT(DISTINCT package) FROM requires WHERE requires.requires = packages.name);
+        CREATE INDEX packages_by_name ON packages (name);
+        CREATE INDEX requires_by_package ON requires (package);
+    """)
+    db.executemany("INSERT INTO meta VALUES (?, ?)", [
+        ('version', INDEX_VERSION), ('built', time.strftime('%Y-%m-%d %H:%M:%S')),
+        ('roots', os.pathsep.join(roots)), ('files', str(stats['files']))
+    ])
+    db.commit()
+    db.close()
+    os.replace(temp_path, index_path)
+
+    stats['seconds'] = time.time() - started
+    return stats
+
+
+class PackageIndex:
+    """Read side of the index; lookups are cached and safe to call from any thread"""
+
+    def __init__(self, index_path: str = None):
+        self.index_path = index_path or DEFAULT_INDEX_PATH
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+        self.packages_for = lru_cache(maxsize=4096)(self._packages_for)
+        self.requires_closure = lru_cache(maxsize=256)(self._requires_closure)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _packages_for(self, name: str, kind: str = 'command') -> tuple:
+        """Packages defining a command (or environment); the kernel first, then the most widely loaded"""
+        rows = self._query(
+            "SELECT d.package FROM definitions d LEFT JOIN packages p ON p.name = d.package "
+            "WHERE d.kind = ? AND d.name = ? GROUP BY d.package "
+            "ORDER BY d.package = ? DESC, MAX(COALESCE(p.required_by, 0)) DESC, LENGTH(d.package), d.package",
+            (kind, name.lstrip('\\'), KERNEL_PACKAGE)
+        )
+        return tuple(row[0] for row in rows)
+
+    def package_for(self, name: str, kind: str = 'command'):
+        """Best single package for a command, or None (also when the kernel defines it)"""
+        packages = self.packages_for(name, kind)
+        return packages[0] if packages and packages[0] != KERNEL_PACKAGE else None
+
+    def _requires_closure(self, packages: frozenset) -> frozenset:
+        """The packages plus everything they load, transitively"""
+        seen = set(packages)
+        pending = list(packages)
+        while pending:
+            package = pending.pop()
+            for (required,) in self._query("SELECT requires FROM requires WHERE package = ?", (package,)):
+                if required not in seen:
+                    seen.add(required)
+                    pending.append(required)
+        return frozenset(seen)
+
+    def info(self) -> dict:
+        """Build metadata stored with the index"""
+        return dict(self._query("SELECT key, value FROM meta"))
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._db.close()
+
+
+_shared_index = None
+_rejected_indexes = {}   # path -> mtime of an index file found stale or unreadable this session
+
+
+def get_package_index(index_path: str = None):
+    """Shared PackageIndex, or None when the index has not been built yet (or needs a rebuild)"""
+    global _shared_index
+    path = index_path or DEFAULT_INDEX_PATH
+    if _shared_index is not None and _shared_index.index_path == path:
+        return _shared_index
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if _rejected_indexes.get(path) == mtime:
+        return None
+
+    index = None
+    try:
+        index = PackageIndex(path)
+        version = index.info().get('version')
+    except sqlite3.Error:
+        version = None
+    if version != INDEX_VERSION:
+        if index is not None:
+            index.close()
+        _rejected_indexes[path] = mtime
+        if version is not None:
+            print("Package index was built by an older version; rebuild it (Tools → Build Package Index)")
+        return None
+    _shared_index = index
+    return _shared_index
+
+
+def reset_package_index() -> None:
+    """Drop the shared instance so the next lookup opens a freshly built index"""
+    global _shared_index
+    # Not closed here: a lookup on another thread may still be using it
+    _shared_index = None
+    _rejected_indexes.clear()
+
+#------------------------------------------End Package Index -----------------------------------------
@@ -0,0 +1,191 @@
+#----------------------------------------------Slide Preview ------------------------------------
+"""
+SlidePreview.py
+Rendered pages of the last built PDF for the editor's preview pane. Pages are rasterised
+with PyMuPDF on one background thread into an LRU cache keyed by (PDF, mtime, page, width),
+so moving between slides shows a cached bitmap while the neighbouring pages are prefetched.
+A rebuilt PDF has a new mtime, which makes every older entry unreachable.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+DEFAULT_PREVIEW_WIDTH = 480
+DEFAULT_CACHE_ENTRIES = 64
+PREFETCH_RADIUS = 2
+
+
+def preview_available() -> bool:
+    """True when PyMuPDF and Pillow are both importable"""
+    return fitz is not None and Image is not None
+
+
+class PageRenderCache:
+    """Renders PDF pages at a fixed width on a worker thread and keeps the bitmaps in an LRU cache"""
+
+    def __init__(self, width: int = DEFAULT_PREVIEW_WIDTH, max_entries: int = DEFAULT_CACHE_ENTRIES,
+                 prefetch: int = PREFETCH_RADIUS):
+        self.width = width
+        self.max_entries = max_entries
+        self.prefetch = prefetch
+        self.stats = {'hits': 0, 'misses': 0, 'rendered': 0, 'evicted': 0}
+        self._cache = OrderedDict()    # key -> PIL image, least recently used first
+        self._pending = OrderedDict()  # key -> callback or None; the last entry is rendered next
+        self._page_counts = {}         # (pdf, mtime) -> number of pages
+        self._condition = threading.Condition()
+        self._worker = None
+        self._closed = False
+        self._document = None          # (pdf, mtime, fitz document); only the worker touches it
+
+    def key(self, pdf: str, page: int):
+        """Cache key of a page of the PDF as it is on disk now, or None if the PDF is missing"""
+        try:
+            mtime = os.stat(pdf).st_mtime_ns
+        except OSError:
+            return None
+        return (os.path.abspath(pdf), mtime, page, self.width)
+
+    def get(self, pdf: str, page: int):
+        """Cached bitmap of a page (1-based), or None"""
+        key = self.key(pdf, page)
+        with self._condition:
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+            return image
+
+    def page_count(self, pdf: str):
+        """Number of pages of the PDF once the worker has opened it, else None"""
+        key = self.key(pdf, 0)
+        with self._condition:
+            return self._page_counts.get(key[:2]) if key else None
+
+    def request(self, pdf: str, page: int, callback=None):
+        """Bitmap of the page if cached; otherwise queue it and call callback(page, image) from the worker.
+        Neighbouring pages are queued for prefetch either way, replacing older prefetches."""
+        key = self.key(pdf, page)
+        if key is None or not preview_available():
+            return None
+
+        with self._condition:
+            # Earlier prefetches are for a slide the user has already left
+            for stale in [k for k, cb in self._pending.items() if cb is None]:
+                del self._pending[stale]
+
+            for distance in range(self.prefetch, 0, -1):
+                for neighbour in (page + distance, page - distance):
+                    neighbour_key = key[:2] + (neighbour, self.width)
+                    if neighbour >= 1 and neighbour_key not in self._cache and neighbour_key not in self._pending:
+                        self._pending[neighbour_key] = None
+
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+            else:
+                self.stats['misses'] += 1
+                previous = self._pending.pop(key, None)
+                self._pending[key] = callback or previous
+
+            if self._pending:
+                self._ensure_worker()
+                self._condition.notify()
+            return image
+
+    def clear(self) -> None:
+        """Drop every cached bitmap and queued render"""
+        with self._condition:
+            self._cache.clear()
+            self._pending.clear()
+            self._page_counts.clear()
+
+    def close(self) -> None:
+        """Stop the worker thread"""
+        with self._condition:
+            self._closed = True
+            self._pending.clear()
+            self._condition.notify()
+
+    # ---------- worker ----------
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._closed = False
+            self._worker = threading.Thread(target=self._run, name='slide-preview', daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    break
+                key, callback = self._pending.popitem(last=True)
+                image = self._cache.get(key)
+
+            if image is None:
+                image = self._render(key)
+                if image is not None:
+                    self._store(key, image)
+            if callback is not None and image is not None:
+                try:
+                    callback(key[2], image)
+                except Exception as e:
+                    print(f"Slide preview callback failed: {e}")
+
+        if self._document:
+            self._document[2].close()
+            self._document = None
+
+    def _open(self, pdf: str, mtime: int):
+        """The fitz document for this version of the PDF, reopening it after a rebuild"""
+        if self._document and self._document[:2] == (pdf, mtime):
+            return self._document[2]
+        if self._document:
+            self._document[2].close()
+            self._document = None
+        document = fitz.open(pdf)
+        self._document = (pdf, mtime, document)
+        with self._condition:
+            self._page_counts[(pdf, mtime)] = document.page_count
+        return document
+
+    def _render(self, key):
+        """Rasterise one page to a PIL image scaled to the cache width; None if it cannot be rendered"""
+        pdf, mtime, page, width = key
+        try:
+            document = self._open(pdf, mtime)
+            if not 1 <= page <= document.page_count:
+                return None
+            pdf_page = document[page - 1]
+            zoom = width / pdf_page.rect.width
+            pixmap = pdf_page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            image = Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+            image.info['scale'] = zoom   # pixels per PDF point
+            return image
+        except Exception as e:
+            # Typically the PDF was replaced while it was open; the next request sees the new mtime
+            print(f"Slide preview could not render page {page}: {e}")
+            return None
+
+    def _store(self, key, image) -> None:
+        with self._condition:
+            self._cache[key] = image
+            self._cache.move_to_end(key)
+            self.stats['rendered'] += 1
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self.stats['evicted'] += 1
+
+#------------------------------------------End Slide Preview -----------------------------------------
@@ -0,0 +1,201 @@
+#----------------------------------------------SyncTeX Map ------------------------------------
+"""
+SyncTexMap.py
+Page <-> source lookups for built decks. Builds run pdflatex with -synctex=1; the
+.synctex.gz it writes is parsed once per build into sorted line and position tables,
+and the .tex is scanned once per version for the "% BSG-SLIDE" markers the generator
+writes before every slide. Both are cached by mtime, so jumping between a PDF page and
+the .txt slide it came from is a couple of binary searches.
+"""
+import os
+import re
+import gzip
+import threading
+from bisect import bisect_left, bisect_right
+
+SYNCTEX_SUFFIX = '.synctex.gz'
+SLIDE_MARKER = '% BSG-SLIDE'
+SLIDE_MARKER_PATTERN = re.compile(r'^% BSG-SLIDE (\d+):\s?(.*)$')
+FRAME_START_PATTERN = re.compile(r'^\s*\\begin\{frame\}')
+
+# [ ( v h x k g $ records: tag,line[,column]:h,v...
+_RECORD_PATTERN = re.compile(r'^[\[(vhxkg$](\d+),(\d+)(?:,-?\d+)?:(-?\d+),(-?\d+)')
+_SP_PER_BP = 65781.76
+
+
+def slide_marker(number: int, title: str) -> str:
+    """Comment line the generator writes before the frame(s) of source slide number (1-based)"""
+    title = ' '.join(str(title or '').split())
+    return f"{SLIDE_MARKER} {number}: {title}\n"
+
+
+class SyncTexMap:
+    """Parsed .synctex.gz of one build, indexed for line -> page and page -> line lookups"""
+
+    def __init__(self, synctex_file: str, tex_file: str = None):
+        self.synctex_file = synctex_file
+        self.mtime = os.stat(synctex_file).st_mtime_ns
+        self.inputs = {}            # tag -> absolute path
+        self.page_count = 0
+        self.lines = []             # sorted source lines of the main .tex that produced output
+        self.line_pages = []        # first page of each entry of self.lines
+        self.page_positions = {}    # page -> sorted [(y in bp from the top, line)]
+        self._parse(tex_file)
+
+    def _parse(self, tex_file) -> None:
+        base_dir = os.path.dirname(os.path.abspath(tex_file or self.synctex_file))
+        main_tags = set()
+        wanted = os.path.normcase(os.path.abspath(tex_file)) if tex_file else None
+        unit, magnification = 1.0, 1000.0
+        first_page = {}
+        page = 0
+
+        with gzip.open(self.synctex_file, 'rt', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                kind = line[:1]
+                if kind in '[(vhxkg$':
+                    if not page:
+                        continue
+                    match = _RECORD_PATTERN.match(line)
+                    if not match or int(match.group(1)) not in main_tags:
+                        continue
+                    source_line = int(match.group(2))
+                    if source_line not in first_page:
+                        first_page[source_line] = page
+                    y = int(match.group(4)) * unit * magnification / 1000.0 / _SP_PER_BP
+                    self.page_positions.setdefault(page, []).append((y, source_line))
+                elif kind == '{':
+                    page = int(line[1:])
+                    self.page_count = max(self.page_count, page)
+                elif kind == '}':
+                    page = 0
+                elif line.startswith('Input:'):
+                    tag, _, name = line[6:].rstrip('\n').partition(':')
+                    path = os.path.normcase(os.path.normpath(os.path.join(base_dir, name)))
+                    self.inputs[int(tag)] = path
+                    # The main file is the first input unless the caller names it
+                    if (wanted and path == wanted) or (not wanted and not main_tags):
+                        main_tags.add(int(tag))
+                elif line.startswith('Unit:'):
+                    unit = float(line[5:])
+                elif line.startswith('Magnification:'):
+                    magnification = float(line[14:]) or 1000.0
+
+        self.lines = sorted(first_page)
+        self.line_pages = [first_page[line] for line in self.lines]
+        for positions in self.page_positions.values():
+            positions.sort()
+
+    def page_for_line(self, line: int):
+        """First page showing output of this source line, or of the next line that produced any"""
+        if not self.lines:
+            return None
+        position = bisect_left(self.lines, line)
+        if position == len(self.lines):
+            position -= 1
+        return self.line_pages[position]
+
+    def page_for_lines(self, first: int, last: int):
+        """First page showing any output of the line range first..last"""
+        position = bisect_left(self.lines, first)
+        end = bisect_right(self.lines, last)
+        if position >= end:
+            return self.page_for_line(first)
+        return min(self.line_pages[position:end])
+
+    def line_for_page(self, page: int, y: float = None):
+        """Source line at a height of a page (bp from the top); without y, the first line on the page"""
+        positions = self.page_positions.get(page)
+        if not positions:
+            return None
+        if y is None:
+            return min(line for _, line in positions)
+        index = bisect_left(positions, (y, 0))
+        candidates = positions[max(0, index - 1):index + 1]
+        return min(candidates, key=lambda entry: abs(entry[0] - y))[1]
+
+
+class TexSlideIndex:
+    """Slide markers and frame starts of one version of a generated .tex"""
+
+    def __init__(self, tex_file: str):
+        self.tex_file = tex_file
+        self.mtime = os.stat(tex_file).st_mtime_ns
+        with open(tex_file, 'r', encoding='utf-8', errors='ignore') as f:
+            self.tex_lines = f.read().split('\n')
+        self.marker_lines = []   # tex line of each marker, ascending
+        self.markers = []        # (slide number, title) per marker
+        self.marker_positions = {}  # slide number -> index into markers
+        self.frame_lines = []    # tex line of each uncommented \begin{frame}
+        for number, text in enumerate(self.tex_lines, 1):
+            if text.startswith(SLIDE_MARKER):
+                match = SLIDE_MARKER_PATTERN.match(text)
+                if match:
+                    self.marker_positions.setdefault(int(match.group(1)), len(self.markers))
+                    self.marker_lines.append(number)
+                    self.markers.append((int(match.group(1)), match.group(2).strip()))
+            elif FRAME_START_PATTERN.match(text):
+                self.frame_lines.append(number)
+
+    def slide_for_line(self, line: int):
+        """(slide number, title) of the source slide a tex line belongs to, or None"""
+        position = bisect_right(self.marker_lines, line) - 1
+        return self.markers[position] if position >= 0 else None
+
+    def slide_range(self, number: int):
+        """First and last tex line written for a source slide, or None"""
+        position = self.marker_positions.get(number)
+        if position is None:
+            return None
+        end = self.marker_lines[position + 1] - 1 if position + 1 < len(self.marker_lines) else len(self.tex_lines)
+        return self.marker_lines[position], end
+
+    def frame_line(self, frame_number: int):
+        """Tex line of the n-th frame (1-based), or None"""
+        if 1 <= frame_number <= len(self.frame_lines):
+            return self.frame_lines[frame_number - 1]
+        return None
+
+    def line_text(self, line: int) -> str:
+        """Text of a tex line (1-based)"""
+        return self.tex_lines[line - 1] if 1 <= line <= len(self.tex_lines) else ''
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _cached(kind, path, loader):
+    """Loader's result for this version of path, reusing the previous parse while the mtime is unchanged"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _cache_lock:
+        entry = _cache.get((kind, path))
+        if entry is not None and entry.mtime == mtime:
+            return entry
+    try:
+        entry = loader()
+    except (OSError, EOFError, ValueError) as e:
+        print(f"Could not read {os.path.basename(path)}: {e}")
+        return None
+    with _cache_lock:
+        _cache[(kind, path)] = entry
+    return entry
+
+
+def load_synctex(tex_file: str, synctex_file: str):
+    """SyncTexMap of a build, or None when the build wrote no SyncTeX data"""
+    if not synctex_file:
+        return None
+    synctex_file = os.path.abspath(synctex_file)
+    return _cached('synctex', synctex_file, lambda: SyncTexMap(synctex_file, tex_file))
+
+
+def load_tex_slide_index(tex_file: str):
+    """TexSlideIndex of the .tex as it is on disk now, or None if it does not exist"""
+    tex_file = os.path.abspath(tex_file)
+    return _cached('tex', tex_file, lambda: TexSlideIndex(tex_file))
+
+#------------------------------------------End SyncTeX Map -----------------------------------------
@@ -0,0 +1,356 @@
+#----------------------------------------------Pipeline Benchmarks ------------------------------------
+"""
+run_benchmarks.py
+Headless benchmarks for the BeamerSlideGenerator conversion pipeline.
+
+    python benchmarks/run_benchmarks.py                  # everything, saved to benchmarks/results/latest.json
+    python benchmarks/run_benchmarks.py --quick          # one repeat, no 100x deck
+    python benchmarks/run_benchmarks.py --save-baseline  # also store the run as benchmarks/results/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/baseline.json --fail-on-regression
+
+process_input_file is timed end to end on the shipped decks and on synthetic 10x and
+100x copies; parse_native_slides_full, sanitize_latex_content, fix_tikz_node_line_breaks,
+process_content_with_features and the layout generators are timed in isolation.
+Each case reports its best and median time, slides/s, lines/s and the peak memory
+traced during an untimed warm-up run. Everything runs in a scratch directory, and media
+downloads are replaced by offline no-ops unless --network is given.
+"""
+import os
+import io
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+import contextlib
+import statistics
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+DECKS = ['DSSC_converted.txt', 'sdss_presentation_converted.txt', 'DSSC_converted.tex']
+SCALED_DECK = 'DSSC_converted.txt'
+LAYOUTS = {
+    'mosaic': '{2,2}{figure1.png, figure2.png, figure3.png, figure4.png}',
+    'split': 'figure.png', 'pip': 'figure.png', 'fullframe': 'figure.png', 'watermark': 'figure.png',
+    'highlight': 'figure.png', 'background': 'figure.png', 'topbottom': 'figure.png',
+    'overlay': 'figure.png', 'corner': 'figure.png',
+}
+TIKZ_PATTERN = re.compile(r'\\begin\{tikzpicture\}.*?\\end\{tikzpicture\}', re.DOTALL)
+SYNTHETIC_TIKZ = (
+    "\\begin{tikzpicture}\n"
+    "\\node[draw, fill=blue!20] (a) at (0,0) {Input\\\\layer};\n"
+    "\\node[draw, fill=green!20] (b) at (3,0) {Hidden\\\\layer\\\\(ReLU)};\n"
+    "\\node[draw, fill=red!20] (c) at (6,0) {Output\\\\layer};\n"
+    "\\draw[->] (a) -- (b); \\draw[->] (b) -- (c);\n"
+    "\\end{tikzpicture}"
+)
+
+
+def quiet():
+    """Silence the generator's console output while timing"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def load_generator(network: bool):
+    """Import BeamerSlideGenerator (from the scratch directory) with console events off"""
+    sys.path.insert(0, REPO_ROOT)
+    with quiet():
+        import BeamerSlideGenerator as generator
+    generator.set_console_event_level(None)
+
+    if not network:
+        # Same results as a failed download, without touching the network
+        generator.download_youtube_video = lambda *args, **kwargs: None
+        generator.download_video_from_url = lambda *args, **kwargs: None
+        generator.download_media = lambda *args, **kwargs: (None, None, None)
+        generator.download_giphy_gif = lambda *args, **kwargs: (None, None, None)
+    return generator
+
+
+def split_deck(text: str) -> tuple:
+    """(preamble including \\begin{document}, body lines, closing lines) of a deck"""
+    lines = text.splitlines(True)
+    begin = max((i for i, line in enumerate(lines) if '\\begin{document}' in line), default=-1)
+    end = next((i for i in range(len(lines) - 1, begin, -1) if '\\end{document}' in lines[i]), len(lines))
+    return lines[:begin + 1], lines[begin + 1:end], lines[end:]
+
+
+def scale_deck(text: str, factor: int) -> str:
+    """The deck with its slides repeated factor times"""
+    preamble, body, closing = split_deck(text)
+    return ''.join(preamble + body * factor + closing)
+
+
+def measure(func, repeat: int, memory: bool = True) -> dict:
+    """Best and median wall time over repeat runs, after an untimed run that traces peak memory"""
+    # The untimed run also warms regex and import caches, so the first timed run is not an outlier
+    peak = None
+    if memory:
+        tracemalloc.start()
+    try:
+        with quiet():
+            func()
+        if memory:
+            peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if memory:
+            tracemalloc.stop()
+
+    timings = []
+    result = None
+    for _ in range(repeat):
+        with quiet():
+            started = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - started)
+
+    return {'best': min(timings), 'median': statistics.median(timings), 'runs': len(timings),
+            'peak_bytes': peak, 'result': result}
+
+
+def record(results: list, name: str, group: str, timing: dict, slides: int = None, lines: int = None,
+           items: int = None) -> None:
+    """Append one case with throughput derived from its best time"""
+    best = timing['best'] or 1e-9
+    entry = {'name': name, 'group': group, 'best_s': round(timing['best'], 6),
+             'median_s': round(timing['median'], 6), 'runs': timing['runs'],
+             'peak_mb': None if timing['peak_bytes'] is None else round(timing['peak_bytes'] / 2**20, 3)}
+    if slides is not None:
+        entry['slides'] = slides
+        entry['slides_per_s'] = round(slides / best, 1)
+    if lines is not None:
+        entry['lines'] = lines
+        entry['lines_per_s'] = round(lines / best, 1)
+    if items is not None:
+        entry['items'] = items
+        entry['items_per_s'] = round(items / best, 1)
+    results.append(entry)
+    print(format_entry(entry))
+
+
+def format_entry(entry: dict) -> str:
+    rate = ''
+    if 'slides_per_s' in entry:
+        rate += f"{entry['slides_per_s']:>10.1f} slides/s"
+    if 'lines_per_s' in entry:
+        rate += f"{entry['lines_per_s']:>12.1f} lines/s"
+    if 'items_per_s' in entry and 'slides_per_s' not in entry:
+        rate += f"{entry['items_per_s']:>10.1f} items/s"
+    peak = '' if entry['peak_mb'] is None else f"{entry['peak_mb']:>9.2f} MB"
+    return f"  {entry['name']:<56} {entry['best_s'] * 1000:>10.2f} ms {rate}{peak}"
+
+
+# ---------- cases ----------
+
+def bench_process_input_file(generator, decks: dict, workdir: str, repeat: int, results: list) -> None:
+    print("\nprocess_input_file (end to end)")
+    for name, path in decks.items():
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            line_count = sum(1 for _ in f)
+        output = os.path.join(workdir, os.path.splitext(os.path.basename(path))[0] + '.bench.tex')
+        timing = measure(lambda: generator.process_input_file(path, output), repeat)
+        processed, failed, errors = timing['result']
+        record(results, f"process_input_file[{name}]", 'process_input_file', timing,
+               slides=processed + failed, lines=line_count)
+
+
+def bench_parser(generator, deck_lines: dict, repeat: int, results: list) -> dict:
+    """Times parse_native_slides_full; returns the parsed slides of each native deck"""
+    print("\nparse_native_slides_full")
+    parsed = {}
+    for name, lines in deck_lines.items():
+        if '.tex' in name:
+            continue
+        body = split_deck(''.join(lines))[1]
+        timing = measure(lambda: generator.parse_native_slides_full(list(body), [], 3), repeat)
+        parsed[name] = timing['result'] or []
+        record(results, f"parse_native_slides_full[{name}]", 'parse', timing,
+               slides=len(parsed[name]), lines=len(body))
+    return parsed
+
+
+def bench_sanitize(generator, deck_lines: dict, repeat: int, results: list) -> None:
+    print("\nsanitize_latex_content")
+    for name, lines in deck_lines.items():
+        body = [line.rstrip('\n') for line in split_deck(''.join(lines))[1] if line.strip()]
+        timing = measure(lambda: [generator.sanitize_latex_content(line) for line in body], repeat)
+        record(results, f"sanitize_latex_content[{name}]", 'sanitize', timing, lines=len(body))
+
+
+def bench_tikz(generator, deck_lines: dict, repeat: int, results: list) -> None:
+    print("\nfix_tikz_node_line_breaks")
+    blocks = {name: TIKZ_PATTERN.findall(''.join(lines)) for name, lines in deck_lines.items()}
+    blocks['synthetic x100'] = [SYNTHETIC_TIKZ] * 100
+    for name, found in blocks.items():
+        if not found:
+            continue
+        line_count = sum(block.count('\n') + 1 for block in found)
+        timing = measure(lambda: [generator.fix_tikz_node_line_breaks(block) for block in found], repeat)
+        record(results, f"fix_tikz_node_line_breaks[{name}]", 'tikz', timing, lines=line_count, items=len(found))
+
+
+def bench_content(generator, parsed: dict, repeat: int, results: list) -> None:
+    print("\nprocess_content_with_features")
+    for name, slides in parsed.items():
+        contents = [slide.get('content') or [] for slide in slides]
+        line_count = sum(len(content) for content in contents)
+        timing = measure(lambda: [generator.process_content_with_features(content) for content in contents], repeat)
+        record(results, f"process_content_with_features[{name}]", 'content', timing,
+               slides=len(contents), lines=line_count)
+
+
+def bench_layouts(generator, parsed: dict, repeat: int, results: list) -> None:
+    print("\nlayout generators")
+    slides = next((slides for name, slides in parsed.items() if slides and 'x]' not in name), [])
+    samples = [(slide.get('title') or 'Untitled', slide.get('content') or []) for slide in slides]
+    line_count = sum(len(content) for title, content in samples)
+    for layout, params in LAYOUTS.items():
+        function = getattr(generator, f"generate_{layout}_layout", None)
+        if function is None:
+            continue
+        timing = measure(lambda: [function(title, params, content, '') for title, content in samples], repeat)
+        record(results, f"generate_{layout}_layout", 'layout', timing, slides=len(samples), lines=line_count)
+
+
+# ---------- comparison ----------
+
+def compare(results: list, baseline_path: str, threshold: float) -> list:
+    """Print the change against a baseline run; returns the cases slower than the threshold"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {entry['name']: entry for entry in json.load(f).get('results', [])}
+
+    print(f"\nAgainst {os.path.relpath(baseline_path)} (regression threshold {threshold:.0%}):")
+    regressions = []
+    for entry in results:
+        previous = baseline.get(entry['name'])
+        if not previous or not previous.get('best_s'):
+            print(f"  {entry['name']:<56} (new)")
+            continue
+        change = entry['best_s'] / previous['best_s'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  ⚠ slower'
+            regressions.append(entry['name'])
+        elif change < -threshold:
+            flag = '  ✓ faster'
+        print(f"  {entry['name']:<56} {previous['best_s'] * 1000:>10.2f} -> {entry['best_s'] * 1000:>10.2f} ms"
+              f" {change:>+8.1%}{flag}")
+    return regressions
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the BeamerSlideGenerator pipeline")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per case (best and median are kept)")
+    parser.add_argument('--scales', default='10,100', help="comma-separated slide multipliers for synthetic decks")
+    parser.add_argument('--quick', action='store_true', help="one repeat and only the 10x deck")
+    parser.add_argument('--only', help="run only these groups: process_input_file,parse,sanitize,tikz,content,layout")
+    parser.add_argument('--network', action='store_true', help="let media directives download for real")
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'latest.json'), help="where to write the results")
+    parser.add_argument('--baseline', help="earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.15, help="relative slowdown counted as a regression")
+    parser.add_argument('--fail-on-regression', action='store_true', help="exit with status 1 on any regression")
+    parser.add_argument('--save-baseline', action='store_true', help="also write the results as baseline.json")
+    options = parser.parse_args(argv)
+
+    repeat = 1 if options.quick else max(1, options.repeat)
+    scales = [10] if options.quick else [int(s) for s in options.scales.split(',') if s.strip()]
+    groups = set(options.only.split(',')) if options.only else None
+    output = os.path.abspath(options.output)
+    baseline = os.path.abspath(options.baseline) if options.baseline else None
+
+    workdir = tempfile.mkdtemp(prefix='bsg-bench-')
+    original_dir = os.getcwd()
+    results = []
+    try:
+        # The generator writes debug logs and media_files/ relative to the working directory
+        os.chdir(workdir)
+        generator = load_generator(options.network)
+
+        decks = {}
+        for name in DECKS:
+            source = os.path.join(REPO_ROOT, name)
+            if os.path.exists(source):
+                decks[name] = shutil.copy(source, os.path.join(workdir, name))
+        if SCALED_DECK in decks:
+            with open(decks[SCALED_DECK], 'r', encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+            for factor in scales:
+                name = f"{SCALED_DECK}[{factor}x]"
+                decks[name] = os.path.join(workdir, f"scaled_{factor}x.txt")
+                with open(decks[name], 'w', encoding='utf-8') as f:
+                    f.write(scale_deck(text, factor))
+
+        deck_lines = {}
+        for name, path in decks.items():
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                deck_lines[name] = f.readlines()
+
+        print(f"Benchmarking {len(decks)} decks, {repeat} run(s) per case, scratch dir {workdir}")
+        wanted = lambda group: groups is None or group in groups
+        if wanted('process_input_file'):
+            bench_process_input_file(generator, decks, workdir, repeat, results)
+        parsed = {}
+        if wanted('parse') or wanted('content') or wanted('layout'):
+            # Content and layout cases run on the parser's slides; its timings are kept only if asked for
+            parsed = bench_parser(generator, deck_lines, repeat, results if wanted('parse') else [])
+        if wanted('sanitize'):
+            bench_sanitize(generator, deck_lines, repeat, results)
+        if wanted('tikz'):
+            bench_tikz(generator, deck_lines, repeat, results)
+        if wanted('content'):
+            bench_content(generator, parsed, repeat, results)
+        if wanted('layout'):
+            bench_layouts(generator, parsed, repeat, results)
+    finally:
+        os.chdir(original_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'version': 1,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {'repeat': repeat, 'scales': scales, 'network': options.network},
+        'results': results,
+    }
+    try:
+        import resource
+        report['max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    except (ImportError, AttributeError):
+        pass
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"\n✓ Results written to {os.path.relpath(output)}")
+    if options.save_baseline:
+        baseline_file = os.path.join(RESULTS_DIR, 'baseline.json')
+        shutil.copy(output, baseline_file)
+        print(f"✓ Baseline saved to {os.path.relpath(baseline_file)}")
+
+    if baseline:
+        regressions = compare(results, baseline, options.threshold)
+        if regressions and options.fail_on_regression:
+            print(f"\n✗ {len(regressions)} case(s) regressed")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+#------------------------------------------End Pipeline Benchmarks -----------------------------------------
@@ -56,6 +56,7 @@ entry_points = {
     'console_scripts': [
         'bsg-ide = bsg_ide.BSG_IDE:launch_ide',
         'bsg = bsg_ide.BSG_IDE:launch_ide',
+        'bsg-build = bsg_ide.BatchBuild:main',
     ],
     'gui_scripts': [
         'bsg-ide-gui = bsg_ide.BSG_IDE:launch_ide',